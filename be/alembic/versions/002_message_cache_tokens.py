@@ -0,0 +1,35 @@
+"""Add prompt cache token counts to messages
+
+Revision ID: 002_message_cache_tokens
+Revises: 001_bout_agents
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "002_message_cache_tokens"
+down_revision: Union[str, None] = "001_bout_agents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "messages",
+        sa.Column("tokens_cache_write", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "messages",
+        sa.Column("tokens_cache_read", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "tokens_cache_read")
+    op.drop_column("messages", "tokens_cache_write")
@@ -0,0 +1,47 @@
+"""Add bout_jobs queue table for pit-worker processes
+
+Revision ID: 003_bout_jobs
+Revises: 002_message_cache_tokens
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "003_bout_jobs"
+down_revision: Union[str, None] = "002_message_cache_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bout_jobs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("bout_id", sa.String(10), sa.ForeignKey("bouts.id"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("worker_id", sa.String(100), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bout_id"),
+    )
+    op.create_index(
+        "ix_bout_jobs_status_priority", "bout_jobs", ["status", "priority", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bout_jobs_status_priority", table_name="bout_jobs")
+    op.drop_table("bout_jobs")
@@ -0,0 +1,29 @@
+"""Add heartbeat_at to bouts for the stuck-bout reaper
+
+Revision ID: 004_bout_heartbeat
+Revises: 003_bout_jobs
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004_bout_heartbeat"
+down_revision: Union[str, None] = "003_bout_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("bouts", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_bouts_status_heartbeat_at", "bouts", ["status", "heartbeat_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bouts_status_heartbeat_at", table_name="bouts")
+    op.drop_column("bouts", "heartbeat_at")
@@ -0,0 +1,27 @@
+"""Add lease_owner to bouts for atomic claims
+
+Revision ID: 005_bout_lease_owner
+Revises: 004_bout_heartbeat
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "005_bout_lease_owner"
+down_revision: Union[str, None] = "004_bout_heartbeat"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("bouts", sa.Column("lease_owner", sa.String(100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bouts", "lease_owner")
@@ -0,0 +1,27 @@
+"""Add viewer_seen_at to bouts for abandoned-bout detection
+
+Revision ID: 006_bout_viewer_seen_at
+Revises: 005_bout_lease_owner
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006_bout_viewer_seen_at"
+down_revision: Union[str, None] = "005_bout_lease_owner"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("bouts", sa.Column("viewer_seen_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bouts", "viewer_seen_at")
@@ -0,0 +1,30 @@
+"""Add truncated flag to messages cut off at the turn deadline
+
+Revision ID: 007_message_truncated
+Revises: 006_bout_viewer_seen_at
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007_message_truncated"
+down_revision: Union[str, None] = "006_bout_viewer_seen_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "messages",
+        sa.Column("truncated", sa.Boolean(), nullable=False, server_default="false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "truncated")
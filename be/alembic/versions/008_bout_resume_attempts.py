@@ -0,0 +1,30 @@
+"""Add resume_attempts to bouts for requeueing stale checkpointed bouts
+
+Revision ID: 008_bout_resume_attempts
+Revises: 007_message_truncated
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008_bout_resume_attempts"
+down_revision: Union[str, None] = "007_message_truncated"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "bouts",
+        sa.Column("resume_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("bouts", "resume_attempts")
@@ -1,11 +1,43 @@
 """FastAPI application factory."""
 
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from pit_api.config import config
+from pit_api.engine import output_budgets, run_reaper
+from pit_api.models import async_engine
 from pit_api.routes import bout_router, health_router, presets_router, waitlist_router
+from pit_api.routes.bout import drain_bouts
+from pit_api.streaming import end_timed_out_bout, event_bus, viewer_presence
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the stuck-bout reaper, viewer presence updates and output budget
+    refreshes while serving; on shutdown, park unfinished inline bouts so they
+    resume instead of restarting, then close the async connection pool.
+    """
+    presence = asyncio.create_task(viewer_presence.run())
+    reaper = None
+    if config.REAPER_INTERVAL > 0:
+        reaper = asyncio.create_task(run_reaper(partial(end_timed_out_bout, event_bus)))
+    budgets = None
+    if config.OUTPUT_BUDGET_INTERVAL > 0:
+        budgets = asyncio.create_task(output_budgets.run())
+    yield
+    presence.cancel()
+    if reaper:
+        reaper.cancel()
+    if budgets:
+        budgets.cancel()
+    await drain_bouts()
+    await async_engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -14,6 +46,7 @@ def create_app() -> FastAPI:
         title="The Pit API",
         description="AI debate arena backend",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     # CORS for frontend
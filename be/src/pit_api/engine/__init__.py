@@ -1,18 +1,60 @@
 """The Pit Engine — orchestration, agent running, turn management."""
 
 from .agent_runner import AgentConfig, AgentRunner
-from .orchestrator import BoutConfig, Orchestrator, OrchestratorEvents
+from .circuit_breaker import ModelUnavailableError, circuit_breakers
+from .clients import ClientRegistry, client_registry
+from .compaction import CompactionConfig
+from .job_queue import aenqueue_bout, claim_next, enqueue_bout, finish_job, requeue_job
+from .orchestrator import (
+    BoutConfig,
+    Orchestrator,
+    OrchestratorEvents,
+    agents_from_preset,
+    drain,
+    new_bout,
+)
+from .output_budgets import OutputBudgets, output_budgets
+from .persistence import PersistenceSink, SessionSink
+from .scheduler import BoutScheduler, bout_scheduler
 from .share_generator import ShareGenerator
+from .speaker_guard import speaker_guard
 from .token_meter import TokenMeter
 from .turn_manager import TurnManager
+from .turn_plans import TurnPlan, get_turn_plan
+from .watchdog import LeaseLost, reap_stale_bouts, run_reaper
 
 __all__ = [
     "AgentConfig",
     "AgentRunner",
     "BoutConfig",
+    "BoutScheduler",
+    "ClientRegistry",
+    "CompactionConfig",
+    "LeaseLost",
+    "ModelUnavailableError",
     "Orchestrator",
     "OrchestratorEvents",
+    "OutputBudgets",
+    "PersistenceSink",
+    "SessionSink",
     "ShareGenerator",
     "TokenMeter",
     "TurnManager",
+    "TurnPlan",
+    "aenqueue_bout",
+    "agents_from_preset",
+    "bout_scheduler",
+    "circuit_breakers",
+    "claim_next",
+    "client_registry",
+    "drain",
+    "enqueue_bout",
+    "finish_job",
+    "get_turn_plan",
+    "new_bout",
+    "output_budgets",
+    "reap_stale_bouts",
+    "requeue_job",
+    "run_reaper",
+    "speaker_guard",
 ]
@@ -1,14 +1,26 @@
 """AgentRunner — wraps Anthropic API for model-agnostic agent execution."""
 
+import asyncio
 import time  # CRITIC:PERF — Moved to top-level (was imported inside run())
-
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Callable, Iterator
 
 import anthropic
 
 from pit_api.config import config
 
+from .circuit_breaker import (
+    ModelUnavailableError,
+    circuit_breakers,
+    is_upstream_failure,
+    retry_after,
+)
+from .clients import client_registry
+from .hedging import ttft_tracker
+from .scheduler import bout_scheduler
+from .speaker_guard import HijackFilter, speaker_guard, stop_sequences, trim_hijack
+from .token_meter import estimate_tokens
+
 
 @dataclass
 class AgentConfig:
@@ -30,19 +42,90 @@ class RunResult:
     tokens_out: int
     model_used: str
     latency_ms: int | None = None
+    tokens_cache_write: int = 0  # cache_creation_input_tokens
+    tokens_cache_read: int = 0  # cache_read_input_tokens
+    loser: "RunResult | None" = None  # cancelled hedge request, metered separately
+    truncated: bool = False  # stopped at the turn deadline; content is partial
+    stop_reason: str | None = None
+
+
+class TurnTimeoutError(Exception):
+    """Raised when a turn reaches its deadline before producing any text."""
 
 
 class AgentRunner:
     """Runs a single agent turn via Anthropic API."""
 
-    def __init__(self, model: str | None = None):
-        """Initialize with optional model override."""
-        self.client = anthropic.Anthropic(
-            api_key=config.ANTHROPIC_API_KEY,
-            timeout=30.0,
-            max_retries=2,
-        )
+    def __init__(self, model: str | None = None, fallback_model: str | None = None):
+        """Initialize with optional model override and a model to fail over to."""
         self.model = model or config.MODEL_STANDARD
+        self.fallback_model = fallback_model if fallback_model != self.model else None
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        """The process-wide sync client (shared connection pool)."""
+        return client_registry.sync_client()
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """The shared async client for the running event loop."""
+        return client_registry.async_client()
+
+    def _request_params(
+        self,
+        agent: AgentConfig,
+        conversation: list[dict],
+        max_tokens: int,
+        model: str | None = None,
+        stop: list[str] | None = None,
+    ) -> dict:
+        """
+        Build Messages API parameters for a turn.
+
+        With PROMPT_CACHING on, cache breakpoints are placed on the system prompt
+        and on the last conversation message. Each turn re-sends the previous
+        turn's prefix unchanged, so everything up to the prior breakpoint is a
+        cache read and only the newest messages are billed at the full rate.
+        Prompts below the model's minimum cacheable length are simply not cached.
+        """
+        model = model or self.model
+        extra = {"stop_sequences": stop} if stop else {}
+        if not config.PROMPT_CACHING:
+            return {
+                "model": model,
+                "max_tokens": max_tokens,
+                "system": agent.system_prompt,
+                "messages": conversation,
+                **extra,
+            }
+
+        cache_control = {"type": "ephemeral"}
+        messages = list(conversation)
+        if messages:
+            last = messages[-1]
+            content = last["content"]
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            content = [*content[:-1], {**content[-1], "cache_control": cache_control}]
+            messages[-1] = {**last, "content": content}
+
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": [
+                {"type": "text", "text": agent.system_prompt, "cache_control": cache_control}
+            ],
+            "messages": messages,
+            **extra,
+        }
+
+    @staticmethod
+    def _cache_usage(usage) -> dict:
+        """Extract prompt-cache token counts from a usage block."""
+        return {
+            "tokens_cache_write": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "tokens_cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+        }
 
     def run(
         self,
@@ -64,10 +147,7 @@ class AgentRunner:
         start_time = time.time()
 
         response = self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            system=agent.system_prompt,
-            messages=conversation,
+            **self._request_params(agent, conversation, max_tokens),
         )
 
         latency_ms = int((time.time() - start_time) * 1000)
@@ -80,6 +160,210 @@ class AgentRunner:
             tokens_out=response.usage.output_tokens,
             model_used=self.model,
             latency_ms=latency_ms,
+            **self._cache_usage(response.usage),
+        )
+
+    async def arun(
+        self,
+        agent: AgentConfig,
+        conversation: list[dict],
+        max_tokens: int = 500,
+    ) -> RunResult:
+        """
+        Run a single turn for an agent without blocking the event loop.
+
+        Same contract as run(), but uses the AsyncAnthropic client so many
+        bouts can share one event loop.
+        """
+        start_time = time.time()
+
+        response = await self.async_client.messages.create(
+            **self._request_params(agent, conversation, max_tokens),
+        )
+
+        latency_ms = int((time.time() - start_time) * 1000)
+
+        content = response.content[0].text if response.content else ""
+
+        return RunResult(
+            content=content,
+            tokens_in=response.usage.input_tokens,
+            tokens_out=response.usage.output_tokens,
+            model_used=self.model,
+            latency_ms=latency_ms,
+            **self._cache_usage(response.usage),
+        )
+
+    async def arun_streaming(
+        self,
+        agent: AgentConfig,
+        conversation: list[dict],
+        max_tokens: int = 500,
+        on_token: Callable[[str], None] | None = None,
+        hedge: bool = False,
+        deadline: float | None = None,
+        other_speakers: list[str] | None = None,
+    ) -> RunResult:
+        """
+        Run a single turn with streaming output on the event loop.
+
+        Each text delta is passed to on_token as it arrives. The final usage
+        block is read once the stream closes, so the returned RunResult meters
+        exactly like arun(). latency_ms is time-to-first-token.
+
+        Calls go through the model's circuit breaker. If it is open, or the
+        call fails upstream before any text was streamed, the turn goes to
+        fallback_model instead and model_used says so.
+
+        With hedge=True, if no token has arrived within the model's adaptive
+        threshold (ttft_tracker), an identical second request is raced against
+        the first, provided a bout_scheduler model call permit is free at once. The first to start streaming wins and is the result; the
+        other is cancelled and returned as result.loser with whatever usage
+        it had reported, for separate metering.
+
+        With a deadline (seconds), a turn still streaming when it expires is
+        cut off: the text so far is returned with truncated=True and its
+        output tokens estimated, since the final usage block never arrives.
+        A turn with no text by then raises TurnTimeoutError.
+
+        other_speakers are the bout's other agents: their "[Name]:" prefixes
+        are stop sequences, and a reply that still runs into one is trimmed.
+        Deltas go through a HijackFilter, so on_token never sees trimmed text.
+        """
+        expires = time.monotonic() + deadline if deadline else None
+        streamed = False
+
+        def forward(text: str) -> None:
+            nonlocal streamed
+            streamed = True
+            if on_token:
+                on_token(text)
+
+        models = [self.model] + ([self.fallback_model] if self.fallback_model else [])
+        error: Exception | None = None
+        for model in models:
+            breaker = circuit_breakers.get(model)
+            if not breaker.allow():
+                continue
+            probing = breaker.tripped  # Allowed while tripped: this call is the probe
+            # With somewhere to fail over to, don't spend time on client retries
+            client = self.async_client
+            if model != models[-1]:
+                client = client.with_options(max_retries=0)
+            params = self._request_params(
+                agent, conversation, max_tokens, model, stop_sequences(other_speakers or [])
+            )
+            guard = HijackFilter(other_speakers, forward) if other_speakers else None
+            on_delta = guard.feed if guard else forward
+            try:
+                result = await self._stream_turn(client, model, params, on_delta, hedge, expires)
+            except TurnTimeoutError:
+                breaker.record_failure()
+                raise  # No time left to fail over
+            except asyncio.CancelledError:
+                if probing:
+                    breaker.abandon_probe()
+                raise
+            except Exception as e:
+                if not is_upstream_failure(e):
+                    if probing:
+                        breaker.abandon_probe()
+                    raise
+                breaker.record_failure(retry_after(e))
+                if streamed:
+                    raise  # Viewers already saw part of this turn
+                error = e
+                continue
+            breaker.record_success(
+                result.latency_ms / 1000 if result.latency_ms is not None else None
+            )
+            if other_speakers:
+                content = trim_hijack(result.content, other_speakers)
+                speaker_guard.record(
+                    stopped=result.stop_reason == "stop_sequence",
+                    unused_tokens=max_tokens - result.tokens_out,
+                    trimmed=result.content[len(content) :].strip(),
+                )
+                result.content = content
+                guard.finish(content)
+            return result
+
+        if error:
+            raise error
+        raise ModelUnavailableError(f"{' and '.join(models)} temporarily unavailable")
+
+    async def _stream_turn(
+        self,
+        client: anthropic.AsyncAnthropic,
+        model: str,
+        params: dict,
+        on_token: Callable[[str], None],
+        hedge: bool,
+        expires: float | None = None,
+    ) -> RunResult:
+        """Stream one request to model, hedged and cut off as asked (see arun_streaming)."""
+        delay = ttft_tracker.hedge_delay(model) if hedge else None
+
+        attempts = [_StreamAttempt(client, params, model)]
+        winner: _StreamAttempt | None = None
+        losers: list[_StreamAttempt] = []
+        timeout = max(0.0, expires - time.monotonic()) if expires is not None else None
+        try:
+            async with asyncio.timeout(timeout):
+                if delay is None:
+                    attempts[0].forward_to(on_token)
+                else:
+                    try:
+                        await asyncio.wait_for(attempts[0].started.wait(), delay)
+                    except asyncio.TimeoutError:
+                        # The hedge is extra load: only send it if a permit is free
+                        if await bout_scheduler.try_model_call():
+                            second = _StreamAttempt(client, params, model)
+                            second.task.add_done_callback(
+                                lambda _: bout_scheduler.release_model_call()
+                            )
+                            attempts.append(second)
+
+                winner = await _first_started(attempts)
+                winner.forward_to(on_token)
+                losers = [a for a in attempts if a is not winner]
+                for loser in losers:
+                    loser.task.cancel()
+                response = await winner.task
+        except TimeoutError:
+            if winner is None:
+                winner = next((a for a in attempts if a.chunks), attempts[0])
+                losers = [a for a in attempts if a is not winner]
+            if not winner.chunks:
+                raise TurnTimeoutError(f"No response from {model} before the turn deadline")
+            response = None
+        finally:
+            for attempt in attempts:
+                attempt.task.cancel()
+            await asyncio.gather(*(a.task for a in attempts), return_exceptions=True)
+
+        if response is None:
+            # Viewers may not have seen the held text of a winner chosen at the deadline
+            winner.forward_to(on_token)
+            result = winner.partial_result()
+            result.truncated = True
+        else:
+            result = self._stream_result(response, model, winner.latency_ms)
+        if losers:
+            result.loser = losers[0].partial_result()
+        return result
+
+    def _stream_result(self, response, model: str, latency_ms: int | None) -> RunResult:
+        content = "".join(block.text for block in response.content if block.type == "text")
+
+        return RunResult(
+            content=content,
+            tokens_in=response.usage.input_tokens,
+            tokens_out=response.usage.output_tokens,
+            model_used=model,
+            latency_ms=latency_ms,
+            stop_reason=getattr(response, "stop_reason", None),
+            **self._cache_usage(response.usage),
         )
 
     def run_streaming(
@@ -96,10 +380,95 @@ class AgentRunner:
         use AsyncAnthropic client instead.
         """
         with self.client.messages.stream(
-            model=self.model,
-            max_tokens=max_tokens,
-            system=agent.system_prompt,
-            messages=conversation,
+            **self._request_params(agent, conversation, max_tokens),
         ) as stream:
             for text in stream.text_stream:
                 yield text
+
+
+class _StreamAttempt:
+    """One streaming request; its text is held back until it is chosen."""
+
+    def __init__(self, client: anthropic.AsyncAnthropic, params: dict, model: str):
+        self.model = model
+        self.latency_ms: int | None = None
+        self.started = asyncio.Event()  # First token arrived, or the request ended
+        self._stream = None
+        self.chunks: list[str] = []  # All text received so far
+        self._on_token: Callable[[str], None] | None = None
+        self._forwarded = 0
+        self._chosen = False
+        self.task = asyncio.create_task(self._run(client, params))
+
+    async def _run(self, client: anthropic.AsyncAnthropic, params: dict):
+        start_time = time.time()
+        try:
+            async with client.messages.stream(**params) as stream:
+                self._stream = stream
+                async for text in stream.text_stream:
+                    if self.latency_ms is None:
+                        elapsed = time.time() - start_time
+                        self.latency_ms = int(elapsed * 1000)
+                        ttft_tracker.record(self.model, elapsed)
+                        self.started.set()
+                    self.chunks.append(text)
+                    if self._chosen:
+                        self._forward()
+                return await stream.get_final_message()
+        finally:
+            self.started.set()
+
+    @property
+    def failed(self) -> bool:
+        return self.task.done() and not self.task.cancelled() and self.task.exception() is not None
+
+    def forward_to(self, on_token: Callable[[str], None] | None) -> None:
+        """Choose this attempt: replay held text to on_token and stream the rest."""
+        self._on_token = on_token
+        self._chosen = True
+        self._forward()
+
+    def _forward(self) -> None:
+        while self._forwarded < len(self.chunks):
+            if self._on_token:
+                self._on_token(self.chunks[self._forwarded])
+            self._forwarded += 1
+
+    def partial_result(self) -> RunResult:
+        """
+        What a stopped attempt produced: its text, the usage reported so far,
+        and output tokens estimated from the text (the final count never came).
+        """
+        usage = None
+        if self._stream is not None:
+            try:
+                usage = self._stream.current_message_snapshot.usage
+            except AssertionError:
+                pass  # Cancelled before the message started
+        content = "".join(self.chunks)
+        return RunResult(
+            content=content,
+            tokens_in=usage.input_tokens if usage else 0,
+            tokens_out=max(usage.output_tokens if usage else 0, estimate_tokens(content)),
+            model_used=self.model,
+            latency_ms=self.latency_ms,
+            **(AgentRunner._cache_usage(usage) if usage else {}),
+        )
+
+
+async def _first_started(attempts: list[_StreamAttempt]) -> _StreamAttempt:
+    """The first attempt to start streaming; failed attempts defer to the others."""
+    while True:
+        healthy = [a for a in attempts if not a.failed]
+        for attempt in healthy:
+            if attempt.started.is_set():
+                return attempt
+        if not healthy:
+            return attempts[0]  # Awaiting it re-raises its error
+
+        waiters = [asyncio.create_task(a.started.wait()) for a in healthy]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
@@ -0,0 +1,153 @@
+"""Circuit breakers — stop sending turns to a model that is failing.
+
+One breaker per model, shared by every bout in the process. A breaker opens
+when, over its last CIRCUIT_WINDOW calls (at least CIRCUIT_MIN_CALLS), the
+share of failed or slow calls reaches CIRCUIT_FAILURE_RATE, or at once when
+the API answers with a retry-after. While open, AgentRunner sends turns to
+the tier's fallback model instead of waiting out retries. After
+CIRCUIT_OPEN_SECONDS (or the retry-after, if longer) a single probe call is
+let through: success closes the breaker, failure opens it again, and a
+probe that ends without an answer (cancelled, or a bad request) frees the
+slot for the next call.
+"""
+
+import time
+from collections import deque
+
+import anthropic
+
+from pit_api.config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ModelUnavailableError(Exception):
+    """Raised when every model a turn could use has an open circuit."""
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Whether an API error says the model is unhealthy (not that the request was bad)."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds the API asked us to wait, from a retry-after header."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one model."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = CLOSED
+        self.trips = 0
+        self._outcomes: deque[bool] = deque(maxlen=config.CIRCUIT_WINDOW)  # True = bad
+        self._open_until = 0.0
+        self._probe_started: float | None = None
+
+    def allow(self) -> bool:
+        """Whether a call may go to this model now."""
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if now < self._open_until:
+                return False
+            self.state = HALF_OPEN
+            self._probe_started = None
+        # Half-open: one probe at a time; a probe that never reported is retried
+        probing = self._probe_started is not None
+        if probing and now - self._probe_started < config.CIRCUIT_OPEN_SECONDS:
+            return False
+        self._probe_started = now
+        return True
+
+    @property
+    def tripped(self) -> bool:
+        """Whether turns are being sent elsewhere; unlike allow(), takes no probe slot."""
+        return self.state != CLOSED
+
+    def record_success(self, latency: float | None = None) -> None:
+        """Record a completed call and its time to first token in seconds."""
+        slow = latency is not None and latency > config.CIRCUIT_SLOW_SECONDS
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open()
+            else:
+                self._close()
+            return
+        self._record(slow)
+
+    def record_failure(self, wait: float | None = None) -> None:
+        """Record a failed call; wait is the API's retry-after, if any."""
+        if self.state == HALF_OPEN or wait:
+            self._open(wait)
+            return
+        self._record(True)
+
+    def abandon_probe(self) -> None:
+        """Give back the half-open probe slot after a call that says nothing about the model.
+
+        For a probe that was cancelled, or failed on our side rather than
+        upstream: the next allow() may probe at once instead of waiting out
+        CIRCUIT_OPEN_SECONDS.
+        """
+        if self.state == HALF_OPEN:
+            self._probe_started = None
+
+    def _record(self, bad: bool) -> None:
+        self._outcomes.append(bad)
+        if (
+            len(self._outcomes) >= config.CIRCUIT_MIN_CALLS
+            and sum(self._outcomes) / len(self._outcomes) >= config.CIRCUIT_FAILURE_RATE
+        ):
+            self._open()
+
+    def _open(self, wait: float | None = None) -> None:
+        if self.state != OPEN:
+            self.trips += 1
+        self.state = OPEN
+        self._open_until = time.monotonic() + max(config.CIRCUIT_OPEN_SECONDS, wait or 0)
+        self._probe_started = None
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._probe_started = None
+
+
+class CircuitBreakers:
+    """Process-wide breakers, one per model."""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(model)
+        return breaker
+
+    def stats(self) -> dict:
+        """Snapshot for health/metrics endpoints."""
+        return {
+            model: {"state": breaker.state, "trips": breaker.trips}
+            for model, breaker in self._breakers.items()
+        }
+
+
+# Global singleton
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,119 @@
+"""Anthropic clients — pooled clients shared by every bout in the process.
+
+A client per bout meant a fresh connection pool, and so a TCP + TLS
+handshake, for every bout. The registry hands out one sync client per
+process and one async client per event loop (async connections belong to the
+loop that opened them), all using the ANTHROPIC_* pool limits and keep-alive.
+HTTP/2 is used when ANTHROPIC_HTTP2 is on and the h2 package is installed.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+import anthropic
+import httpx
+
+from pit_api.config import config
+
+# httpcore trace event emitted once per newly opened connection
+_CONNECT_EVENT = "connection.connect_tcp.complete"
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and its optional dependency is installed."""
+    return config.ANTHROPIC_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """Process-wide Anthropic clients with shared connection pools."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync: anthropic.Anthropic | None = None
+        self._async: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, anthropic.AsyncAnthropic
+        ] = weakref.WeakKeyDictionary()
+        self.handshakes = 0
+
+    def sync_client(self) -> anthropic.Anthropic:
+        """The process's sync client."""
+        with self._lock:
+            if self._sync is None:
+                self._sync = anthropic.Anthropic(
+                    api_key=config.ANTHROPIC_API_KEY,
+                    timeout=30.0,
+                    max_retries=2,
+                    http_client=anthropic.DefaultHttpxClient(
+                        limits=self._limits(),
+                        http2=http2_available(),
+                        event_hooks={"request": [self._trace_request]},
+                    ),
+                )
+            return self._sync
+
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """The async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async.get(loop)
+            if client is None:
+                client = anthropic.AsyncAnthropic(
+                    api_key=config.ANTHROPIC_API_KEY,
+                    timeout=30.0,
+                    max_retries=2,
+                    http_client=anthropic.DefaultAsyncHttpxClient(
+                        limits=self._limits(),
+                        http2=http2_available(),
+                        event_hooks={"request": [self._atrace_request]},
+                    ),
+                )
+                self._async[loop] = client
+            return client
+
+    def stats(self) -> dict:
+        """Snapshot for health/metrics endpoints."""
+        clients = [c for c in (self._sync, *self._async.values()) if c is not None]
+        pools = [pool for pool in map(_connection_pool, clients) if pool is not None]
+        return {
+            "clients": len(clients),
+            "http2": http2_available(),
+            "open_connections": sum(len(pool.connections) for pool in pools),
+            "waiting_requests": sum(
+                sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+                for pool in pools
+            ),
+            "handshakes": self.handshakes,
+            "max_connections": config.ANTHROPIC_MAX_CONNECTIONS,
+        }
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ANTHROPIC_MAX_KEEPALIVE,
+            keepalive_expiry=config.ANTHROPIC_KEEPALIVE_EXPIRY,
+        )
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == _CONNECT_EVENT:
+            self.handshakes += 1
+
+    async def _atrace(self, event_name: str, info: dict) -> None:
+        self._trace(event_name, info)
+
+    def _trace_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._trace
+
+    async def _atrace_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._atrace
+
+
+def _connection_pool(client: anthropic.Anthropic | anthropic.AsyncAnthropic):
+    """The httpcore pool behind a client, or None if the transport is not the default."""
+    return getattr(getattr(client._client, "_transport", None), "_pool", None)
+
+
+# Global singleton
+client_registry = ClientRegistry()
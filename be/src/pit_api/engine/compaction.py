@@ -0,0 +1,63 @@
+"""Compaction — bounds per-turn context by folding old turns into a summary."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+# (previous_summary, evicted_messages, max_chars) -> new_summary
+Summarizer = Callable[[str, list[dict], int], str]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_MAX_LINE_CHARS = 200
+
+
+def extractive_summary(summary: str, messages: list[dict], max_chars: int) -> str:
+    """
+    Fold messages into a running summary without a model call.
+
+    Keeps the speaker tag and first sentence of each message. When the summary
+    outgrows max_chars the oldest lines are dropped first, so its size stays
+    bounded no matter how long the bout runs.
+    """
+    lines = summary.splitlines() if summary else []
+    for message in messages:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = " ".join(block.get("text", "") for block in content)
+        first = _SENTENCE_END.split(content.strip(), maxsplit=1)[0]
+        if len(first) > _MAX_LINE_CHARS:
+            first = first[: _MAX_LINE_CHARS - 1].rstrip() + "…"
+        lines.append(f"- {first}")
+
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+@dataclass
+class CompactionConfig:
+    """Rolling context window settings for a bout."""
+
+    keep_turns: int  # Most recent turns always sent verbatim
+    summary_max_chars: int = 2000
+    summarizer: Summarizer = field(default=extractive_summary)
+
+    @property
+    def fold_batch(self) -> int:
+        """
+        Turns folded at a time.
+
+        Folding in batches rather than one turn per turn keeps the context
+        prefix stable between folds, so prompt-cache reads keep hitting.
+        """
+        return max(1, self.keep_turns // 2)
+
+    @classmethod
+    def from_preset(cls, data: dict | None) -> "CompactionConfig | None":
+        """Build from a preset's "compaction" block; None or keep_turns <= 0 disables."""
+        if not data or data.get("keep_turns", 0) <= 0:
+            return None
+        return cls(
+            keep_turns=data["keep_turns"],
+            summary_max_chars=data.get("summary_max_chars", 2000),
+        )
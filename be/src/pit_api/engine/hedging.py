@@ -0,0 +1,45 @@
+"""Hedging — adaptive time-to-first-token thresholds for hedged model calls.
+
+Every streamed call records its time to first token per model. With
+HEDGE_REQUESTS on, a turn that has not produced a token by the model's
+recent HEDGE_PERCENTILE TTFT gets a second, identical request; whichever
+starts streaming first is kept and the other is cancelled (see
+AgentRunner.arun_streaming).
+"""
+
+from collections import defaultdict, deque
+
+from pit_api.config import config
+
+# Recent samples kept per model
+TTFT_WINDOW = 200
+
+
+class LatencyTracker:
+    """Rolling per-model time-to-first-token samples, in seconds."""
+
+    def __init__(self, window: int = TTFT_WINDOW):
+        self._samples: defaultdict[str, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, model: str, seconds: float) -> None:
+        self._samples[model].append(seconds)
+
+    def percentile(self, model: str, pct: float) -> float | None:
+        """The pct-th percentile TTFT for model, or None before HEDGE_MIN_SAMPLES."""
+        samples = self._samples.get(model)
+        if not samples or len(samples) < config.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def hedge_delay(self, model: str) -> float | None:
+        """Seconds to wait for a first token before hedging, or None to not hedge."""
+        threshold = self.percentile(model, config.HEDGE_PERCENTILE)
+        if threshold is None:
+            return None
+        return max(threshold, config.HEDGE_MIN_DELAY)
+
+
+# Global singleton
+ttft_tracker = LatencyTracker()
@@ -0,0 +1,78 @@
+"""Job queue — Postgres-backed hand-off of bouts from API nodes to pit-workers."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from pit_api.models import Bout, BoutJob
+
+from .scheduler import TIER_PRIORITY
+
+
+def _enqueue(bout: Bout):
+    return (
+        insert(BoutJob)
+        .values(
+            bout_id=bout.id,
+            status="queued",
+            priority=TIER_PRIORITY.get(bout.model_tier, len(TIER_PRIORITY)),
+            created_at=datetime.now(timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["bout_id"])
+    )
+
+
+def enqueue_bout(db: Session, bout: Bout) -> None:
+    """Queue a bout for a worker. Idempotent: a bout is only ever queued once."""
+    db.execute(_enqueue(bout))
+    db.commit()
+
+
+async def aenqueue_bout(db: AsyncSession, bout: Bout) -> None:
+    """enqueue_bout() on an async session."""
+    await db.execute(_enqueue(bout))
+    await db.commit()
+
+
+def claim_next(db: Session, worker_id: str) -> BoutJob | None:
+    """
+    Claim the highest-priority queued job, or None if the queue is empty.
+
+    Uses SELECT … FOR UPDATE SKIP LOCKED so concurrent workers never block on
+    or double-claim the same row.
+    """
+    job = (
+        db.query(BoutJob)
+        .filter(BoutJob.status == "queued")
+        .order_by(BoutJob.priority, BoutJob.created_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()  # Release the transaction opened by the select
+        return None
+
+    job.status = "claimed"
+    job.worker_id = worker_id
+    job.claimed_at = datetime.now(timezone.utc)
+    job.attempts += 1
+    db.commit()
+    return job
+
+
+def finish_job(db: Session, job: BoutJob, error: str | None = None) -> None:
+    """Mark a claimed job as done, or failed with an error message."""
+    job.status = "failed" if error else "done"
+    job.error = error
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def requeue_job(db: Session, job: BoutJob) -> None:
+    """Put a claimed job back in the queue, e.g. after its bout was parked."""
+    job.status = "queued"
+    job.worker_id = None
+    job.claimed_at = None
+    db.commit()
@@ -1,18 +1,33 @@
 """Orchestrator — bout lifecycle management."""
 
+import asyncio
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Callable, Iterable
 
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from pit_api.config import config
 from pit_api.models import Bout, BoutAgent, Message
+from pit_api.models.base import async_engine
+from pit_api.models.bout import generate_bout_id
+from pit_api.models.message import generate_message_id
 from pit_api.store import preset_loader
-
-from .agent_runner import AgentConfig, AgentRunner
-from .token_meter import TokenMeter
+from pit_api.store.preset_loader import Preset
+
+from .agent_runner import AgentConfig, AgentRunner, RunResult
+from .circuit_breaker import circuit_breakers
+from .compaction import CompactionConfig
+from .output_budgets import output_budgets
+from .persistence import PersistenceSink, SessionSink
+from .repetition import REPETITION_OFF, REPETITION_STEER, RepetitionDetector, steer_note
+from .scheduler import bout_scheduler
+from .token_meter import TokenMeter, estimate_prompt_tokens
 from .turn_manager import TurnManager
+from .turn_plans import get_turn_plan
+from .watchdog import LeaseLost, claim_bout, heartbeat, new_lease_owner
 
 
 @dataclass
@@ -31,26 +46,214 @@ class OrchestratorEvents:
     """Event callbacks for the orchestrator."""
 
     on_turn_start: Callable[[str, str, int], None] | None = None  # bout_id, agent_name, turn
-    # TODO: on_token is unused until streaming is implemented via AgentRunner.run_streaming()
-    # CRITIC:DEBT — Unused callback. Wire up when implementing token-by-token streaming.
-    on_token: Callable[[str, str], None] | None = None  # bout_id, token
+    on_token: Callable[[str, str, str], None] | None = None  # bout_id, agent_name, token
     on_turn_end: Callable[[str, str, int, str], None] | None = None  # bout_id, agent, turn, msg_id
-    on_bout_complete: Callable[[str, float], None] | None = None  # bout_id, total_cost
+    on_bout_complete: Callable[[str, float, str], None] | None = None  # bout_id, cost, reason
     on_error: Callable[[str, str], None] | None = None  # bout_id, error_message
 
 
+def agents_from_preset(preset: Preset, topic: str | None = None) -> list[AgentConfig]:
+    """Build runnable agent configs from a preset, injecting the topic into prompts."""
+    agents = [
+        AgentConfig(id=a.id, name=a.name, role=a.role, system_prompt=a.system_prompt, team=a.team)
+        for a in preset.agents
+    ]
+    if topic:
+        for agent in agents:
+            agent.system_prompt = agent.system_prompt.replace("{topic}", topic)
+    return agents
+
+
+def new_bout(bout_config: BoutConfig) -> tuple[Bout, list[BoutAgent]]:
+    """A pending bout and its agent records, not yet added to a session."""
+    bout = Bout(
+        id=generate_bout_id(),
+        preset_id=bout_config.preset_id,
+        status="pending",
+        model_tier=bout_config.model_tier,
+        topic=bout_config.topic,
+        agent_count=len(bout_config.agents),
+        ip_hash=bout_config.ip_hash,
+    )
+    bout_agents = [
+        BoutAgent(
+            bout_id=bout.id,
+            agent_id=agent.id or agent.name.lower().replace(" ", "-"),
+            agent_name=agent.name,
+            agent_role=agent.role,
+            position=position,
+            team=agent.team,
+        )
+        for position, agent in enumerate(bout_config.agents, start=1)
+    ]
+    return bout, bout_agents
+
+
 class Orchestrator:
     """
     Manages the full lifecycle of a bout.
 
     Coordinates AgentRunner, TurnManager, and TokenMeter to run a complete
     multi-agent conversation and persist results to the database.
+
+    The session is used to claim and resume a bout; turns and progress are
+    then written through a PersistenceSink, so no connection is held while
+    the models are running.
     """
 
-    def __init__(self, db: Session, events: OrchestratorEvents | None = None):
-        """Initialize with database session and optional event callbacks."""
+    def __init__(
+        self,
+        db: Session,
+        events: OrchestratorEvents | None = None,
+        lease_owner: str | None = None,
+    ):
+        """Initialize with database session, optional event callbacks and lease owner id."""
         self.db = db
         self.events = events or OrchestratorEvents()
+        self.lease_owner = lease_owner or new_lease_owner()
+        self._park_requested = False
+        self._cancel_reason: str | None = None
+        self._lease_lost = False
+        self._round: asyncio.Future | None = None
+
+    def claim(self, bout: Bout) -> bool:
+        """
+        Atomically take a pending bout for this orchestrator.
+
+        Returns False if another request or worker got there first.
+        """
+        if not claim_bout(self.db, bout.id, self.lease_owner):
+            return False
+        # Mirror the UPDATE on the loaded instance without dirtying it
+        set_committed_value(bout, "status", "running")
+        set_committed_value(bout, "lease_owner", self.lease_owner)
+        return True
+
+    def park(self) -> None:
+        """
+        Ask a running bout to stop after its current round.
+
+        The in-flight turns finish and are persisted with a checkpoint, then
+        the bout goes back to pending so a later arun() resumes it.
+        """
+        self._park_requested = True
+
+    def cancel(self, reason: str) -> None:
+        """
+        Stop a running bout now, cancelling its in-flight model calls.
+
+        Turns already committed are kept; the bout ends as cancelled.
+        """
+        self._cancel_reason = reason
+        if self._round is not None:
+            self._round.cancel()
+
+    def lose_lease(self) -> None:
+        """
+        Stop a bout that was reaped or taken over by another owner.
+
+        The in-flight model calls are cancelled and nothing more is written
+        or published; arun() raises LeaseLost.
+        """
+        self._lease_lost = True
+        if self._round is not None:
+            self._round.cancel()
+
+    def _on_flusher_done(self, flusher: asyncio.Task) -> None:
+        if not flusher.cancelled() and isinstance(flusher.exception(), LeaseLost):
+            self.lose_lease()
+
+    @staticmethod
+    def _save(bout: Bout, sink: PersistenceSink, **values) -> None:
+        """Set columns on the in-memory bout and queue them on the sink."""
+        for name, value in values.items():
+            setattr(bout, name, value)
+        sink.update_bout(**values)
+
+    def _checkpoint(
+        self,
+        bout: Bout,
+        sink: PersistenceSink,
+        turn_manager: TurnManager,
+        meter: TokenMeter,
+        steered: bool,
+    ) -> None:
+        """Queue the bout's progress and turn state (written with the round's messages)."""
+        checkpoint = {**turn_manager.checkpoint(), "steered": steered}
+        self._save(
+            bout,
+            sink,
+            total_turns=turn_manager.turn_number,
+            token_cost=meter.total_cost,
+            extra={**(bout.extra or {}), "checkpoint": checkpoint},
+            heartbeat_at=datetime.now(timezone.utc),
+        )
+
+    def _restore(
+        self,
+        bout: Bout,
+        checkpoint: dict,
+        turn_manager: TurnManager,
+        meter: TokenMeter,
+        model: str,
+        detector: RepetitionDetector,
+    ) -> None:
+        """Rebuild turn state and spend so far from a checkpoint and the bout's messages."""
+        messages = (
+            self.db.query(Message)
+            .filter(Message.bout_id == bout.id, Message.turn_number < checkpoint["turn_number"])
+            .order_by(Message.turn_number)
+            .all()
+        )
+        for message in messages:
+            meter.record(
+                message.tokens_in,
+                message.tokens_out,
+                message.model_used or model,
+                tokens_cache_write=message.tokens_cache_write or 0,
+                tokens_cache_read=message.tokens_cache_read or 0,
+                agent=message.agent_name,
+            )
+        turn_manager.restore(
+            checkpoint, [(m.agent_name, m.turn_number, m.content) for m in messages]
+        )
+        for message in messages:
+            detector.observe(message.content)
+
+    async def _run_agent(
+        self,
+        runner: AgentRunner,
+        bout_id: str,
+        agent: AgentConfig,
+        conversation: list[dict],
+        max_tokens: int = config.MAX_TOKENS_PER_TURN,
+        hedge: bool = False,
+        deadline: float | None = None,
+        other_speakers: list[str] | None = None,
+    ) -> RunResult:
+        """Run one agent turn under the process-wide model call cap."""
+        async with bout_scheduler.model_call():
+            return await runner.arun_streaming(
+                agent=agent,
+                conversation=conversation,
+                max_tokens=max_tokens,
+                on_token=self._token_forwarder(bout_id, agent.name),
+                hedge=hedge,
+                deadline=deadline,
+                other_speakers=other_speakers,
+            )
+
+    def _token_forwarder(self, bout_id: str, agent_name: str) -> Callable[[str], None] | None:
+        """Bind the on_token event to a single agent's turn."""
+        on_token = self.events.on_token
+        if not on_token:
+            return None
+
+        def forward(token: str) -> None:
+            if not self._lease_lost:  # A stalled owner's stream must not mix with its successor's
+                on_token(bout_id, agent_name, token)
+
+        return forward
 
     def _get_model_for_tier(self, tier: str) -> str:
         """Map tier name to model string."""
@@ -60,20 +263,28 @@ class Orchestrator:
             "unleashed": config.MODEL_UNLEASHED,
         }.get(tier, config.MODEL_STANDARD)
 
+    def _get_fallback_for_tier(self, tier: str) -> str | None:
+        """Map tier name to the model used while its own model is unavailable."""
+        return {
+            "standard": config.FALLBACK_STANDARD,
+            "juiced": config.FALLBACK_JUICED,
+            "unleashed": config.FALLBACK_UNLEASHED,
+        }.get(tier) or None
+
     def _get_turns_for_tier(self, tier: str, preset_max_turns: dict | None = None) -> int:
         """Map tier name to turn count.
-        
+
         Args:
             tier: Model tier (standard, juiced, unleashed)
             preset_max_turns: Optional per-preset turn overrides
-            
+
         Returns:
             Turn count for the tier, preferring preset override if available
         """
         # If preset has specific max_turns for this tier, use it
         if preset_max_turns and tier in preset_max_turns:
             return preset_max_turns[tier]
-        
+
         # Fall back to global config
         return {
             "standard": config.TURNS_STANDARD,
@@ -89,31 +300,36 @@ class Orchestrator:
             "unleashed": config.COST_CEILING_UNLEASHED,
         }.get(tier, config.COST_CEILING_STANDARD)
 
+    def _get_deadline_for_tier(self, tier: str) -> float:
+        """Map tier name to wall-clock budget in seconds."""
+        return {
+            "standard": config.DEADLINE_STANDARD,
+            "juiced": config.DEADLINE_JUICED,
+            "unleashed": config.DEADLINE_UNLEASHED,
+        }.get(tier, config.DEADLINE_STANDARD)
+
+    def _get_turn_deadline_for_tier(self, tier: str) -> float | None:
+        """Map tier name to the per-turn deadline in seconds (None = no deadline)."""
+        return {
+            "standard": config.TURN_DEADLINE_STANDARD,
+            "juiced": config.TURN_DEADLINE_JUICED,
+            "unleashed": config.TURN_DEADLINE_UNLEASHED,
+        }.get(tier, config.TURN_DEADLINE_STANDARD) or None
+
+    def _get_repetition_action_for_tier(self, tier: str) -> str:
+        """Map tier name to what to do when a bout starts repeating itself."""
+        return {
+            "standard": config.REPETITION_ACTION_STANDARD,
+            "juiced": config.REPETITION_ACTION_JUICED,
+            "unleashed": config.REPETITION_ACTION_UNLEASHED,
+        }.get(tier, config.REPETITION_ACTION_STANDARD)
+
     def create(self, bout_config: BoutConfig) -> Bout:
         """Create a new bout in pending state with agent records."""
-        bout = Bout(
-            preset_id=bout_config.preset_id,
-            status="pending",
-            model_tier=bout_config.model_tier,
-            topic=bout_config.topic,
-            agent_count=len(bout_config.agents),
-            ip_hash=bout_config.ip_hash,
-        )
+        bout, bout_agents = new_bout(bout_config)
         self.db.add(bout)
-        self.db.flush()  # Get bout.id before creating agents
-
-        # Create BoutAgent records for each agent
-        for position, agent in enumerate(bout_config.agents, start=1):
-            bout_agent = BoutAgent(
-                bout_id=bout.id,
-                agent_id=agent.id or agent.name.lower().replace(" ", "-"),
-                agent_name=agent.name,
-                agent_role=agent.role,
-                position=position,
-                team=agent.team,
-            )
-            self.db.add(bout_agent)
-
+        self.db.flush()  # Insert the bout before the agents that reference it
+        self.db.add_all(bout_agents)
         self.db.commit()
         self.db.refresh(bout)
         return bout
@@ -140,7 +356,10 @@ class Orchestrator:
 
     def run(self, bout: Bout, agents: list[AgentConfig]) -> Bout:
         """
-        Run a bout to completion.
+        Run a bout to completion (blocking).
+
+        Convenience wrapper around arun() for scripts and sync callers. Must not
+        be called from inside a running event loop — await arun() there instead.
 
         Args:
             bout: The bout record (must be in pending state)
@@ -149,114 +368,372 @@ class Orchestrator:
         Returns:
             The updated bout record
         """
-        if bout.status != "pending":
-            raise ValueError(f"Bout {bout.id} is not in pending state: {bout.status}")
 
-        # Update status
-        bout.status = "running"
-        self.db.commit()
+        async def run() -> Bout:
+            try:
+                return await self.arun(bout, agents)
+            finally:
+                # asyncpg connections belong to this loop; don't pool them past it
+                await async_engine.dispose()
+
+        return asyncio.run(run())
+
+    async def arun(self, bout: Bout, agents: list[AgentConfig]) -> Bout:
+        """
+        Run a bout to completion on the current event loop.
+
+        Model calls go through AsyncAnthropic, so a single process can hold many
+        concurrent bouts without a thread per bout. Event callbacks fire as each
+        turn starts and ends, not after the bout finishes.
+
+        Database writes go through a SessionSink: they are batched and each
+        flush is one short transaction on the asyncpg engine.
+
+        Each round's messages are written together with a checkpoint of the
+        turn state, so a bout parked by park() (or left pending by a drain)
+        resumes after its last written round instead of starting over.
+
+        Args:
+            bout: The bout record (pending, or already claimed by this orchestrator)
+            agents: List of agent configurations
+
+        Returns:
+            The updated bout record (still pending if it was parked)
+
+        Raises:
+            LeaseLost: The bout was reaped or taken over while running; nothing
+                more was written or published for it
+        """
+        claimed = bout.status == "running" and bout.lease_owner == self.lease_owner
+        if self._park_requested:
+            if claimed:  # Parked before it started; release the claim
+                bout.status = "pending"
+                bout.lease_owner = None
+                await asyncio.to_thread(self.db.commit)
+            return bout
+        # The session is synchronous, so its round trips run off the event loop
+        if not claimed and not (
+            bout.status == "pending" and await asyncio.to_thread(self.claim, bout)
+        ):
+            raise ValueError(f"Bout {bout.id} is not in pending state: {bout.status}")
+        if bout in self.db:
+            # Load what the claim's commit expired
+            await asyncio.to_thread(self.db.refresh, bout)
+        checkpoint = (bout.extra or {}).get("checkpoint")
+        if self._lease_lost:
+            raise LeaseLost(bout.id)
+        sink = SessionSink(bout.id, self.lease_owner)
+        beat = asyncio.create_task(heartbeat(bout.id, self.lease_owner, on_lost=self.lose_lease))
+        flusher = asyncio.create_task(sink.run())
+        flusher.add_done_callback(self._on_flusher_done)
 
         try:
             # Initialize components (inside try so failures mark bout as error)
             model = self._get_model_for_tier(bout.model_tier)
             cost_ceiling = self._get_cost_ceiling_for_tier(bout.model_tier)
-            
-            # Load preset's max_turns if available
+            time_budget = self._get_deadline_for_tier(bout.model_tier)
+            turn_deadline = self._get_turn_deadline_for_tier(bout.model_tier)
+            repetition_action = self._get_repetition_action_for_tier(bout.model_tier)
+            deadline = time.monotonic() + time_budget
+
+            # Load preset's max_turns, compaction and turn pattern if available
             preset_max_turns = None
+            compaction = None
+            turn_pattern = None
             if bout.preset_id:
                 preset = preset_loader.load_one(bout.preset_id)
                 if preset and preset.max_turns:
                     preset_max_turns = preset.max_turns
-            
+                if preset:
+                    compaction = CompactionConfig.from_preset(preset.compaction)
+                    turn_pattern = preset.turn_pattern
+
             max_turns = self._get_turns_for_tier(bout.model_tier, preset_max_turns)
 
-            runner = AgentRunner(model=model)
-            turn_manager = TurnManager(agents)
+            fallback_model = self._get_fallback_for_tier(bout.model_tier)
+            runner = AgentRunner(model=model, fallback_model=fallback_model)
+            turn_manager = TurnManager(
+                agents, compaction=compaction, plan=get_turn_plan(turn_pattern)
+            )
             meter = TokenMeter(budget=cost_ceiling)
+            detector = RepetitionDetector()
+            steered = bool(checkpoint and checkpoint.get("steered"))
 
             # Seed the conversation with initial context (Anthropic requires at least one message)
             initial_prompt = bout.topic if bout.topic else "Begin."
-            turn_manager.state.conversation.append({
-                "role": "user",
-                "content": initial_prompt,
-            })
-
-            for turn_num, agent in turn_manager.turns(max_turns):
-                # Emit turn start event
+            turn_manager.seed(initial_prompt)
+            if checkpoint:
+                await asyncio.to_thread(
+                    self._restore, bout, checkpoint, turn_manager, meter, model, detector
+                )
+            # Hand the connection back to the pool; from here on writes go through the sink
+            await asyncio.to_thread(self.db.close)
+
+            parked = False
+            end_reason = "max_turns"
+
+            for group in turn_manager.rounds(max_turns):
+                if self._cancel_reason or self._lease_lost:
+                    break
+
+                # Every responder in a group sees the same snapshot
+                conversation = turn_manager.conversation
+
+                # Each agent's learned output budget, then sized to what's left of the
+                # cost budget: shrink max_tokens, or end the bout now rather than
+                # dispatch calls that would overshoot
+                learned = {
+                    agent.name: output_budgets.max_tokens(
+                        bout.preset_id, agent.name, bout.model_tier, config.MAX_TOKENS_PER_TURN
+                    )
+                    for _, agent in group
+                }
+                # Priced at the model the turns will go to: the fallback only while
+                # the tier's own model has its circuit open
+                priced_model = model
+                if fallback_model and circuit_breakers.get(model).tripped:
+                    priced_model = fallback_model
+                max_tokens = meter.affordable_max_tokens(
+                    priced_model,
+                    [
+                        (agent.name, estimate_prompt_tokens(agent.system_prompt, conversation))
+                        for _, agent in group
+                    ],
+                    max(learned.values()),
+                )
+                if max_tokens < config.MIN_TOKENS_PER_TURN:
+                    if self.events.on_error:
+                        self.events.on_error(
+                            bout.id,
+                            f"Cost ceiling reached (${cost_ceiling:.2f}). "
+                            f"Bout completed early at turn {group[0][0]}.",
+                        )
+                    end_reason = "cost_ceiling"
+                    break
+
+                # Emit turn start events
                 if self.events.on_turn_start:
-                    self.events.on_turn_start(bout.id, agent.name, turn_num)
-
+                    for turn_num, agent in group:
+                        self.events.on_turn_start(bout.id, agent.name, turn_num)
+
+                # Run the agents concurrently, forwarding text deltas as they arrive;
+                # in-flight calls are cancelled if the bout runs out of time or cancel().
+                # Hedge spend counts toward whether to hedge, not toward the bout's cost
+                hedge = config.HEDGE_REQUESTS and meter.can_hedge()
+                self._round = asyncio.gather(
+                    *(
+                        self._run_agent(
+                            runner,
+                            bout.id,
+                            agent,
+                            conversation,
+                            max_tokens=min(max_tokens, learned[agent.name]),
+                            hedge=hedge,
+                            deadline=turn_deadline,
+                            other_speakers=turn_manager.other_speakers(agent),
+                        )
+                        for _, agent in group
+                    ),
+                    return_exceptions=True,
+                )
                 try:
-                    # Run the agent
-                    result = runner.run(
-                        agent=agent,
-                        conversation=turn_manager.conversation,
-                        max_tokens=config.MAX_TOKENS_PER_TURN,
+                    results = await asyncio.wait_for(
+                        self._round, timeout=max(0.0, deadline - time.monotonic())
                     )
-
-                    # Record token usage
-                    meter.record(result.tokens_in, result.tokens_out, result.model_used)
-
-                    # Save message to database
-                    message = Message(
-                        bout_id=bout.id,
-                        agent_name=agent.name,
-                        agent_role=agent.role,
-                        turn_number=turn_num,
-                        content=result.content,
-                        tokens_in=result.tokens_in,
-                        tokens_out=result.tokens_out,
-                        model_used=result.model_used,
-                        latency_ms=result.latency_ms,
-                    )
-                    self.db.add(message)
-                    self.db.commit()
-
-                    # Advance turn
-                    turn_manager.advance_turn(result.content)
-
-                    # Emit turn end event
-                    if self.events.on_turn_end:
-                        self.events.on_turn_end(bout.id, agent.name, turn_num, message.id)
-
-                    # Check budget — end gracefully if ceiling hit
-                    if meter.is_over_budget():
-                        if self.events.on_error:
-                            self.events.on_error(
-                                bout.id,
-                                f"Cost ceiling reached (${cost_ceiling:.2f}). "
-                                f"Bout completed early at turn {turn_num}."
+                except asyncio.CancelledError:
+                    if self._cancel_reason is None and not self._lease_lost:
+                        raise  # The bout's own task was cancelled
+                    break
+                except asyncio.TimeoutError:
+                    bout.status = "timeout"
+                    if self.events.on_error:
+                        self.events.on_error(
+                            bout.id,
+                            f"Time limit reached ({time_budget:.0f}s). "
+                            f"Bout ended at turn {group[0][0]}.",
+                        )
+                    break
+                finally:
+                    self._round = None
+
+                # Merge in group order so transcripts are deterministic
+                contents: list[str | None] = []
+                finished: list[tuple[int, str, str]] = []
+                for (turn_num, agent), result in zip(group, results):
+                    try:
+                        if isinstance(result, BaseException):
+                            raise result
+
+                        # Record token usage
+                        meter.record(
+                            result.tokens_in,
+                            result.tokens_out,
+                            result.model_used,
+                            tokens_cache_write=result.tokens_cache_write,
+                            tokens_cache_read=result.tokens_cache_read,
+                            agent=agent.name,
+                        )
+                        if result.loser:
+                            meter.record_hedge(
+                                result.loser.tokens_in,
+                                result.loser.tokens_out,
+                                result.loser.model_used,
+                                tokens_cache_write=result.loser.tokens_cache_write,
+                                tokens_cache_read=result.loser.tokens_cache_read,
                             )
-                        break
 
-                except Exception as e:
-                    turn_manager.record_failure()
+                        # Queue the message; written with the round's checkpoint
+                        message_id = generate_message_id()
+                        sink.add_message(
+                            {
+                                "id": message_id,
+                                "bout_id": bout.id,
+                                "agent_name": agent.name,
+                                "agent_role": agent.role,
+                                "turn_number": turn_num,
+                                "content": result.content,
+                                "tokens_in": result.tokens_in,
+                                "tokens_out": result.tokens_out,
+                                "tokens_cache_write": result.tokens_cache_write,
+                                "tokens_cache_read": result.tokens_cache_read,
+                                "model_used": result.model_used,
+                                "created_at": datetime.now(timezone.utc),
+                                "latency_ms": result.latency_ms,
+                                "truncated": result.truncated,
+                            }
+                        )
+
+                        contents.append(result.content)
+                        finished.append((turn_num, agent.name, message_id))
+
+                    except Exception as e:
+                        contents.append(None)
+                        if self.events.on_error:
+                            self.events.on_error(bout.id, str(e))
+
+                # Advance turn (an all-failed group counts as one failure)
+                turn_manager.advance_round(contents)
+                for content in contents:
+                    if content is not None:
+                        detector.observe(content)
+
+                # A bout going in circles is steered back once, then ended
+                looping = (
+                    repetition_action != REPETITION_OFF
+                    and detector.repeating
+                    and turn_manager.turn_number < max_turns
+                )
+                if looping and repetition_action == REPETITION_STEER and not steered:
+                    turn_manager.steer(steer_note([agent.name for agent in agents]))
+                    detector.reset()
+                    steered = True
+                    looping = False
+
+                self._checkpoint(bout, sink, turn_manager, meter, steered)
+                await sink.flush_if_due()
+                if self._lease_lost:
+                    break
+
+                # Emit turn end events
+                if self.events.on_turn_end:
+                    for turn_num, agent_name, message_id in finished:
+                        self.events.on_turn_end(bout.id, agent_name, turn_num, message_id)
+
+                if turn_manager.should_abort():
+                    bout.status = "error"
+                    break
+
+                if looping:
+                    end_reason = "repetition"
+                    break
+
+                # Check budget — end gracefully if ceiling hit
+                if meter.is_over_budget():
                     if self.events.on_error:
-                        self.events.on_error(bout.id, str(e))
-
-                    if turn_manager.should_abort():
-                        bout.status = "error"
-                        break
+                        self.events.on_error(
+                            bout.id,
+                            f"Cost ceiling reached (${cost_ceiling:.2f}). "
+                            f"Bout completed early at turn {group[-1][0]}.",
+                        )
+                    end_reason = "cost_ceiling"
+                    break
+
+                if self._park_requested and turn_manager.turn_number < max_turns:
+                    parked = True
+                    break
+
+            if self._lease_lost:
+                raise LeaseLost(bout.id)
+            if self._cancel_reason:
+                bout.status = "cancelled"
+                if self.events.on_error:
+                    self.events.on_error(bout.id, self._cancel_reason)
+            elif parked:
+                self._save(bout, sink, status="pending", lease_owner=None)
+                await sink.flush()
+                return bout
 
             # Complete the bout
             if bout.status == "running":
                 bout.status = "complete"
 
-            bout.total_turns = turn_manager.turn_number
-            bout.token_cost = meter.total_cost
-            bout.completed_at = datetime.now(timezone.utc)
-            self.db.commit()
+            extra = {k: v for k, v in (bout.extra or {}).items() if k != "checkpoint"}
+            if bout.status == "complete":
+                extra["end_reason"] = end_reason
+            if meter.hedge_records:
+                extra["hedges"] = {
+                    "count": len(meter.hedge_records),
+                    "cost": round(meter.hedge_cost, 6),
+                }
+            self._save(
+                bout,
+                sink,
+                status=bout.status,
+                total_turns=turn_manager.turn_number,
+                token_cost=meter.total_cost,
+                completed_at=datetime.now(timezone.utc),
+                extra=extra or None,
+            )
+            await sink.flush()
 
-            # Emit completion event
+            # Emit completion event (why it ended: end_reason if complete, else the status)
             if self.events.on_bout_complete:
-                self.events.on_bout_complete(bout.id, meter.total_cost)
+                reason = end_reason if bout.status == "complete" else bout.status
+                self.events.on_bout_complete(bout.id, meter.total_cost, reason)
+
+        except LeaseLost:
+            self._lease_lost = True
+            raise
 
         except Exception as e:
-            bout.status = "error"
-            bout.completed_at = datetime.now(timezone.utc)
-            self.db.commit()
+            self._save(bout, sink, status="error", completed_at=datetime.now(timezone.utc))
+            await sink.close()
             if self.events.on_error:
                 self.events.on_error(bout.id, str(e))
             raise
 
+        finally:
+            beat.cancel()
+            flusher.cancel()
+            if not self._lease_lost:
+                await sink.close()  # Whatever a cancelled task left queued
+
         return bout
+
+
+async def drain(running: Iterable[tuple[Orchestrator, asyncio.Task]], timeout: float) -> None:
+    """
+    Give in-flight bouts up to `timeout` seconds to finish, then park the rest.
+
+    Parked bouts complete their current round and return to pending with a
+    checkpoint; this waits until they have.
+    """
+    running = list(running)
+    if not running:
+        return
+    _, pending = await asyncio.wait([task for _, task in running], timeout=timeout)
+    for orchestrator, task in running:
+        if task in pending:
+            orchestrator.park()
+    if pending:
+        await asyncio.wait(pending)
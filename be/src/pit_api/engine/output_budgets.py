@@ -0,0 +1,152 @@
+"""Output budgets — per-persona max_tokens learned from past turns.
+
+Every agent used to get MAX_TOKENS_PER_TURN, though some personas are
+prompted for one-liners and others ramble to the cap. A background refresh
+computes, per (preset, agent, tier), the OUTPUT_BUDGET_PERCENTILE of
+Message.tokens_out over the last OUTPUT_BUDGET_LOOKBACK_DAYS and caches it
+in-process; the orchestrator caps each agent's max_tokens at that plus
+OUTPUT_BUDGET_HEADROOM. Agents with fewer than OUTPUT_BUDGET_MIN_SAMPLES
+turns, and custom bouts, keep the default.
+
+The percentile query is the expensive part, so only one process runs it per
+interval: under an advisory lock, and only if the last stored result is
+stale. The result is stored as an "output_budgets" Metric; every other API
+and worker process loads that row. Refreshes run in a thread, off the
+event loop.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from pit_api.config import config
+from pit_api.models import Bout, Message, Metric
+from pit_api.models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+BudgetKey = tuple[str, str, str]  # (preset_id, agent_name, model_tier)
+
+BUDGETS_EVENT = "output_budgets"
+_REFRESH_LOCK = 0x6F75_7462  # pg advisory lock key: one process computes at a time
+
+
+class OutputBudgets:
+    """In-process cache of learned max_tokens per (preset, agent, tier)."""
+
+    def __init__(self):
+        self._budgets: dict[BudgetKey, int] = {}
+        self.refreshed_at: datetime | None = None
+
+    def max_tokens(self, preset_id: str | None, agent_name: str, tier: str, default: int) -> int:
+        """The learned max_tokens for an agent, never above default."""
+        if preset_id is None:
+            return default
+        budget = self._budgets.get((preset_id, agent_name, tier))
+        if budget is None:
+            return default
+        return min(default, budget)
+
+    def load(self, rows: Iterable[tuple[str, str, str, float, int]]) -> None:
+        """Replace the cache from (preset_id, agent_name, tier, percentile, samples) rows."""
+        budgets = {}
+        for preset_id, agent_name, tier, percentile, samples in rows:
+            if samples < config.OUTPUT_BUDGET_MIN_SAMPLES:
+                continue
+            budget = math.ceil(percentile * (1 + config.OUTPUT_BUDGET_HEADROOM))
+            budgets[(preset_id, agent_name, tier)] = max(config.MIN_TOKENS_PER_TURN, budget)
+        self._budgets = budgets
+        self.refreshed_at = datetime.now(timezone.utc)
+
+    def refresh(self, db: Session, max_age: float | None = None) -> None:
+        """
+        Load the stored budgets, recomputing them first if older than max_age seconds.
+
+        Processes that find the result stale queue on the advisory lock; the
+        first recomputes, the rest then find it fresh.
+        """
+        if max_age is None:
+            max_age = config.OUTPUT_BUDGET_INTERVAL / 2
+        latest = self._latest(db)
+        if self._stale(latest, max_age):
+            db.execute(select(func.pg_advisory_xact_lock(_REFRESH_LOCK)))
+            latest = self._latest(db)
+            if self._stale(latest, max_age):
+                rows = [list(row) for row in self.compute(db)]
+                Metric.log(db, BUDGETS_EVENT, payload={"rows": rows})  # Commit releases the lock
+                self.load(rows)
+                return
+            db.commit()
+        self.load(latest.payload["rows"])
+
+    @staticmethod
+    def _latest(db: Session) -> Metric | None:
+        return (
+            db.query(Metric)
+            .filter(Metric.event == BUDGETS_EVENT)
+            .order_by(Metric.created_at.desc())
+            .first()
+        )
+
+    @staticmethod
+    def _stale(latest: Metric | None, max_age: float) -> bool:
+        if latest is None:
+            return True
+        age = datetime.now(timezone.utc) - latest.created_at
+        return age.total_seconds() >= max_age
+
+    def compute(self, db: Session) -> list[tuple[str, str, str, float, int]]:
+        """Run the percentile query over recent messages."""
+        since = datetime.now(timezone.utc) - timedelta(days=config.OUTPUT_BUDGET_LOOKBACK_DAYS)
+        return db.execute(
+            select(
+                Bout.preset_id,
+                Message.agent_name,
+                Bout.model_tier,
+                func.percentile_cont(config.OUTPUT_BUDGET_PERCENTILE / 100).within_group(
+                    Message.tokens_out
+                ),
+                func.count(),
+            )
+            .join(Bout, Bout.id == Message.bout_id)
+            .where(
+                Bout.preset_id.is_not(None),
+                Message.created_at >= since,
+                Message.truncated.is_(False),  # Cut off by the deadline, not by choice
+            )
+            .group_by(Bout.preset_id, Message.agent_name, Bout.model_tier)
+        ).all()
+
+    async def run(self, interval: float | None = None) -> None:
+        """Refresh the budgets now and then every interval until cancelled."""
+        if interval is None:
+            interval = config.OUTPUT_BUDGET_INTERVAL
+        while True:
+            try:
+                await asyncio.to_thread(self._refresh_once, interval / 2)
+            except Exception:
+                logger.exception("Output budget refresh failed")
+            await asyncio.sleep(interval)
+
+    def _refresh_once(self, max_age: float) -> None:
+        db = SessionLocal()
+        try:
+            self.refresh(db, max_age)
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """Snapshot for health/metrics endpoints."""
+        return {
+            "learned": len(self._budgets),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+
+# Global singleton
+output_budgets = OutputBudgets()
@@ -0,0 +1,174 @@
+"""Persistence — where the orchestrator writes a bout's turns and progress.
+
+The orchestrator used to hold one Session for the whole bout and commit
+every round through it; expired instances reloaded on the next attribute
+access, so the session kept a pooled connection checked out across the
+model calls. It now queues writes on a sink instead. SessionSink buffers
+message rows and the bout's latest column values and writes them in one
+short transaction: when PERSIST_BATCH_SIZE messages are waiting, at least
+every PERSIST_FLUSH_INTERVAL seconds, and when the bout ends. A connection
+is only checked out for the length of a flush, and flushes go through the
+asyncpg engine so the event loop never blocks on the database.
+
+Messages and the checkpoint that covers them are always written together,
+so a resumed bout never sees one without the other; a crash loses at most
+the last flush interval, which the resumed bout replays.
+
+Writes are fenced by the bout's lease: a flush only commits while the bout
+is still running under the sink's lease owner, and raises LeaseLost once it
+was reaped or taken over, so a stalled owner can't overwrite its successor.
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pit_api.config import config
+from pit_api.models import Bout, Message
+from pit_api.models.base import AsyncSessionLocal
+
+from .watchdog import LeaseLost
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceSink(ABC):
+    """Write-behind storage for one bout's turns and progress."""
+
+    @abstractmethod
+    def add_message(self, row: dict[str, Any]) -> None:
+        """Queue a Message row (with its id already set) for insertion."""
+
+    @abstractmethod
+    def update_bout(self, **values: Any) -> None:
+        """Queue column values for the bout; later values replace earlier ones."""
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+
+    async def flush_if_due(self) -> None:
+        """Flush if enough is queued to be worth a round trip (default: always)."""
+        await self.flush()
+
+    async def run(self) -> None:
+        """Flush in the background while the bout runs (default: nothing to do)."""
+
+    async def close(self) -> None:
+        """Flush what's left when the bout stops; failures are logged, not raised."""
+        try:
+            await self.flush()
+        except LeaseLost as e:
+            logger.warning("Dropped final writes: %s", e)
+        except Exception:
+            logger.exception("Final flush failed")
+
+
+class SessionSink(PersistenceSink):
+    """Batches a bout's writes into short-lived sessions."""
+
+    def __init__(
+        self,
+        bout_id: str,
+        lease_owner: str,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+    ):
+        self.bout_id = bout_id
+        self.lease_owner = lease_owner
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size or config.PERSIST_BATCH_SIZE
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else config.PERSIST_FLUSH_INTERVAL
+        )
+        self._messages: list[dict[str, Any]] = []
+        self._bout_values: dict[str, Any] = {}
+        self._queued_at: float | None = None  # When the oldest unflushed write was queued
+        self._last_write: asyncio.Task | None = None
+
+    def add_message(self, row: dict[str, Any]) -> None:
+        self._messages.append(row)
+        self._mark_queued()
+
+    def update_bout(self, **values: Any) -> None:
+        self._bout_values.update(values)
+        self._mark_queued()
+
+    async def flush(self) -> None:
+        # Shielded: a cancelled caller doesn't abort a write mid-transaction; the
+        # write task settles the buffers on its own
+        self._last_write = asyncio.ensure_future(self._write_queued(self._last_write))
+        await asyncio.shield(self._last_write)
+
+    async def flush_if_due(self) -> None:
+        if len(self._messages) >= self.batch_size or self._overdue():
+            await self.flush()
+
+    async def run(self) -> None:
+        """Flush queued writes every flush_interval until cancelled or the lease is lost."""
+        if self.flush_interval <= 0:
+            return  # Every round is flushed as it ends
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except LeaseLost:
+                raise
+            except Exception:
+                logger.exception("Flush failed for bout %s", self.bout_id)
+
+    async def _write_queued(self, previous: asyncio.Task | None) -> None:
+        """Write what is queued once the previous write is done, in order."""
+        if previous is not None:
+            await asyncio.wait([previous])
+        if not self._messages and not self._bout_values:
+            return
+        messages, values, queued_at = self._messages, self._bout_values, self._queued_at
+        self._messages, self._bout_values, self._queued_at = [], {}, None
+        try:
+            await self._write(messages, values)
+        except BaseException:
+            # Requeued ahead of anything newer, so the next flush retries them
+            self._messages = messages + self._messages
+            self._bout_values = {**values, **self._bout_values}
+            self._queued_at = queued_at
+            raise
+
+    async def _write(self, messages: list[dict[str, Any]], values: dict[str, Any]) -> None:
+        async with self.session_factory() as db:
+            # Locks the bout row while it is still ours, so the reaper can't
+            # take it between this check and the commit
+            owned = (
+                await db.execute(
+                    select(Bout.id)
+                    .where(
+                        Bout.id == self.bout_id,
+                        Bout.lease_owner == self.lease_owner,
+                        Bout.status == "running",
+                    )
+                    .with_for_update()
+                )
+            ).first()
+            if owned is None:
+                raise LeaseLost(self.bout_id)
+            if messages:
+                await db.execute(insert(Message), messages)
+            if values:
+                await db.execute(update(Bout).where(Bout.id == self.bout_id).values(**values))
+            await db.commit()
+
+    def _mark_queued(self) -> None:
+        if self._queued_at is None:
+            self._queued_at = time.monotonic()
+
+    def _overdue(self) -> bool:
+        return (
+            self._queued_at is not None
+            and time.monotonic() - self._queued_at >= self.flush_interval
+        )
@@ -0,0 +1,83 @@
+"""Repetition detection — notice when a bout starts going in circles.
+
+Long bouts tend to loop: agents repeat catchphrases and restate positions
+while the turns get more expensive. Each turn is split into word n-gram
+shingles and scored by the share of its shingles already said in the last
+REPETITION_WINDOW turns (by anyone). The window's shingles are kept as a
+running multiset, so scoring a turn costs only that turn's length. After
+REPETITION_STRIKES repetitive turns in a row the bout counts as degenerate
+and the orchestrator steers or ends it, per the tier's REPETITION_ACTION.
+"""
+
+import re
+from collections import Counter, deque
+
+from pit_api.config import config
+
+REPETITION_STEER = "steer"  # Nudge the agents once, end the bout if it keeps looping
+REPETITION_END = "end"
+REPETITION_OFF = "off"
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int) -> set[tuple[str, ...]]:
+    """The distinct word n-grams of text (the whole text if shorter than size)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def steer_note(names: list[str]) -> str:
+    """The moderator message sent when a bout starts repeating itself."""
+    return (
+        f"[Moderator]: {', '.join(names)}: you are going in circles. "
+        "Move on with new arguments and don't repeat earlier lines."
+    )
+
+
+class RepetitionDetector:
+    """Incremental repetition score over a sliding window of turns."""
+
+    def __init__(
+        self,
+        window: int | None = None,
+        shingle_size: int | None = None,
+        threshold: float | None = None,
+        strikes: int | None = None,
+    ):
+        self.shingle_size = shingle_size or config.REPETITION_SHINGLE_SIZE
+        self.threshold = threshold if threshold is not None else config.REPETITION_THRESHOLD
+        self.strikes = strikes or config.REPETITION_STRIKES
+        self._recent: deque[set[tuple[str, ...]]] = deque(maxlen=window or config.REPETITION_WINDOW)
+        self._seen: Counter[tuple[str, ...]] = Counter()  # Shingles in _recent
+        self.streak = 0  # Consecutive turns at or above threshold
+        self.last_score = 0.0
+
+    def observe(self, content: str) -> float:
+        """Score a turn against the window, then add it to the window."""
+        current = shingles(content, self.shingle_size)
+        if current:
+            self.last_score = sum(1 for s in current if s in self._seen) / len(current)
+        else:
+            self.last_score = 1.0  # An empty turn adds nothing new
+        self.streak = self.streak + 1 if self.last_score >= self.threshold else 0
+
+        if len(self._recent) == self._recent.maxlen:
+            for shingle in self._recent[0]:  # In place: only the dropped turn's shingles
+                self._seen[shingle] -= 1
+                if not self._seen[shingle]:
+                    del self._seen[shingle]
+        self._recent.append(current)
+        self._seen.update(current)
+        return self.last_score
+
+    @property
+    def repeating(self) -> bool:
+        """Whether the last REPETITION_STRIKES turns were all repetitive."""
+        return self.streak >= self.strikes
+
+    def reset(self) -> None:
+        """Start counting strikes afresh (e.g. after steering the bout)."""
+        self.streak = 0
@@ -0,0 +1,181 @@
+"""BoutScheduler — process-wide admission control for bouts and model calls."""
+
+import asyncio
+import itertools
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+from pit_api.config import config
+
+# Lower runs first: paid tiers jump the queue
+TIER_PRIORITY = {
+    "unleashed": 0,
+    "juiced": 1,
+    "standard": 2,
+}
+
+
+@dataclass
+class _Waiter:
+    """A bout waiting for a slot."""
+
+    tier_rank: int
+    ip_hash: str | None
+    seq: int
+    future: asyncio.Future = field(repr=False)
+    on_queued: Callable[[int], None] | None = None
+    position: int = 0
+
+
+class BoutScheduler:
+    """
+    Caps concurrent bouts and in-flight model calls for this process.
+
+    Bouts beyond max_bouts wait in a queue ordered by tier (paid tiers first),
+    then by how many bouts the same ip_hash already has running (fair share),
+    then arrival order. Waiters are told their 1-based queue position whenever
+    it changes.
+    """
+
+    def __init__(self, max_bouts: int | None = None, max_model_calls: int | None = None):
+        """Initialize with optional limit overrides (defaults from config)."""
+        self.max_bouts = max_bouts or config.MAX_CONCURRENT_BOUTS
+        self.max_model_calls = max_model_calls or config.MAX_INFLIGHT_MODEL_CALLS
+        self._running: Counter[str | None] = Counter()
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._model_calls: asyncio.Semaphore | None = None
+        self._in_flight_calls = 0
+
+    @property
+    def running(self) -> int:
+        """Number of bouts currently holding a slot."""
+        return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        """Number of bouts waiting for a slot."""
+        return len(self._waiters)
+
+    def stats(self) -> dict:
+        """Snapshot for health/metrics endpoints."""
+        return {
+            "running_bouts": self.running,
+            "queued_bouts": self.queued,
+            "max_bouts": self.max_bouts,
+            "in_flight_model_calls": self._in_flight_calls,
+            "max_model_calls": self.max_model_calls,
+        }
+
+    @asynccontextmanager
+    async def bout_slot(
+        self,
+        tier: str,
+        ip_hash: str | None = None,
+        on_queued: Callable[[int], None] | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold a bout slot for the duration of the block.
+
+        Args:
+            tier: Model tier, used for priority
+            ip_hash: Requester, used for fair share between requesters
+            on_queued: Called with the queue position while waiting
+        """
+        await self._acquire(tier, ip_hash, on_queued)
+        try:
+            yield
+        finally:
+            self._release(ip_hash)
+
+    @asynccontextmanager
+    async def model_call(self) -> AsyncIterator[None]:
+        """Hold one of the process-wide in-flight model call permits."""
+        async with self._permits():
+            self._in_flight_calls += 1
+            try:
+                yield
+            finally:
+                self._in_flight_calls -= 1
+
+    async def try_model_call(self) -> bool:
+        """
+        Take a model call permit only if one is free now, for calls that are
+        worth making only without waiting (hedges). Pair with release_model_call().
+        """
+        permits = self._permits()
+        if permits.locked():
+            return False
+        await permits.acquire()  # Free, so this returns without waiting
+        self._in_flight_calls += 1
+        return True
+
+    def release_model_call(self) -> None:
+        """Give back a permit taken with try_model_call()."""
+        self._in_flight_calls -= 1
+        self._permits().release()
+
+    def _permits(self) -> asyncio.Semaphore:
+        if self._model_calls is None:
+            self._model_calls = asyncio.Semaphore(self.max_model_calls)
+        return self._model_calls
+
+    async def _acquire(
+        self,
+        tier: str,
+        ip_hash: str | None,
+        on_queued: Callable[[int], None] | None,
+    ) -> None:
+        if self.running < self.max_bouts and not self._waiters:
+            self._running[ip_hash] += 1
+            return
+
+        waiter = _Waiter(
+            tier_rank=TIER_PRIORITY.get(tier, len(TIER_PRIORITY)),
+            ip_hash=ip_hash,
+            seq=next(self._seq),
+            future=asyncio.get_running_loop().create_future(),
+            on_queued=on_queued,
+        )
+        self._waiters.append(waiter)
+        self._update_positions()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._update_positions()
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Granted a slot in the same tick we were cancelled
+                self._release(ip_hash)
+            raise
+
+    def _release(self, ip_hash: str | None) -> None:
+        self._running[ip_hash] -= 1
+        if self._running[ip_hash] <= 0:
+            del self._running[ip_hash]
+
+        while self._waiters and self.running < self.max_bouts:
+            waiter = min(self._waiters, key=self._priority)
+            self._waiters.remove(waiter)
+            self._running[waiter.ip_hash] += 1
+            waiter.future.set_result(None)
+        self._update_positions()
+
+    def _priority(self, waiter: _Waiter) -> tuple[int, int, int]:
+        return (waiter.tier_rank, self._running[waiter.ip_hash], waiter.seq)
+
+    def _update_positions(self) -> None:
+        """Recompute queue order and notify waiters whose position changed."""
+        for position, waiter in enumerate(sorted(self._waiters, key=self._priority), start=1):
+            if waiter.position != position:
+                waiter.position = position
+                if waiter.on_queued:
+                    waiter.on_queued(position)
+
+
+# Global singleton
+bout_scheduler = BoutScheduler()
@@ -0,0 +1,137 @@
+"""Speaker guard — stop agents from writing the other agents' lines.
+
+History is fed to the model as "[Name]: content" lines, so models tend to
+carry on the script and write lines for the other speakers, spending output
+tokens on text that would then be shown as one agent's message. Each turn
+is sent with stop sequences for the other agents' prefixes, and whatever
+still slips through (e.g. a prefix wrapped in markdown) is trimmed, both
+from the stored message and from the live token stream.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from .token_meter import estimate_tokens
+
+
+def stop_sequences(other_speakers: list[str]) -> list[str]:
+    """Stop sequences for other speakers starting a line of their own."""
+    return [f"\n[{name}]:" for name in other_speakers]
+
+
+def _hijack_pattern(other_speakers: list[str]) -> re.Pattern:
+    """A line starting with another speaker's prefix, markdown-wrapped or not."""
+    names = "|".join(re.escape(name) for name in other_speakers)
+    return re.compile(rf"^[ \t*_>#]*\[(?:{names})\][*_]*\s*:", re.MULTILINE)
+
+
+def trim_hijack(content: str, other_speakers: list[str]) -> str:
+    """Cut content at the first line where another speaker's prefix begins."""
+    if not other_speakers:
+        return content
+    match = _hijack_pattern(other_speakers).search(content)
+    if match is None or match.start() == 0:
+        return content  # A reply that is all hijack is kept rather than emptied
+    return content[: match.start()].rstrip()
+
+
+class HijackFilter:
+    """
+    Forward a turn's text deltas, holding back what trim_hijack() may cut.
+
+    Trailing whitespace, and trailing lines that could still turn into
+    another speaker's prefix, wait for the next delta to decide them. Once a
+    prefix appears nothing more is forwarded, so viewers see exactly the
+    text that is stored.
+    """
+
+    def __init__(self, other_speakers: list[str], on_token: Callable[[str], None]):
+        self.other_speakers = other_speakers
+        self.on_token = on_token
+        self._pattern = _hijack_pattern(other_speakers)
+        self._text = ""
+        self._held = 0  # Start of the held-back lines
+        self._forwarded = 0
+        self._decided = False  # A prefix was found; the rest is cut (or all kept)
+
+    def feed(self, delta: str) -> None:
+        """Take the next text delta and forward whatever is now certain to be kept."""
+        self._text += delta
+        if self._decided:
+            return
+        match = self._pattern.search(self._text, self._held)
+        if match is not None and match.start() == 0:
+            self._decided = True  # Kept whole, like trim_hijack()
+            self._forward(self._text)
+        elif match is not None:
+            self._decided = True
+            self._forward(self._text[: match.start()].rstrip())
+        else:
+            self._held = self._hold_from()
+            self._forward(self._text[: self._held].rstrip())
+
+    def finish(self, content: str) -> None:
+        """Forward the rest of the turn's final (trimmed) content."""
+        self._forward(content)
+
+    def _forward(self, kept: str) -> None:
+        if len(kept) > self._forwarded:
+            self.on_token(kept[self._forwarded :])
+            self._forwarded = len(kept)
+
+    def _hold_from(self) -> int:
+        """The earliest line start from which the text could still become a prefix."""
+        held = len(self._text)
+        start = self._text.rfind("\n") + 1
+        while self._could_become_prefix(self._text[start:]):
+            held = start
+            if start <= self._held:
+                break
+            start = self._text.rfind("\n", 0, start - 1) + 1
+        return held
+
+    def _could_become_prefix(self, tail: str) -> bool:
+        rest = tail.lstrip(" \t*_>#")
+        if not rest.strip():
+            return True
+        if rest[0] != "[":
+            return False
+        rest = rest[1:]
+        for name in self.other_speakers:
+            if name.startswith(rest):
+                return True
+            if rest.startswith(name + "]") and not rest[len(name) + 1 :].lstrip("*_").strip():
+                return True
+        return False
+
+
+@dataclass
+class SpeakerGuardStats:
+    """Process-wide counters of output cut short or trimmed."""
+
+    stop_hits: int = 0  # Turns ended by an other-speaker stop sequence
+    tokens_saved: int = 0  # Upper bound: max_tokens the stopped turns did not use
+    trimmed_turns: int = 0
+    tokens_trimmed: int = 0  # Estimated; paid for but not shown
+
+    def record(self, stopped: bool, unused_tokens: int, trimmed: str) -> None:
+        if stopped:
+            self.stop_hits += 1
+            self.tokens_saved += max(0, unused_tokens)
+        if trimmed:
+            self.trimmed_turns += 1
+            self.tokens_trimmed += estimate_tokens(trimmed)
+
+    def stats(self) -> dict:
+        """Snapshot for health/metrics endpoints."""
+        return {
+            "stop_hits": self.stop_hits,
+            "tokens_saved": self.tokens_saved,
+            "trimmed_turns": self.trimmed_turns,
+            "tokens_trimmed": self.tokens_trimmed,
+        }
+
+
+# Global singleton
+speaker_guard = SpeakerGuardStats()
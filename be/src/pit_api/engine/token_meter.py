@@ -1,15 +1,44 @@
 """TokenMeter — tracks token usage and costs per bout."""
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from pit_api.config import config
 
-# Pricing per million tokens (input/output)
+# Pricing per million tokens (input/output/cache write/cache read)
+# Cache writes (5-minute TTL) bill at 1.25x input, cache reads at 0.1x input.
 MODEL_PRICING = {
-    config.MODEL_STANDARD: (1.00, 5.00),  # Haiku 4.5
-    config.MODEL_JUICED: (3.00, 15.00),  # Sonnet 4.5
-    config.MODEL_UNLEASHED: (5.00, 25.00),  # Opus 4.5
+    config.MODEL_STANDARD: (1.00, 5.00, 1.25, 0.10),  # Haiku 4.5
+    config.MODEL_JUICED: (3.00, 15.00, 3.75, 0.30),  # Sonnet 4.5
+    config.MODEL_UNLEASHED: (5.00, 25.00, 6.25, 0.50),  # Opus 4.5
 }
+DEFAULT_PRICING = MODEL_PRICING[config.MODEL_STANDARD]
+
+# Local token estimates: rough English average, plus framing per message
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text without calling the API."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=1024)
+def _system_tokens(system_prompt: str) -> int:
+    # System prompts come from presets and repeat every turn
+    return estimate_tokens(system_prompt)
+
+
+def estimate_prompt_tokens(system_prompt: str, conversation: list[dict]) -> int:
+    """Estimate the input tokens of a turn: system prompt plus conversation."""
+    tokens = _system_tokens(system_prompt)
+    for message in conversation:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = "".join(block.get("text", "") for block in content)
+        tokens += estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    return tokens
 
 
 @dataclass
@@ -19,6 +48,21 @@ class UsageRecord:
     tokens_in: int
     tokens_out: int
     model: str
+    tokens_cache_write: int = 0
+    tokens_cache_read: int = 0
+
+    @property
+    def cost(self) -> float:
+        """Cost of this record in dollars."""
+        price_in, price_out, price_write, price_read = MODEL_PRICING.get(
+            self.model, DEFAULT_PRICING
+        )
+        return (
+            self.tokens_in * price_in
+            + self.tokens_out * price_out
+            + self.tokens_cache_write * price_write
+            + self.tokens_cache_read * price_read
+        ) / 1_000_000
 
 
 class TokenMeter:
@@ -33,30 +77,96 @@ class TokenMeter:
         """
         self.budget = budget
         self.records: list[UsageRecord] = []
+        self.hedge_records: list[UsageRecord] = []  # Cancelled hedge requests, not in totals
+        # Running totals, so budget checks don't re-sum the records
+        self.total_tokens_in = 0
+        self.total_tokens_out = 0
+        self.total_tokens_cache_write = 0
+        self.total_tokens_cache_read = 0
+        self.total_cost = 0.0
+        self.hedge_cost = 0.0
+        # Prompt size of each agent's last call: the part a next call can read from cache
+        self._cached_prompt: dict[str, int] = {}
+
+    def record(
+        self,
+        tokens_in: int,
+        tokens_out: int,
+        model: str,
+        tokens_cache_write: int = 0,
+        tokens_cache_read: int = 0,
+        agent: str | None = None,
+    ) -> None:
+        """
+        Record usage from a turn.
 
-    @property
-    def total_tokens_in(self) -> int:
-        """Total input tokens across all turns."""
-        return sum(r.tokens_in for r in self.records)
+        tokens_in is the uncached input only; cached input is reported
+        separately by the API and priced via the cache columns of MODEL_PRICING.
+        agent, if given, lets forecast() assume that agent's prompt is cached.
+        """
+        record = UsageRecord(tokens_in, tokens_out, model, tokens_cache_write, tokens_cache_read)
+        self.records.append(record)
+        self.total_tokens_in += tokens_in
+        self.total_tokens_out += tokens_out
+        self.total_tokens_cache_write += tokens_cache_write
+        self.total_tokens_cache_read += tokens_cache_read
+        self.total_cost += record.cost
+        if agent is not None and (tokens_cache_write or tokens_cache_read):
+            self._cached_prompt[agent] = tokens_in + tokens_cache_write + tokens_cache_read
+
+    def record_hedge(
+        self,
+        tokens_in: int,
+        tokens_out: int,
+        model: str,
+        tokens_cache_write: int = 0,
+        tokens_cache_read: int = 0,
+    ) -> None:
+        """Record the partial usage of a hedge request that lost the race."""
+        record = UsageRecord(tokens_in, tokens_out, model, tokens_cache_write, tokens_cache_read)
+        self.hedge_records.append(record)
+        self.hedge_cost += record.cost
+
+    def forecast(
+        self, model: str, prompt_tokens: int, max_tokens: int, agent: str | None = None
+    ) -> float:
+        """
+        Worst-case cost of a call: prompt_tokens in, max_tokens out.
 
-    @property
-    def total_tokens_out(self) -> int:
-        """Total output tokens across all turns."""
-        return sum(r.tokens_out for r in self.records)
+        With prompt caching, the part of the prompt the agent sent last time
+        is priced as a cache read and the rest as a cache write.
+        """
+        price_in, price_out, price_write, price_read = MODEL_PRICING.get(model, DEFAULT_PRICING)
+        if config.PROMPT_CACHING:
+            cached = min(prompt_tokens, self._cached_prompt.get(agent, 0))
+            input_cost = cached * price_read + (prompt_tokens - cached) * price_write
+        else:
+            input_cost = prompt_tokens * price_in
+        return (input_cost + max_tokens * price_out) / 1_000_000
+
+    def affordable_max_tokens(
+        self, model: str, prompts: list[tuple[str | None, int]], max_tokens: int
+    ) -> int:
+        """
+        The largest max_tokens (up to max_tokens) for which calls with these
+        (agent, prompt_tokens) can all run without exceeding the budget.
 
-    @property
-    def total_cost(self) -> float:
-        """Total cost in dollars."""
-        cost = 0.0
-        for record in self.records:
-            pricing = MODEL_PRICING.get(record.model, (1.00, 5.00))
-            cost += (record.tokens_in / 1_000_000) * pricing[0]
-            cost += (record.tokens_out / 1_000_000) * pricing[1]
-        return cost
-
-    def record(self, tokens_in: int, tokens_out: int, model: str) -> None:
-        """Record usage from a turn."""
-        self.records.append(UsageRecord(tokens_in, tokens_out, model))
+        Returns 0 if even the prompts alone don't fit.
+        """
+        remaining = self.remaining_budget()
+        if remaining is None:
+            return max_tokens
+        input_cost = sum(self.forecast(model, tokens, 0, agent) for agent, tokens in prompts)
+        per_token = self.forecast(model, 0, 1) * len(prompts)
+        if not per_token:
+            return max_tokens
+        return max(0, min(max_tokens, int((remaining - input_cost) / per_token)))
+
+    def can_hedge(self) -> bool:
+        """Whether bout plus hedge spend is still under the budget."""
+        if self.budget is None:
+            return True
+        return self.total_cost + self.hedge_cost < self.budget
 
     def is_over_budget(self) -> bool:
         """Check if we've exceeded the budget."""
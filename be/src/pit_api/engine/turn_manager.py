@@ -1,9 +1,11 @@
-"""TurnManager — handles round-robin turn order and conversation state."""
+"""TurnManager — handles turn order and conversation state."""
 
 from dataclasses import dataclass, field
 from typing import Iterator
 
 from .agent_runner import AgentConfig
+from .compaction import CompactionConfig
+from .turn_plans import TurnPlan
 
 
 @dataclass
@@ -11,10 +13,14 @@ class TurnState:
     """Current state of a bout's turns."""
 
     agents: list[AgentConfig]
-    current_index: int = 0
+    current_index: int = 0  # Step in the turn plan
     turn_number: int = 0
     conversation: list[dict] = field(default_factory=list)
     consecutive_failures: int = 0
+    pinned_messages: int = 0  # Leading messages never compacted (the seed prompt)
+    summary: str = ""  # Running summary of compacted turns
+    compacted_turns: int = 0  # Conversation entries folded, steer notes included
+    steers: list[tuple[int, str]] = field(default_factory=list)  # (turn_number, note)
 
     MAX_CONSECUTIVE_FAILURES = 3
 
@@ -22,14 +28,34 @@ class TurnState:
 class TurnManager:
     """Manages turn order and conversation state for a bout."""
 
-    def __init__(self, agents: list[AgentConfig]):
-        """Initialize with the list of agents in the bout."""
+    def __init__(
+        self,
+        agents: list[AgentConfig],
+        compaction: CompactionConfig | None = None,
+        plan: TurnPlan | None = None,
+    ):
+        """
+        Initialize with the list of agents in the bout.
+
+        Args:
+            agents: Agents in position order
+            compaction: Optional rolling-window settings; None keeps full history
+            plan: Turn plan; defaults to round-robin
+        """
         self.state = TurnState(agents=agents)
+        self.compaction = compaction
+        self.plan = plan or TurnPlan()
+
+    @property
+    def current_group(self) -> list[AgentConfig]:
+        """Get the agents who speak at the current step."""
+        indices = self.plan.group(self.state.current_index, self.state.agents)
+        return [self.state.agents[i] for i in indices]
 
     @property
     def current_agent(self) -> AgentConfig:
-        """Get the agent whose turn it is."""
-        return self.state.agents[self.state.current_index]
+        """Get the agent whose turn it is (first of the current group)."""
+        return self.current_group[0]
 
     @property
     def turn_number(self) -> int:
@@ -38,8 +64,39 @@ class TurnManager:
 
     @property
     def conversation(self) -> list[dict]:
-        """Get the full conversation history."""
-        return self.state.conversation
+        """
+        Get the conversation to send for the next turn.
+
+        Without compaction this is the full history. With compaction, turns
+        older than the window are represented by a summary appended to the
+        pinned seed message.
+        """
+        if not self.state.summary:
+            return self.state.conversation
+
+        pinned = self.state.conversation[: self.state.pinned_messages]
+        recent = self.state.conversation[self.state.pinned_messages :]
+        summary = f"[Earlier in the conversation]\n{self.state.summary}"
+        if pinned:
+            last = pinned[-1]
+            pinned = [*pinned[:-1], {**last, "content": f"{last['content']}\n\n{summary}"}]
+        else:
+            pinned = [{"role": "user", "content": summary}]
+        return pinned + recent
+
+    def other_speakers(self, agent: AgentConfig) -> list[str]:
+        """Names of the other agents, whose transcript lines agent must not write."""
+        return [a.name for a in self.state.agents if a.name != agent.name]
+
+    def seed(self, content: str) -> None:
+        """Add an opening user message that stays verbatim for the whole bout."""
+        self.state.conversation.append({"role": "user", "content": content})
+        self.state.pinned_messages += 1
+
+    def steer(self, note: str) -> None:
+        """Add a moderator message that every agent sees from the next turn on."""
+        self.state.conversation.append({"role": "user", "content": note})
+        self.state.steers.append((self.state.turn_number, note))
 
     def should_abort(self) -> bool:
         """Check if the bout should be aborted due to failures."""
@@ -52,35 +109,140 @@ class TurnManager:
         Args:
             content: The message content from the current agent
         """
-        # Add message to conversation (Anthropic format alternates user/assistant)
-        # For multi-agent, we simulate by having each agent see others' messages as "user"
-        self.state.conversation.append(
-            {
-                "role": "user" if self.state.turn_number % 2 == 0 else "assistant",
-                "content": f"[{self.current_agent.name}]: {content}",
-            }
-        )
+        self.advance_round([content])
+
+    def advance_round(self, contents: list[str | None]) -> None:
+        """
+        Record the results of the current group and advance to the next step.
+
+        Each responder's turn number is reserved by its slot in the group, so a
+        failed responder (None) leaves a gap rather than renumbering the rest.
+        If every responder failed, this counts as a single failed turn.
+
+        Args:
+            contents: One entry per agent in current_group, None for failures
+        """
+        if all(content is None for content in contents):
+            self.record_failure()
+            return
+
+        group = self.current_group
+        for offset, (agent, content) in enumerate(zip(group, contents)):
+            if content is None:
+                continue
+            turn = self.state.turn_number + offset
+            self.state.conversation.append(self._entry(agent.name, turn, content))
 
         # Reset failure counter
         self.state.consecutive_failures = 0
 
         # Advance
-        self.state.turn_number += 1
-        self.state.current_index = (self.state.current_index + 1) % len(self.state.agents)
+        self.state.turn_number += len(contents)
+        self.state.current_index += 1
+
+        self._compact()
+
+    @staticmethod
+    def _entry(agent_name: str, turn: int, content: str) -> dict:
+        """A transcript entry as it appears in the conversation."""
+        # Anthropic format alternates user/assistant; for multi-agent we
+        # simulate by having each agent see others' messages as "user"
+        return {
+            "role": "user" if turn % 2 == 0 else "assistant",
+            "content": f"[{agent_name}]: {content}",
+        }
+
+    def checkpoint(self) -> dict:
+        """
+        Snapshot the state that can't be rebuilt from persisted messages.
+
+        The conversation itself is not included: restore() rebuilds it from
+        the bout's Message rows.
+        """
+        return {
+            "step": self.state.current_index,
+            "turn_number": self.state.turn_number,
+            "consecutive_failures": self.state.consecutive_failures,
+            "summary": self.state.summary,
+            "compacted_turns": self.state.compacted_turns,
+            "steers": [list(steer) for steer in self.state.steers],
+        }
+
+    def restore(self, checkpoint: dict, history: list[tuple[str, int, str]]) -> None:
+        """
+        Resume from a checkpoint after seed().
+
+        Args:
+            checkpoint: A dict from checkpoint()
+            history: (agent_name, turn_number, content) of every persisted
+                message, in turn order. Steer notes from the checkpoint are put
+                back between them, then the entries already folded into the
+                summary are skipped.
+        """
+        self.state.current_index = checkpoint["step"]
+        self.state.turn_number = checkpoint["turn_number"]
+        self.state.consecutive_failures = checkpoint["consecutive_failures"]
+        self.state.summary = checkpoint["summary"]
+        self.state.compacted_turns = checkpoint["compacted_turns"]
+        self.state.steers = [(turn, note) for turn, note in checkpoint.get("steers", [])]
+
+        entries = []
+        steers = iter(self.state.steers)
+        steer = next(steers, None)
+        for agent_name, turn, content in history:
+            while steer is not None and steer[0] <= turn:
+                entries.append({"role": "user", "content": steer[1]})
+                steer = next(steers, None)
+            entries.append(self._entry(agent_name, turn, content))
+        while steer is not None:
+            entries.append({"role": "user", "content": steer[1]})
+            steer = next(steers, None)
+        self.state.conversation.extend(entries[self.state.compacted_turns :])
+
+    def _compact(self) -> None:
+        """Fold the oldest turns into the summary once the window overflows."""
+        if not self.compaction:
+            return
+        start = self.state.pinned_messages
+        verbatim = len(self.state.conversation) - start
+        if verbatim <= self.compaction.keep_turns + self.compaction.fold_batch:
+            return
+
+        fold = verbatim - self.compaction.keep_turns
+        evicted = self.state.conversation[start : start + fold]
+        del self.state.conversation[start : start + fold]
+        self.state.summary = self.compaction.summarizer(
+            self.state.summary, evicted, self.compaction.summary_max_chars
+        )
+        self.state.compacted_turns += fold
 
     def record_failure(self) -> None:
         """Record a failed turn (API error, timeout, etc.)."""
         self.state.consecutive_failures += 1
-        # Skip to next agent without recording message
-        self.state.current_index = (self.state.current_index + 1) % len(self.state.agents)
+        # Skip to next step without recording message
+        self.state.current_index += 1
 
     def turns(self, max_turns: int) -> Iterator[tuple[int, AgentConfig]]:
         """
         Generator that yields (turn_number, agent) for each turn.
 
-        Stops after max_turns or if abort condition is met.
+        Sequential view for single-speaker plans; use rounds() for plans that
+        fan out. Stops after max_turns or if abort condition is met.
         """
         while self.state.turn_number < max_turns:
             if self.should_abort():
                 break
             yield self.state.turn_number, self.current_agent
+
+    def rounds(self, max_turns: int) -> Iterator[list[tuple[int, AgentConfig]]]:
+        """
+        Generator that yields the (turn_number, agent) pairs of each step.
+
+        A group is truncated so the bout never exceeds max_turns. Stops after
+        max_turns or if abort condition is met.
+        """
+        while self.state.turn_number < max_turns:
+            if self.should_abort():
+                break
+            group = self.current_group[: max_turns - self.state.turn_number]
+            yield [(self.state.turn_number + i, agent) for i, agent in enumerate(group)]
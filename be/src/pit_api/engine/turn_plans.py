@@ -0,0 +1,65 @@
+"""Turn plans — which agents speak at each step of a bout.
+
+A plan maps a step number to a group of agent indices. Groups of one are
+ordinary sequential turns; larger groups all respond to the same
+conversation snapshot and are run concurrently by the orchestrator.
+
+Patterns (see TurnType):
+- alternating: team A ↔ team B, rotating members within each team
+- round_robin: A → B → C → A...
+- broadcast: presenter → [all responders at once] → presenter...
+"""
+
+from .agent_runner import AgentConfig
+from .presets import TurnType
+
+
+class TurnPlan:
+    """Base turn plan: strict round-robin."""
+
+    def group(self, step: int, agents: list[AgentConfig]) -> list[int]:
+        """Indices of the agents that speak at this step, in merge order."""
+        return [step % len(agents)]
+
+
+class RoundRobinPlan(TurnPlan):
+    """A → B → C → A..."""
+
+
+class AlternatingPlan(TurnPlan):
+    """
+    Alternate between teams, rotating through each team's members.
+
+    Agents without a team each form their own team, so a plain two-agent
+    bout is simple ping-pong.
+    """
+
+    def group(self, step: int, agents: list[AgentConfig]) -> list[int]:
+        teams: dict[object, list[int]] = {}
+        for index, agent in enumerate(agents):
+            key = agent.team if agent.team is not None else ("solo", index)
+            teams.setdefault(key, []).append(index)
+        order = list(teams.values())
+        members = order[step % len(order)]
+        return [members[(step // len(order)) % len(members)]]
+
+
+class BroadcastPlan(TurnPlan):
+    """Presenter (first agent) speaks, then every other agent responds at once."""
+
+    def group(self, step: int, agents: list[AgentConfig]) -> list[int]:
+        if len(agents) < 2 or step % 2 == 0:
+            return [0]
+        return list(range(1, len(agents)))
+
+
+TURN_PLANS: dict[str, type[TurnPlan]] = {
+    TurnType.ALTERNATING.value: AlternatingPlan,
+    TurnType.ROUND_ROBIN.value: RoundRobinPlan,
+    TurnType.BROADCAST.value: BroadcastPlan,
+}
+
+
+def get_turn_plan(pattern: str | None) -> TurnPlan:
+    """Get the plan for a preset's turnPattern, defaulting to round-robin."""
+    return TURN_PLANS.get(pattern or "", RoundRobinPlan)()
@@ -0,0 +1,223 @@
+"""Watchdog — bout leases, heartbeats, and a reaper for bouts that stop beating.
+
+A bout is started by atomically claiming it (pending -> running) under a
+lease owner, so concurrent requests can never both run it. The owner
+touches bouts.heartbeat_at every BOUT_HEARTBEAT_INTERVAL from a background
+task, independent of model calls. If the process dies the heartbeat stops,
+and after BOUT_LEASE_TIMEOUT the reaper (run by every API and worker
+process; the UPDATE is atomic) puts a bout that has a checkpoint back to
+pending, to be resumed by the next worker or viewer, up to BOUT_MAX_RESUMES
+times; otherwise it marks the bout as timed out so it stops counting as
+running. Bouts that are alive but slow are bounded by the
+orchestrator's wall-clock deadline instead.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from pit_api.config import config
+from pit_api.models import Bout, BoutJob
+from pit_api.models.base import AsyncSessionLocal, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The bout was reaped or claimed by another owner while this one ran it."""
+
+    def __init__(self, bout_id: str):
+        super().__init__(f"Lost the lease on bout {bout_id}")
+        self.bout_id = bout_id
+
+
+def new_lease_owner() -> str:
+    """A lease owner id unique to this process and bout run."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _claim(bout_id: str, lease_owner: str):
+    return (
+        update(Bout)
+        .where(Bout.id == bout_id, Bout.status == "pending")
+        .values(
+            status="running",
+            lease_owner=lease_owner,
+            heartbeat_at=datetime.now(timezone.utc),
+        )
+        .returning(Bout.id)
+    )
+
+
+def claim_bout(db: Session, bout_id: str, lease_owner: str) -> bool:
+    """
+    Atomically move a pending bout to running under lease_owner.
+
+    Returns False if the bout was not pending (someone else claimed it).
+    """
+    claimed = db.execute(_claim(bout_id, lease_owner)).first()
+    db.commit()
+    return claimed is not None
+
+
+async def aclaim_bout(db: AsyncSession, bout_id: str, lease_owner: str) -> bool:
+    """claim_bout() on an async session."""
+    claimed = (await db.execute(_claim(bout_id, lease_owner))).first()
+    await db.commit()
+    return claimed is not None
+
+
+async def touch_heartbeat(bout_id: str, lease_owner: str) -> bool:
+    """
+    Record that a running bout is still alive under its lease.
+
+    Returns False if the bout is no longer running under lease_owner.
+    """
+    async with AsyncSessionLocal() as db:
+        touched = await db.execute(
+            update(Bout)
+            .where(
+                Bout.id == bout_id,
+                Bout.status == "running",
+                Bout.lease_owner == lease_owner,
+            )
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+    return touched.rowcount > 0
+
+
+async def heartbeat(
+    bout_id: str,
+    lease_owner: str,
+    interval: float | None = None,
+    on_lost: Callable[[], None] | None = None,
+) -> None:
+    """
+    Touch a bout's heartbeat every interval until cancelled.
+
+    Stops, calling on_lost, once the bout is no longer running under
+    lease_owner (reaped, or requeued and claimed by someone else).
+    """
+    if interval is None:
+        interval = config.BOUT_HEARTBEAT_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            alive = await touch_heartbeat(bout_id, lease_owner)
+        except Exception:
+            logger.exception("Heartbeat failed for bout %s", bout_id)
+            continue
+        if not alive:
+            logger.warning("Lost the lease on bout %s (owner %s)", bout_id, lease_owner)
+            if on_lost:
+                on_lost()
+            return
+
+
+def reap_stale_bouts(
+    db: Session, lease_timeout: float | None = None, max_resumes: int | None = None
+) -> list[str]:
+    """
+    Requeue or time out running bouts whose heartbeat has expired.
+
+    A stale bout with a checkpoint goes back to pending without an owner,
+    and its claimed job (if a worker ran it) back to the queue, so it is
+    resumed from its last written round. After max_resumes such attempts,
+    or with no checkpoint to resume from, it is marked as timed out and its
+    job failed. Returns the timed-out bout ids.
+    """
+    if lease_timeout is None:
+        lease_timeout = config.BOUT_LEASE_TIMEOUT
+    if max_resumes is None:
+        max_resumes = config.BOUT_MAX_RESUMES
+    now = datetime.now(timezone.utc)
+    stale = (
+        Bout.status == "running",
+        func.coalesce(Bout.heartbeat_at, Bout.created_at) < now - timedelta(seconds=lease_timeout),
+    )
+
+    resumed = [
+        row[0]
+        for row in db.execute(
+            update(Bout)
+            .where(
+                *stale,
+                Bout.extra.has_key("checkpoint"),
+                Bout.resume_attempts < max_resumes,
+            )
+            .values(
+                status="pending",
+                lease_owner=None,
+                heartbeat_at=None,
+                resume_attempts=Bout.resume_attempts + 1,
+            )
+            .returning(Bout.id)
+        )
+    ]
+    if resumed:
+        db.execute(
+            update(BoutJob)
+            .where(BoutJob.bout_id.in_(resumed), BoutJob.status == "claimed")
+            .values(status="queued", worker_id=None, claimed_at=None)
+        )
+
+    reaped = [
+        row[0]
+        for row in db.execute(
+            update(Bout).where(*stale).values(status="timeout", completed_at=now).returning(Bout.id)
+        )
+    ]
+    if reaped:
+        db.execute(
+            update(BoutJob)
+            .where(BoutJob.bout_id.in_(reaped), BoutJob.status == "claimed")
+            .values(status="failed", error="Bout timed out", finished_at=now)
+        )
+    db.commit()
+    for bout_id in resumed:
+        logger.warning("Requeued stuck bout %s to resume from its checkpoint", bout_id)
+    return reaped
+
+
+def _sweep() -> list[str]:
+    """reap_stale_bouts() on a session of its own."""
+    db = SessionLocal()
+    try:
+        return reap_stale_bouts(db)
+    finally:
+        db.close()
+
+
+async def run_reaper(
+    on_reaped: Callable[[str], None] | None = None, interval: float | None = None
+) -> None:
+    """
+    Reap stale bouts every interval until cancelled.
+
+    Args:
+        on_reaped: Called with each reaped bout id (e.g. to close its streams)
+        interval: Seconds between sweeps (defaults to REAPER_INTERVAL)
+    """
+    if interval is None:
+        interval = config.REAPER_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            reaped = await asyncio.to_thread(_sweep)
+        except Exception:
+            logger.exception("Reaper sweep failed")
+            continue
+
+        for bout_id in reaped:
+            logger.warning("Reaped stuck bout %s", bout_id)
+            if on_reaped:
+                on_reaped(bout_id)
@@ -1,8 +1,9 @@
 """Database models."""
 
-from .base import Base, SessionLocal, engine
+from .base import AsyncSessionLocal, Base, SessionLocal, async_engine, engine, get_db
 from .bout import Bout
 from .bout_agent import BoutAgent
+from .bout_job import BoutJob
 from .message import Message
 from .metric import Metric
 from .waitlist import Waitlist
@@ -11,8 +12,12 @@ __all__ = [
     "Base",
     "engine",
     "SessionLocal",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_db",
     "Bout",
     "BoutAgent",
+    "BoutJob",
     "Message",
     "Waitlist",
     "Metric",
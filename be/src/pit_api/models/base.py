@@ -1,19 +1,67 @@
 """Database base configuration."""
 
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+
+from sqlalchemy import URL, create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from pit_api.config import config
 
-engine = create_engine(config.DATABASE_URL, echo=config.DEBUG)
+
+def async_database_url(url: str) -> URL:
+    """The same database as url, through the asyncpg driver."""
+    url = make_url(url)
+    query = dict(url.query)
+    if "sslmode" in query:  # libpq spelling; asyncpg calls it ssl
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+_pool_options = {
+    "pool_recycle": config.DB_POOL_RECYCLE,
+    "pool_timeout": config.DB_POOL_TIMEOUT,
+    "pool_pre_ping": True,
+}
+
+# Sync engine: claims, checkpoint restores, the job queue and background jobs
+engine = create_engine(
+    config.DATABASE_URL,
+    echo=config.DEBUG,
+    pool_size=config.DB_SYNC_POOL_SIZE,
+    max_overflow=config.DB_SYNC_MAX_OVERFLOW,
+    **_pool_options,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine: request handlers, SSE readers, bout writes and heartbeats, so a slow
+# query doesn't block the loop
+async_engine = create_async_engine(
+    async_database_url(config.DATABASE_URL),
+    echo=config.DEBUG,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    **_pool_options,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-# Usage pattern for Flask routes:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: an async session scoped to the request."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Usage pattern for routes:
+#
+#   @router.get("/thing")
+#   async def get_thing(db: AsyncSession = Depends(get_db)):
+#       thing = await db.get(Thing, thing_id)
+#
+# SSE routes open their own short-lived sessions instead (the dependency's
+# session would stay open until the stream ends):
 #
-#   db = SessionLocal()
-#   try:
-#       # ... use db ...
-#   finally:
-#       db.close()
+#   async with AsyncSessionLocal() as db:
+#       ...
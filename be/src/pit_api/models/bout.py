@@ -18,13 +18,16 @@ class Bout(Base):
     """A bout is a single AI battle between agents."""
 
     __tablename__ = "bouts"
-    __table_args__ = (Index("ix_bouts_ip_hash_created_at", "ip_hash", "created_at"),)
+    __table_args__ = (
+        Index("ix_bouts_ip_hash_created_at", "ip_hash", "created_at"),
+        Index("ix_bouts_status_heartbeat_at", "status", "heartbeat_at"),
+    )
 
     id = Column(String(10), primary_key=True, default=generate_bout_id)
     preset_id = Column(String(50), nullable=True)  # null for custom bouts
     status = Column(
         String(20), nullable=False, default="pending"
-    )  # pending, running, complete, error, timeout
+    )  # pending, running, complete, error, timeout, cancelled
     model_tier = Column(
         String(20), nullable=False, default="standard"
     )  # standard, juiced, unleashed
@@ -36,6 +39,12 @@ class Bout(Base):
         DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
     )
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # last sign of life while running
+    lease_owner = Column(String(100), nullable=True)  # process that claimed the bout
+    resume_attempts = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )  # times the reaper requeued it after its owner went silent
+    viewer_seen_at = Column(DateTime(timezone=True), nullable=True)  # last time anyone was watching
     ip_hash = Column(String(64), nullable=True)  # SHA-256 of IP for rate limiting
     extra = Column(JSONB, nullable=True)  # flexible JSON blob
 
@@ -0,0 +1,27 @@
+"""BoutJob model — queue of bouts waiting for a worker process."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from .base import Base
+
+
+class BoutJob(Base):
+    """A request to run a bout, claimed by one pit-worker at a time."""
+
+    __tablename__ = "bout_jobs"
+    __table_args__ = (Index("ix_bout_jobs_status_priority", "status", "priority", "created_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bout_id = Column(String(10), ForeignKey("bouts.id"), nullable=False, unique=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, claimed, done, failed
+    priority = Column(Integer, nullable=False, default=0)  # lower runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
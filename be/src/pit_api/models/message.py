@@ -3,7 +3,7 @@
 from datetime import datetime, timezone
 
 from nanoid import generate
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
 
 from .base import Base
 
@@ -26,11 +26,14 @@ class Message(Base):
     content = Column(Text, nullable=False)
     tokens_in = Column(Integer, nullable=False, default=0)
     tokens_out = Column(Integer, nullable=False, default=0)
+    tokens_cache_write = Column(Integer, nullable=False, default=0)  # prompt cache creation
+    tokens_cache_read = Column(Integer, nullable=False, default=0)  # prompt cache hits
     model_used = Column(String(50), nullable=True)
     created_at = Column(
         DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
     )
     latency_ms = Column(Integer, nullable=True)  # time-to-first-token
+    truncated = Column(Boolean, nullable=False, default=False)  # cut off at the turn deadline
 
     def to_dict(self) -> dict:
         """Convert to dictionary for API responses."""
@@ -41,5 +44,6 @@ class Message(Base):
             "agent_role": self.agent_role,
             "turn_number": self.turn_number,
             "content": self.content,
+            "truncated": bool(self.truncated),
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
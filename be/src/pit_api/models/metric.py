@@ -50,3 +50,23 @@ class Metric(Base):
         db.add(metric)
         db.commit()
         return metric
+
+    @classmethod
+    async def alog(
+        cls,
+        db,
+        event: str,
+        bout_id: str = None,
+        payload: dict = None,
+        ip_hash: str = None,
+    ):
+        """log() on an async session."""
+        metric = cls(
+            event=event,
+            bout_id=bout_id,
+            payload=payload,
+            ip_hash=ip_hash,
+        )
+        db.add(metric)
+        await db.commit()
+        return metric
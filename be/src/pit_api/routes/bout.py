@@ -1,21 +1,56 @@
 """Bout API — create, run, and stream bouts."""
 
 import asyncio
-import json
 from typing import AsyncGenerator, Optional
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-
-from pit_api.engine import AgentConfig, BoutConfig, Orchestrator, OrchestratorEvents, ShareGenerator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pit_api.config import config
+from pit_api.engine import (
+    AgentConfig,
+    BoutConfig,
+    LeaseLost,
+    Orchestrator,
+    ShareGenerator,
+    aenqueue_bout,
+    agents_from_preset,
+    bout_scheduler,
+    drain,
+    new_bout,
+)
+from pit_api.engine.watchdog import aclaim_bout, heartbeat, new_lease_owner
 from pit_api.models import Bout, Message, Metric
-from pit_api.models.base import SessionLocal
+from pit_api.models.base import AsyncSessionLocal, SessionLocal, get_db
 from pit_api.store import preset_loader
+from pit_api.streaming import (
+    TERMINAL_STATUSES,
+    Spectator,
+    Subscription,
+    bout_events,
+    cancel_when_abandoned,
+    coalesced_frames,
+    event_bus,
+    format_sse,
+    replay_bout,
+    tail_bout,
+    viewer_presence,
+)
 from pit_api.utils import check_rate_limit, hash_ip
 
 bout_router = APIRouter(prefix="/api", tags=["bout"])
 
+# Background bouts started by stream_bout, keyed by bout id
+_running_bouts: dict[str, tuple[Orchestrator, asyncio.Task]] = {}
+
+
+async def drain_bouts() -> None:
+    """On shutdown, let inline bouts finish for DRAIN_TIMEOUT, then park the rest."""
+    await drain(list(_running_bouts.values()), config.DRAIN_TIMEOUT)
+
 
 class CreateBoutRequest(BaseModel):
     preset_id: str
@@ -23,8 +58,18 @@ class CreateBoutRequest(BaseModel):
     model_tier: Optional[str] = "standard"
 
 
+async def _transcript(db: AsyncSession, bout_id: str) -> list[Message]:
+    """A bout's messages in turn order."""
+    result = await db.scalars(
+        select(Message).where(Message.bout_id == bout_id).order_by(Message.turn_number)
+    )
+    return list(result.all())
+
+
 @bout_router.post("/bout", status_code=201)
-async def create_bout(request: Request, body: CreateBoutRequest):
+async def create_bout(
+    request: Request, body: CreateBoutRequest, db: AsyncSession = Depends(get_db)
+):
     """Create and start a new bout."""
     preset_id = body.preset_id
     topic = body.topic
@@ -39,180 +84,285 @@ async def create_bout(request: Request, body: CreateBoutRequest):
     client_ip = request.client.host if request.client else "unknown"
     is_localhost = client_ip in ("127.0.0.1", "::1", "localhost")
     ip_hash = hash_ip(client_ip)
-    db = SessionLocal()
 
-    try:
-        if not is_localhost and not check_rate_limit(db, ip_hash):
-            Metric.log(db, "rate_limit_hit", ip_hash=ip_hash)
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "error": "Rate limit exceeded",
-                    "message": "You've had your share for now. Come back later.",
-                },
-            )
-
-        # Create agents from preset
-        agents = [
-            AgentConfig(id=a.id, name=a.name, role=a.role, system_prompt=a.system_prompt)
-            for a in preset.agents
-        ]
-
-        # If topic provided, inject into system prompts
-        if topic and preset.user_input:
-            for agent in agents:
-                agent.system_prompt = agent.system_prompt.replace("{topic}", topic)
-
-        # Create bout
-        orchestrator = Orchestrator(db)
-
-        config = BoutConfig(
-            preset_id=preset_id,
-            agents=agents,
-            model_tier=model_tier,
-            topic=topic,
-            ip_hash=ip_hash,
+    if not is_localhost and not await check_rate_limit(db, ip_hash):
+        await Metric.alog(db, "rate_limit_hit", ip_hash=ip_hash)
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": "Rate limit exceeded",
+                "message": "You've had your share for now. Come back later.",
+            },
         )
 
-        bout = orchestrator.create(config)
-        Metric.log(db, "bout_start", bout_id=bout.id, ip_hash=ip_hash)
+    # Create agents from preset (topic only applies to presets that take input)
+    agents = agents_from_preset(preset, topic if preset.user_input else None)
+
+    # Create bout
+    bout_config = BoutConfig(
+        preset_id=preset_id,
+        agents=agents,
+        model_tier=model_tier,
+        topic=topic,
+        ip_hash=ip_hash,
+    )
 
-        return {
-            "bout_id": bout.id,
-            "status": bout.status,
-            "stream_url": f"/api/bout/{bout.id}/stream",
-            "agents": [{"name": a.name, "role": a.role} for a in preset.agents],
-        }
+    bout, bout_agents = new_bout(bout_config)
+    db.add(bout)
+    await db.flush()  # Insert the bout before the agents that reference it
+    db.add_all(bout_agents)
+    await db.commit()
+    await Metric.alog(db, "bout_start", bout_id=bout.id, ip_hash=ip_hash)
 
-    finally:
-        db.close()
+    return {
+        "bout_id": bout.id,
+        "status": bout.status,
+        "stream_url": f"/api/bout/{bout.id}/stream",
+        "agents": [{"name": a.name, "role": a.role} for a in preset.agents],
+    }
 
 
 @bout_router.get("/bout/{bout_id}")
-async def get_bout(bout_id: str):
+async def get_bout(bout_id: str, db: AsyncSession = Depends(get_db)):
     """Get bout status and transcript."""
-    db = SessionLocal()
-    try:
-        bout = db.query(Bout).filter(Bout.id == bout_id).first()
-        if not bout:
-            raise HTTPException(status_code=404, detail="Bout not found")
-
-        messages = (
-            db.query(Message).filter(Message.bout_id == bout_id).order_by(Message.turn_number).all()
-        )
+    bout = await db.get(Bout, bout_id)
+    if not bout:
+        raise HTTPException(status_code=404, detail="Bout not found")
 
-        result = bout.to_dict()
-        result["messages"] = [m.to_dict() for m in messages]
-        return result
-
-    finally:
-        db.close()
+    result = bout.to_dict()
+    result["messages"] = [m.to_dict() for m in await _transcript(db, bout_id)]
+    return result
 
 
 @bout_router.get("/bout/{bout_id}/stream")
-async def stream_bout(bout_id: str):
+async def stream_bout(
+    bout_id: str,
+    request: Request,
+    pace: Optional[int] = Query(None, ge=0, description="Replay speed in chars/sec; 0 = instant"),
+    last_event_id: Optional[str] = Header(None),
+):
     """
     Stream bout events via Server-Sent Events.
 
+    The first request for a pending bout claims and starts it (an atomic
+    pending -> running update, so concurrent requests can't both run it).
+    Every other request attaches as a spectator to the same generation:
+    persisted turns are sent first, then the live tail. Finished bouts are replayed from their
+    persisted messages at `pace` characters per second, without the model.
+
+    Disconnects are tracked per bout: once nobody has watched a bout for
+    ABANDON_GRACE_SECONDS it is cancelled, or left to finish, per its tier's
+    ABANDON_POLICY (spectated bouts are kept going under "cancel_unshared").
+
+    Every frame carries an id. A reconnect sending Last-Event-ID resumes just
+    after that event from the per-bout event log; if the log no longer covers
+    it, running bouts fall back to the persisted-turn catch-up and finished
+    bouts to a replay.
+
     Event types:
+    - queued: {position} (while waiting for a free bout slot)
     - turn_start: {agent_name, turn_number}
-    - token: {token}
+    - token: {agent_name, token} (deltas coalesced per SSE_TOKEN_FLUSH_MS/CHARS)
     - turn_end: {agent_name, turn_number, message_id}
-    - bout_complete: {bout_id, total_cost}
+    - bout_complete: {bout_id, total_cost, reason} (max_turns, cost_ceiling or repetition)
     - error: {code, message}
     """
-    # Pre-validation with a separate session
-    db_check = SessionLocal()
-    try:
-        bout = db_check.query(Bout).filter(Bout.id == bout_id).first()
+    # Pre-validation with a short-lived session, closed before streaming starts
+    async with AsyncSessionLocal() as db_check:
+        bout = await db_check.get(Bout, bout_id)
         if not bout:
             raise HTTPException(status_code=404, detail="Bout not found")
 
+        resume_id, replay_after = _parse_last_event_id(last_event_id)
+        finished = bout.status in TERMINAL_STATUSES
+        await event_bus.listen()  # Before anything below subscribes
+
+        if resume_id is not None:
+            subscription = event_bus.resume(bout.id, resume_id, finished=finished)
+            if subscription is not None:
+                return _sse_response(_subscription_frames(subscription))
+
+        if bout.status == "running" or bout.id in _running_bouts:
+            if last_event_id is None:
+                viewer_ip = request.client.host if request.client else None
+                await Metric.alog(
+                    db_check, "bout_spectate", bout_id=bout.id, ip_hash=hash_ip(viewer_ip)
+                )
+            return await _spectate(bout.id)
+
+        if finished:
+            return _sse_response(_replay_events(bout.id, pace, replay_after))
+
         if bout.status != "pending":
             raise HTTPException(
                 status_code=400,
-                detail={"error": "Bout already started or completed", "status": bout.status},
+                detail={"error": "Bout in unexpected state", "status": bout.status},
             )
 
         bout_id_validated = bout.id
         preset_id = bout.preset_id
         topic = bout.topic
-    finally:
-        db_check.close()
 
-    # Load preset
-    preset = preset_loader.load_one(preset_id)
-    if not preset:
-        raise HTTPException(status_code=500, detail="Preset not found")
+        # Worker mode: hand the bout to a pit-worker and relay its events
+        if config.BOUT_EXECUTION == "worker":
+            if not event_bus.cross_process:
+                await aenqueue_bout(db_check, bout)
+                return _sse_response(_relay_events(bout_id_validated))
 
-    agents = [
-        AgentConfig(name=a.name, role=a.role, system_prompt=a.system_prompt) for a in preset.agents
-    ]
+            # Subscribe before enqueueing so no event can be missed
+            subscription = event_bus.subscribe(bout_id_validated)
+            try:
+                await aenqueue_bout(db_check, bout)
+            except Exception:
+                subscription.close()
+                raise
+            return _sse_response(_subscription_frames(subscription))
+
+        preset = preset_loader.load_one(preset_id)
+        if not preset:
+            raise HTTPException(status_code=500, detail="Preset not found")
+
+        # Inline: whoever loses the claim race watches the winner's bout
+        lease_owner = new_lease_owner()
+        if not await aclaim_bout(db_check, bout_id_validated, lease_owner):
+            return await _spectate(bout_id_validated)
+
+    # Start the bout now, not when the response body is first read: a client
+    # that disconnects before then must not leave a claimed bout with no runner.
+    # Subscribe first so none of its events can be missed.
+    subscription = event_bus.subscribe(bout_id_validated)
+    _start_bout(bout_id_validated, agents_from_preset(preset, topic), lease_owner)
+    return _sse_response(_subscription_frames(subscription))
+
+
+def _start_bout(bout_id: str, agents: list[AgentConfig], lease_owner: str) -> None:
+    """
+    Run a claimed bout as a background task on this event loop.
 
-    # Inject topic if present
-    if topic:
-        for agent in agents:
-            agent.system_prompt = agent.system_prompt.replace("{topic}", topic)
+    The bout publishes to the event bus; stream responses are subscribers.
+    It owns its session and outlives the request that started it if the
+    client disconnects; _running_bouts keeps a strong reference so the task
+    isn't collected.
+    """
+    db = SessionLocal()
+    orchestrator = Orchestrator(db, bout_events(event_bus, SessionLocal), lease_owner=lease_owner)
 
-    async def event_generator() -> AsyncGenerator[str, None]:
-        """Async SSE generator for streaming bout events.
+    def on_queued(position):
+        event_bus.publish(bout_id, "queued", {"position": position})
 
-        Note: Currently runs the bout synchronously and yields all events at the end.
-        TODO: For true real-time streaming, convert Orchestrator to async.
-        CRITIC:DEBT — Sync orchestrator blocks event loop. Priority: post-MVP.
-        """
-        db = SessionLocal()
+    async def run_bout() -> None:
+        # Keep the lease alive while queued for a slot; arun() beats after that
+        beat = asyncio.create_task(heartbeat(bout_id, lease_owner, on_lost=orchestrator.lose_lease))
+        watcher = None
+        lease_lost = False
         try:
-            # Re-fetch bout in generator's session
-            bout = db.query(Bout).filter(Bout.id == bout_id_validated).first()
+            # The session is synchronous; keep its round trips off the event loop
+            bout = await asyncio.to_thread(db.get, Bout, bout_id)
             if not bout:
-                yield f"event: error\ndata: {json.dumps({'code': 'NOT_FOUND', 'message': 'Bout not found'})}\n\n"
+                event_bus.publish(
+                    bout_id, "error", {"code": "NOT_FOUND", "message": "Bout not found"}
+                )
                 return
+            watcher = asyncio.create_task(
+                cancel_when_abandoned(orchestrator, bout_id, bout.model_tier)
+            )
+            async with bout_scheduler.bout_slot(bout.model_tier, bout.ip_hash, on_queued=on_queued):
+                beat.cancel()
+                await orchestrator.arun(bout, agents)
+        except LeaseLost:
+            lease_lost = True  # Reaped or taken over; publish nothing more
+        except Exception as e:
+            event_bus.publish(bout_id, "error", {"code": "FATAL", "message": str(e)})
+        finally:
+            beat.cancel()
+            if watcher is not None:
+                watcher.cancel()
+            await asyncio.to_thread(db.close)
+            # The new owner carries on the stream if it publishes where these viewers
+            # listen: on a shared bus, or in this process
+            replaced = _running_bouts.get(bout_id, (orchestrator,))[0] is not orchestrator
+            if not (lease_lost and (event_bus.cross_process or replaced)):
+                event_bus.end(bout_id)
+
+    def forget(task: asyncio.Task) -> None:
+        if _running_bouts.get(bout_id, (None, task))[1] is task:
+            _running_bouts.pop(bout_id, None)
+
+    task = asyncio.create_task(run_bout())
+    _running_bouts[bout_id] = (orchestrator, task)
+    task.add_done_callback(forget)
+
+
+async def _spectate(bout_id: str) -> StreamingResponse:
+    """Attach a viewer to a running bout: one generation, any number of viewers."""
+    if event_bus.cross_process or bout_id in _running_bouts:
+        subscription = event_bus.subscribe(bout_id)
+        try:
+            spectator = await Spectator.attach(subscription)
+        except Exception:
+            subscription.close()
+            raise
+        return _sse_response(_spectator_frames(spectator))
+    # Running in another process without a shared bus: follow it from the database
+    return _sse_response(_relay_events(bout_id))
 
-            # Collect events synchronously
-            events_list: list[tuple[str, dict]] = []
 
-            def on_turn_start(bid, name, turn):
-                events_list.append(("turn_start", {"agent_name": name, "turn_number": turn}))
+async def _subscription_frames(subscription: Subscription) -> AsyncGenerator[str, None]:
+    """SSE frames for an event bus subscription; unsubscribes when the client goes."""
+    try:
+        with viewer_presence.watching(subscription.bout_id):
+            async for frame in coalesced_frames(subscription.get):
+                yield frame
+    finally:
+        subscription.close()
 
-            def on_turn_end(bid, name, turn, msg_id):
-                events_list.append(
-                    ("turn_end", {"agent_name": name, "turn_number": turn, "message_id": msg_id})
-                )
 
-            def on_complete(bid, cost):
-                Metric.log(db, "bout_complete", bout_id=bid, payload={"total_cost": cost})
-                events_list.append(("bout_complete", {"bout_id": bid, "total_cost": cost}))
+async def _spectator_frames(spectator: Spectator) -> AsyncGenerator[str, None]:
+    """SSE frames for a viewer joining a running bout: catch-up, then live."""
+    try:
+        with viewer_presence.watching(spectator.subscription.bout_id):
+            async for frame in coalesced_frames(spectator.get):
+                yield frame
+    finally:
+        spectator.subscription.close()
 
-            def on_error(bid, msg):
-                events_list.append(("error", {"code": "BOUT_ERROR", "message": msg}))
 
-            events = OrchestratorEvents(
-                on_turn_start=on_turn_start,
-                on_turn_end=on_turn_end,
-                on_bout_complete=on_complete,
-                on_error=on_error,
-            )
+async def _relay_events(bout_id: str) -> AsyncGenerator[str, None]:
+    """SSE frames for a bout running in a pit-worker, tailed from the database."""
+    with viewer_presence.watching(bout_id):
+        async for event_type, data in tail_bout(bout_id):
+            yield format_sse(event_type, data)
 
-            # Run the bout in a thread to avoid blocking the event loop
-            # (Orchestrator is sync; this allows event loop to stay responsive)
-            orchestrator = Orchestrator(db, events)
-            try:
-                await asyncio.to_thread(orchestrator.run, bout, agents)
-            except Exception as e:
-                events_list.append(("error", {"code": "FATAL", "message": str(e)}))
 
-            # Yield all events
-            for event_type, data in events_list:
-                yield f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
-                # Small delay to allow client to process
-                await asyncio.sleep(0.01)
+async def _replay_events(
+    bout_id: str, pace: Optional[int], after: int = 0
+) -> AsyncGenerator[str, None]:
+    """SSE frames replaying a finished bout from its Message rows."""
+    async for event in replay_bout(bout_id, pace, after):
+        yield format_sse(*event)
+
+
+def _parse_last_event_id(value: Optional[str]) -> tuple[Optional[int], int]:
+    """
+    Split a Last-Event-ID header into (bus event id, replay position).
+
+    Live frames carry numeric bus ids; replay frames are numbered r1, r2, ...
+    Anything unparseable is treated as a fresh connection.
+    """
+    if not value:
+        return None, 0
+    try:
+        if value.startswith("r"):
+            return None, int(value[1:])
+        return int(value), 0
+    except ValueError:
+        return None, 0
 
-        finally:
-            db.close()
 
+def _sse_response(frames: AsyncGenerator[str, None]) -> StreamingResponse:
+    """Wrap an SSE frame generator in a streaming response."""
     return StreamingResponse(
-        event_generator(),
+        frames,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -223,30 +373,21 @@ async def stream_bout(bout_id: str):
 
 
 @bout_router.get("/bout/{bout_id}/share")
-async def get_bout_share(bout_id: str):
+async def get_bout_share(bout_id: str, db: AsyncSession = Depends(get_db)):
     """Generate share text for a completed bout."""
-    db = SessionLocal()
-    try:
-        bout = db.query(Bout).filter(Bout.id == bout_id).first()
-        if not bout:
-            raise HTTPException(status_code=404, detail="Bout not found")
+    bout = await db.get(Bout, bout_id)
+    if not bout:
+        raise HTTPException(status_code=404, detail="Bout not found")
 
-        if bout.status != "complete":
-            raise HTTPException(status_code=400, detail="Bout not complete")
+    if bout.status != "complete":
+        raise HTTPException(status_code=400, detail="Bout not complete")
 
-        messages = (
-            db.query(Message).filter(Message.bout_id == bout_id).order_by(Message.turn_number).all()
-        )
-
-        generator = ShareGenerator()
-        share = generator.generate(bout, messages)
+    generator = ShareGenerator()
+    share = generator.generate(bout, await _transcript(db, bout_id))
 
-        Metric.log(db, "share_generated", bout_id=bout_id)
+    await Metric.alog(db, "share_generated", bout_id=bout_id)
 
-        return {
-            "text": share.text,
-            "permalink": share.permalink,
-        }
-
-    finally:
-        db.close()
+    return {
+        "text": share.text,
+        "permalink": share.permalink,
+    }
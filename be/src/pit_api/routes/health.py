@@ -2,10 +2,26 @@
 
 from fastapi import APIRouter
 
+from pit_api.engine import (
+    bout_scheduler,
+    circuit_breakers,
+    client_registry,
+    output_budgets,
+    speaker_guard,
+)
+
 health_router = APIRouter(tags=["health"])
 
 
 @health_router.get("/health")
 async def health_check():
     """Health check endpoint for load balancers and monitoring."""
-    return {"status": "healthy", "service": "pit-api"}
+    return {
+        "status": "healthy",
+        "service": "pit-api",
+        "scheduler": bout_scheduler.stats(),
+        "anthropic_pool": client_registry.stats(),
+        "circuits": circuit_breakers.stats(),
+        "speaker_guard": speaker_guard.stats(),
+        "output_budgets": output_budgets.stats(),
+    }
@@ -3,12 +3,13 @@
 import re
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from pit_api.models import Metric, Waitlist
-from pit_api.models.base import SessionLocal
+from pit_api.models.base import get_db
 from pit_api.utils import hash_ip
 
 waitlist_router = APIRouter(prefix="/api", tags=["waitlist"])
@@ -22,7 +23,9 @@ class WaitlistRequest(BaseModel):
 
 
 @waitlist_router.post("/waitlist", status_code=201)
-async def add_to_waitlist(request: Request, body: WaitlistRequest):
+async def add_to_waitlist(
+    request: Request, body: WaitlistRequest, db: AsyncSession = Depends(get_db)
+):
     """Add an email to the waitlist."""
     email = body.email.strip().lower()
     source = body.source
@@ -36,20 +39,15 @@ async def add_to_waitlist(request: Request, body: WaitlistRequest):
     ip_hash = hash_ip(client_ip)
 
     # Insert
-    db = SessionLocal()
     try:
         entry = Waitlist(email=email, source=source, ip_hash=ip_hash)
         db.add(entry)
-        db.commit()
-
-        # Log metric
-        Metric.log(db, "waitlist_signup", payload={"source": source}, ip_hash=ip_hash)
-
-        return {"status": "success", "message": "You're in!"}
-
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=409, detail="You're already on the list!")
 
-    finally:
-        db.close()
+    # Log metric
+    await Metric.alog(db, "waitlist_signup", payload={"source": source}, ip_hash=ip_hash)
+
+    return {"status": "success", "message": "You're in!"}
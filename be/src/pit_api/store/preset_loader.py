@@ -23,6 +23,7 @@ class PresetAgent:
     system_prompt: str
     color: str = "#888888"
     avatar: str = "🤖"
+    team: Optional[int] = None  # For team battle patterns
 
 
 @dataclass
@@ -41,6 +42,7 @@ class Preset:
     input_label: Optional[str] = None
     turn_pattern: str = "round_robin"
     max_turns: Optional[dict] = None
+    compaction: Optional[dict] = None  # {"keep_turns": int, "summary_max_chars": int}
     launch_day_hero: bool = False
 
     # Compatibility aliases
@@ -119,6 +121,7 @@ class PresetLoader:
                         system_prompt=agent_data.get("system_prompt", ""),
                         color=agent_data.get("color", "#888888"),
                         avatar=agent_data.get("avatar", "🤖"),
+                        team=agent_data.get("team"),
                     )
                 )
 
@@ -137,6 +140,7 @@ class PresetLoader:
                 input_label=data.get("input_label"),
                 turn_pattern=data.get("turnPattern", "round_robin"),
                 max_turns=max_turns,
+                compaction=data.get("compaction"),
                 launch_day_hero=data.get("launch_day_hero", False),
             )
 
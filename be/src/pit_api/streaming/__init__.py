@@ -0,0 +1,34 @@
+"""Streaming — SSE framing and event delivery to clients."""
+
+from .event_bus import (
+    EventBus,
+    InProcessEventBus,
+    PostgresEventBus,
+    Subscription,
+    event_bus,
+)
+from .presence import cancel_when_abandoned, viewer_presence
+from .publisher import bout_events, end_timed_out_bout
+from .relay import TERMINAL_STATUSES, tail_bout
+from .replay import replay_bout
+from .spectator import Spectator
+from .sse import TokenCoalescer, coalesced_frames, format_sse
+
+__all__ = [
+    "TERMINAL_STATUSES",
+    "EventBus",
+    "InProcessEventBus",
+    "PostgresEventBus",
+    "Spectator",
+    "Subscription",
+    "TokenCoalescer",
+    "bout_events",
+    "cancel_when_abandoned",
+    "coalesced_frames",
+    "end_timed_out_bout",
+    "event_bus",
+    "format_sse",
+    "replay_bout",
+    "tail_bout",
+    "viewer_presence",
+]
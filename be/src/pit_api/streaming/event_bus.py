@@ -0,0 +1,409 @@
+"""EventBus — delivers bout events from the process running a bout to its viewers.
+
+InProcessEventBus fans events out to subscribers in the same process.
+PostgresEventBus sends them through LISTEN/NOTIFY so a viewer connected to
+any API worker can follow a bout running anywhere.
+
+Every event carries a per-bout id that only increases, and each process keeps
+a bounded log of recent events so a dropped client can resume from the
+Last-Event-ID it saw.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+import psycopg2
+from sqlalchemy.engine import make_url
+
+from pit_api.config import config
+
+logger = logging.getLogger(__name__)
+
+# Internal event that closes every subscription to a bout; never sent to clients
+END_OF_STREAM = "end"
+
+# (event_type, data, event_id) — event_id is None for events not from the bus
+Event = tuple[str, dict, int | None]
+
+
+class EventLog:
+    """
+    Recent events per bout, kept so dropped connections can resume.
+
+    Holds at most max_events per bout and max_bouts bouts, evicting the
+    least recently written bout first. Finished bouts stay until evicted so
+    a client that drops just before the end can still resume.
+    """
+
+    def __init__(self, max_events: int | None = None, max_bouts: int | None = None):
+        """Initialize with optional size overrides (defaults from config)."""
+        self.max_events = max_events or config.EVENT_LOG_SIZE
+        self.max_bouts = max_bouts or config.EVENT_LOG_BOUTS
+        self._logs: OrderedDict[str, deque[Event]] = OrderedDict()
+
+    def append(self, bout_id: str, event_type: str, data: dict, event_id: int) -> None:
+        """Record an event."""
+        log = self._logs.get(bout_id)
+        if log is None:
+            log = self._logs[bout_id] = deque(maxlen=self.max_events)
+            while len(self._logs) > self.max_bouts:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(bout_id)
+        log.append((event_type, data, event_id))
+
+    def since(self, bout_id: str, last_id: int) -> list[Event] | None:
+        """
+        Events after last_id, or None if the log doesn't reach back that far.
+        """
+        log = self._logs.get(bout_id)
+        if not log or log[0][2] > last_id + 1:
+            return None
+        return [event for event in log if event[2] > last_id]
+
+    def last_id(self, bout_id: str) -> int | None:
+        """Id of the latest logged event of a bout."""
+        log = self._logs.get(bout_id)
+        return log[-1][2] if log else None
+
+    def until(self, bout_id: str, last_id: int) -> list[Event]:
+        """Logged events up to and including last_id."""
+        return [event for event in self._logs.get(bout_id, ()) if event[2] <= last_id]
+
+
+class Subscription:
+    """
+    A single viewer's feed of one bout's events.
+
+    The buffer is bounded: a viewer that falls more than max_buffer events
+    behind is evicted with a SLOW_CONSUMER error rather than letting its
+    backlog grow without limit. Clients reconnect and resume from the log.
+    """
+
+    def __init__(self, bus: "EventBus", bout_id: str, max_buffer: int | None = None):
+        """Register with the bus; events published from now on are queued."""
+        self.bus = bus
+        self.bout_id = bout_id
+        self.joined_after = bus.log.last_id(bout_id)  # Logged before this subscription
+        self.max_buffer = max_buffer or config.SSE_SUBSCRIBER_BUFFER
+        self.queue: asyncio.Queue[Event] = asyncio.Queue()
+        self.closed = False
+        self.evicted = False
+
+    def offer(self, event_type: str, data: dict, event_id: int | None = None) -> None:
+        """Queue an event, evicting this subscriber if it has fallen too far behind."""
+        if self.closed:
+            return
+        if event_type != END_OF_STREAM and self.queue.qsize() >= self.max_buffer:
+            self._evict()
+            return
+        self.queue.put_nowait((event_type, data, event_id))
+
+    async def get(self) -> Event | None:
+        """Wait for the next event, or None once the bout's stream has ended."""
+        if self.closed and self.queue.empty():
+            return None
+        event = await self.queue.get()
+        if event[0] == END_OF_STREAM:
+            self.close()
+            return None
+        return event
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.closed = True
+        self.bus._unsubscribe(self)
+
+    def _evict(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.evicted = True
+        self.queue.put_nowait(
+            ("error", {"code": "SLOW_CONSUMER", "message": "Client fell behind; reconnect"}, None)
+        )
+        self.queue.put_nowait((END_OF_STREAM, {}, None))
+        self.close()
+
+
+class EventBus:
+    """Base bus: local subscriber bookkeeping shared by all implementations."""
+
+    # Whether events published in one process reach subscribers in another
+    cross_process = False
+
+    def __init__(self):
+        """Initialize with no subscribers."""
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._sequences: dict[str, int] = {}
+        self.log = EventLog()
+
+    def publish(self, bout_id: str, event_type: str, data: dict) -> None:
+        """Publish an event for a bout."""
+        raise NotImplementedError
+
+    def end(self, bout_id: str) -> None:
+        """Signal that a bout will publish no more events."""
+        self.publish(bout_id, END_OF_STREAM, {})
+        self._sequences.pop(bout_id, None)
+
+    async def listen(self) -> None:
+        """Start receiving other processes' events, if this bus carries them (default: no-op)."""
+
+    def subscribe(self, bout_id: str) -> Subscription:
+        """Subscribe to a bout's events published from now on."""
+        subscription = Subscription(self, bout_id)
+        self._subscribers.setdefault(bout_id, set()).add(subscription)
+        return subscription
+
+    def resume(self, bout_id: str, last_id: int, finished: bool = False) -> Subscription | None:
+        """
+        Subscribe starting just after last_id, replaying from the event log.
+
+        Returns None if this process's log no longer covers last_id, or if
+        the logged stream's end doesn't match the bout (a finished bout whose
+        end wasn't logged, or a parked bout whose old stream ended); the
+        caller then falls back to the persisted messages.
+        """
+        backlog = self.log.since(bout_id, last_id)
+        if backlog is None:
+            return None
+        ended = bool(backlog) and backlog[-1][0] == END_OF_STREAM
+        if ended != finished:
+            return None
+        subscription = self.subscribe(bout_id)
+        for event in backlog:
+            subscription.offer(*event)
+        return subscription
+
+    def subscriber_count(self, bout_id: str) -> int:
+        """Number of local subscribers to a bout."""
+        return len(self._subscribers.get(bout_id, ()))
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.bout_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.bout_id]
+
+    def _next_id(self, bout_id: str) -> int:
+        """
+        Assign the next event id for a bout.
+
+        Sequences start from the clock in microseconds, so ids keep increasing
+        if a bout is picked up again by another process after a restart.
+        """
+        event_id = self._sequences.get(bout_id) or time.time_ns() // 1000
+        self._sequences[bout_id] = event_id + 1
+        return event_id
+
+    def _dispatch(self, bout_id: str, event_type: str, data: dict, event_id: int | None) -> None:
+        """Log an event and deliver it to this process's subscribers."""
+        if event_id is not None:
+            self.log.append(bout_id, event_type, data, event_id)
+        for subscription in list(self._subscribers.get(bout_id, ())):
+            subscription.offer(event_type, data, event_id)
+        if event_type == END_OF_STREAM:
+            # Queued for each reader; also drops subscribers whose response never started
+            self._subscribers.pop(bout_id, None)
+
+
+class InProcessEventBus(EventBus):
+    """Delivers events to subscribers in this process only."""
+
+    def publish(self, bout_id: str, event_type: str, data: dict) -> None:
+        self._dispatch(bout_id, event_type, data, self._next_id(bout_id))
+
+
+class PostgresEventBus(EventBus):
+    """
+    Delivers events through Postgres LISTEN/NOTIFY on a single channel.
+
+    Every process listens and dispatches to its own subscribers, including the
+    publishing process, so there is exactly one delivery path. NOTIFY payloads
+    are capped at 8000 bytes: token text is split across notifications, and
+    message bodies are never sent — turn_end carries message_id for consumers
+    that need the full text from the messages table.
+
+    publish() never blocks or raises: events go to an outbox that a publisher
+    thread drains, merging runs of token deltas queued meanwhile, so a slow
+    or failing NOTIFY costs dropped events (logged), not a stalled loop or a
+    failed bout.
+
+    Await listen() before subscribing: it opens the LISTEN connection in a
+    worker thread the first time (concurrent callers share it) and again
+    after the connection is lost.
+    """
+
+    cross_process = True
+    CHANNEL = "pit_bout_events"
+    MAX_PAYLOAD_BYTES = 7900
+    OUTBOX_SIZE = 10_000  # Events waiting to be sent; more are dropped
+
+    def __init__(self, dsn: str | None = None):
+        """Initialize with an optional libpq DSN (defaults to DATABASE_URL)."""
+        super().__init__()
+        if dsn is None:
+            url = make_url(config.DATABASE_URL).set(drivername="postgresql")
+            dsn = url.render_as_string(hide_password=False)
+        self.dsn = dsn
+        self._publish_conn = None  # Used by the publisher thread only
+        self._outbox: queue.Queue[tuple[str, str, dict, int]] = queue.Queue(self.OUTBOX_SIZE)
+        self._publisher: threading.Thread | None = None
+        self._listen_conn = None
+        self._listening: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def publish(self, bout_id: str, event_type: str, data: dict) -> None:
+        if self._publisher is None or not self._publisher.is_alive():
+            self._publisher = threading.Thread(
+                target=self._publish_loop, name="event-bus-publisher", daemon=True
+            )
+            self._publisher.start()
+        try:
+            self._outbox.put_nowait((bout_id, event_type, data, self._next_id(bout_id)))
+        except queue.Full:
+            logger.warning("Event bus outbox full; dropped %s for bout %s", event_type, bout_id)
+
+    def _publish_loop(self) -> None:
+        while True:
+            batch = [self._outbox.get()]
+            while True:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            self._send(coalesce_tokens(batch))
+
+    def _send(self, events: list[tuple[str, str, dict, int]]) -> None:
+        """NOTIFY a batch of events; failures are logged and the batch dropped."""
+        try:
+            if self._publish_conn is None or self._publish_conn.closed:
+                self._publish_conn = psycopg2.connect(self.dsn)
+                self._publish_conn.autocommit = True
+            with self._publish_conn.cursor() as cursor:
+                for bout_id, event_type, data, event_id in events:
+                    for payload in self._encode(bout_id, event_type, data, event_id):
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.CHANNEL, payload))
+        except Exception:
+            logger.exception("Event bus NOTIFY failed; dropped %d events", len(events))
+            if self._publish_conn is not None:
+                self._publish_conn.close()
+
+    def _encode(
+        self, bout_id: str, event_type: str, data: dict, event_id: int | None = None
+    ) -> list[str]:
+        """Serialize an event into one or more NOTIFY payloads."""
+        envelope = {"bout_id": bout_id, "id": event_id, "type": event_type}
+        payload = json.dumps({**envelope, "data": data})
+        if len(payload.encode()) <= self.MAX_PAYLOAD_BYTES:
+            return [payload]
+
+        if event_type == "token":
+            # Split by characters; worst case 4 bytes each plus JSON escaping
+            text = data["token"]
+            size = self.MAX_PAYLOAD_BYTES // 8
+            payloads = []
+            for start in range(0, len(text), size):
+                chunk = {**data, "token": text[start : start + size]}
+                payloads.extend(self._encode(bout_id, "token", chunk, event_id))
+            return payloads
+
+        logger.warning("Dropping oversized %s event data for bout %s", event_type, bout_id)
+        slim = {k: v for k, v in data.items() if k in ("agent_name", "turn_number", "message_id")}
+        return [json.dumps({**envelope, "data": slim})]
+
+    async def listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        stale = self._loop is not loop or (
+            self._listening is not None
+            and self._listening.done()
+            and (self._listening.cancelled() or self._listening.exception() is not None)
+        )
+        if self._listening is None or stale:
+            self._stop_listening()
+            self._loop = loop
+            self._listening = loop.create_task(self._start_listening())
+        await asyncio.shield(self._listening)
+
+    async def _start_listening(self) -> None:
+        conn = await asyncio.to_thread(self._connect_listener)
+        asyncio.get_running_loop().add_reader(conn.fileno(), self._on_notify)
+        self._listen_conn = conn
+
+    def _connect_listener(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.CHANNEL}")
+        return conn
+
+    def _stop_listening(self) -> None:
+        self._listening = None
+        if self._listen_conn is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._listen_conn.fileno())
+        self._listen_conn.close()
+        self._listen_conn = None
+        self._loop = None
+
+    def _on_notify(self) -> None:
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except psycopg2.Error:
+            # Lost the listener: end open streams so clients reconnect
+            logger.exception("Event bus listener connection lost")
+            self._stop_listening()
+            for bout_id in list(self._subscribers):
+                self._dispatch(bout_id, END_OF_STREAM, {}, None)
+            return
+
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            message = json.loads(notify.payload)
+            self._dispatch(message["bout_id"], message["type"], message["data"], message["id"])
+
+
+def coalesce_tokens(
+    events: list[tuple[str, str, dict, int]],
+) -> list[tuple[str, str, dict, int]]:
+    """
+    Merge consecutive token events of the same bout and agent into one.
+
+    (bout_id, event_type, data, event_id) tuples, in publish order; a merged
+    event keeps the last id, so resuming after it skips none of its text.
+    """
+    merged: list[tuple[str, str, dict, int]] = []
+    last: dict[str, int] = {}  # bout_id -> index in merged of its latest event
+    for bout_id, event_type, data, event_id in events:
+        previous = merged[last[bout_id]] if bout_id in last else None
+        if (
+            event_type == "token"
+            and previous is not None
+            and previous[1] == "token"
+            and previous[2]["agent_name"] == data["agent_name"]
+        ):
+            text = previous[2]["token"] + data["token"]
+            merged[last[bout_id]] = (bout_id, "token", {**data, "token": text}, event_id)
+            continue
+        last[bout_id] = len(merged)
+        merged.append((bout_id, event_type, data, event_id))
+    return merged
+
+
+def create_event_bus() -> EventBus:
+    """Build the bus selected by EVENT_BUS."""
+    if config.EVENT_BUS == "postgres":
+        return PostgresEventBus()
+    return InProcessEventBus()
+
+
+# Global singleton
+event_bus = create_event_bus()
@@ -0,0 +1,160 @@
+"""Viewer presence — who is watching which bouts, and stopping abandoned ones.
+
+Each API process counts the SSE streams it has open per bout and every
+PRESENCE_INTERVAL stamps bouts.viewer_seen_at for the bouts it is serving,
+so a bout running in another process (a pit-worker, or another API node)
+can tell whether anyone is still watching. Whoever runs the bout watches
+that signal and, once nobody has watched for ABANDON_GRACE_SECONDS,
+applies its tier's abandon policy:
+
+- "cancel": stop the bout, cancelling in-flight model calls
+- "cancel_unshared": stop it unless a spectator has joined
+- "finish": always run to completion
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import select, update
+
+from pit_api.config import config
+from pit_api.engine import Orchestrator
+from pit_api.models import Bout, Metric
+from pit_api.models.base import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+ABANDON_CANCEL = "cancel"
+ABANDON_CANCEL_UNSHARED = "cancel_unshared"
+ABANDON_FINISH = "finish"
+
+
+class ViewerPresence:
+    """Per-process count of open streams per bout."""
+
+    def __init__(self):
+        self._viewers: Counter[str] = Counter()
+
+    @contextmanager
+    def watching(self, bout_id: str) -> Iterator[None]:
+        """Count a viewer of bout_id for the duration of the block."""
+        self._viewers[bout_id] += 1
+        try:
+            yield
+        finally:
+            self._viewers[bout_id] -= 1
+            if self._viewers[bout_id] <= 0:
+                del self._viewers[bout_id]
+
+    def count(self, bout_id: str) -> int:
+        return self._viewers.get(bout_id, 0)
+
+    async def touch(self) -> None:
+        """Stamp viewer_seen_at on the unfinished bouts this process is serving."""
+        bout_ids = list(self._viewers)
+        if not bout_ids:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Bout)
+                .where(Bout.id.in_(bout_ids), Bout.status.in_(("pending", "running")))
+                .values(viewer_seen_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+
+    async def run(self, interval: float | None = None) -> None:
+        """Publish this process's viewers every interval until cancelled."""
+        if interval is None:
+            interval = config.PRESENCE_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.touch()
+            except Exception:
+                logger.exception("Presence update failed")
+
+
+viewer_presence = ViewerPresence()
+
+
+def abandon_policy(model_tier: str) -> str:
+    """The abandon policy for a tier; unknown tiers finish."""
+    policies = {
+        "standard": config.ABANDON_POLICY_STANDARD,
+        "juiced": config.ABANDON_POLICY_JUICED,
+        "unleashed": config.ABANDON_POLICY_UNLEASHED,
+    }
+    return policies.get(model_tier, ABANDON_FINISH)
+
+
+async def _watched_elsewhere(bout_id: str) -> bool:
+    """Whether another process has stamped this bout within two presence intervals."""
+    async with AsyncSessionLocal() as db:
+        seen = await db.scalar(select(Bout.viewer_seen_at).where(Bout.id == bout_id))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=2 * config.PRESENCE_INTERVAL)
+    return seen is not None and seen >= cutoff
+
+
+async def _was_shared(bout_id: str) -> bool:
+    """Whether anyone other than the bout's starter has tuned in."""
+    async with AsyncSessionLocal() as db:
+        shared = await db.scalar(
+            select(Metric.id)
+            .join(Bout, Bout.id == Metric.bout_id)
+            .where(
+                Metric.bout_id == bout_id,
+                Metric.event == "bout_spectate",
+                # The starter reloading their own bout is not a share
+                Metric.ip_hash.is_distinct_from(Bout.ip_hash),
+            )
+            .limit(1)
+        )
+    return shared is not None
+
+
+async def cancel_when_abandoned(
+    orchestrator: Orchestrator,
+    bout_id: str,
+    model_tier: str,
+    grace: float | None = None,
+) -> None:
+    """
+    Cancel a running bout once nobody has watched it for the grace period.
+
+    Runs alongside the bout and is cancelled with it. Database errors count
+    as "still watched", so a flaky lookup never stops a bout.
+    """
+    policy = abandon_policy(model_tier)
+    if policy == ABANDON_FINISH:
+        return
+    if grace is None:
+        grace = config.ABANDON_GRACE_SECONDS
+    interval = max(0.01, min(config.PRESENCE_INTERVAL, grace / 2))
+
+    last_seen = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        if viewer_presence.count(bout_id):
+            last_seen = time.monotonic()
+            continue
+        if time.monotonic() - last_seen < grace:
+            continue
+        try:
+            if await _watched_elsewhere(bout_id):
+                last_seen = time.monotonic()
+                continue
+            if policy == ABANDON_CANCEL_UNSHARED and await _was_shared(bout_id):
+                return
+        except Exception:
+            logger.exception("Presence check failed for bout %s", bout_id)
+            last_seen = time.monotonic()
+            continue
+
+        logger.info("Cancelling abandoned bout %s", bout_id)
+        orchestrator.cancel("Nobody is watching. Bout stopped early.")
+        return
@@ -0,0 +1,78 @@
+"""Publisher — maps orchestrator callbacks onto event bus messages."""
+
+import asyncio
+import logging
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from pit_api.engine import OrchestratorEvents
+from pit_api.models import Metric
+
+from .event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+
+def bout_events(
+    bus: EventBus, session_factory: Callable[[], Session] | None = None
+) -> OrchestratorEvents:
+    """
+    Build orchestrator callbacks that publish SSE-shaped events to the bus.
+
+    Args:
+        bus: Where to publish
+        session_factory: If given, bout completion is also logged as a metric,
+            on a session of its own in a worker thread
+    """
+    logging_tasks: set[asyncio.Task] = set()
+
+    def log_complete(bout_id, cost, reason):
+        db = session_factory()
+        try:
+            Metric.log(
+                db, "bout_complete", bout_id=bout_id, payload={"total_cost": cost, "reason": reason}
+            )
+        except Exception:
+            logger.exception("Failed to log completion of bout %s", bout_id)
+        finally:
+            db.close()
+
+    def on_turn_start(bout_id, name, turn):
+        bus.publish(bout_id, "turn_start", {"agent_name": name, "turn_number": turn})
+
+    def on_token(bout_id, name, token):
+        bus.publish(bout_id, "token", {"agent_name": name, "token": token})
+
+    def on_turn_end(bout_id, name, turn, msg_id):
+        bus.publish(
+            bout_id,
+            "turn_end",
+            {"agent_name": name, "turn_number": turn, "message_id": msg_id},
+        )
+
+    def on_complete(bout_id, cost, reason):
+        if session_factory is not None:
+            task = asyncio.create_task(asyncio.to_thread(log_complete, bout_id, cost, reason))
+            logging_tasks.add(task)
+            task.add_done_callback(logging_tasks.discard)
+        bus.publish(
+            bout_id, "bout_complete", {"bout_id": bout_id, "total_cost": cost, "reason": reason}
+        )
+
+    def on_error(bout_id, msg):
+        bus.publish(bout_id, "error", {"code": "BOUT_ERROR", "message": msg})
+
+    return OrchestratorEvents(
+        on_turn_start=on_turn_start,
+        on_token=on_token,
+        on_turn_end=on_turn_end,
+        on_bout_complete=on_complete,
+        on_error=on_error,
+    )
+
+
+def end_timed_out_bout(bus: EventBus, bout_id: str) -> None:
+    """Close viewers' streams for a bout the watchdog reaped."""
+    bus.publish(bout_id, "error", {"code": "TIMEOUT", "message": "Bout stopped responding"})
+    bus.end(bout_id)
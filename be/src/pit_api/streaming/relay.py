@@ -0,0 +1,85 @@
+"""Relay — follow a bout running in another process via its persisted rows."""
+
+import asyncio
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from pit_api.config import config
+from pit_api.models import Bout, Message
+from pit_api.models.base import AsyncSessionLocal
+
+TERMINAL_STATUSES = ("complete", "error", "timeout", "cancelled")
+
+
+def message_events(message: Message) -> list[tuple[str, dict]]:
+    """Expand a persisted message into the events a live viewer would have seen."""
+    return [
+        ("turn_start", {"agent_name": message.agent_name, "turn_number": message.turn_number}),
+        ("token", {"agent_name": message.agent_name, "token": message.content}),
+        (
+            "turn_end",
+            {
+                "agent_name": message.agent_name,
+                "turn_number": message.turn_number,
+                "message_id": message.id,
+            },
+        ),
+    ]
+
+
+def terminal_event(bout: Bout) -> tuple[str, dict]:
+    """The closing event for a bout in a terminal status."""
+    if bout.status == "complete":
+        return (
+            "bout_complete",
+            {
+                "bout_id": bout.id,
+                "total_cost": bout.token_cost,
+                "reason": (bout.extra or {}).get("end_reason"),
+            },
+        )
+    return ("error", {"code": bout.status.upper(), "message": f"Bout ended with {bout.status}"})
+
+
+async def tail_bout(
+    bout_id: str, poll_interval: float | None = None
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Yield a bout's events by polling for new Message rows until it finishes.
+
+    Each message is sent whole (one token event per turn). Status is read
+    before messages on every poll, and the orchestrator commits messages
+    before marking a bout complete, so no turn is missed at the end.
+    """
+    if poll_interval is None:
+        poll_interval = config.RELAY_POLL_INTERVAL
+    last_turn = -1
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            bout = await db.get(Bout, bout_id)
+            if bout:
+                messages = (
+                    await db.scalars(
+                        select(Message)
+                        .where(Message.bout_id == bout_id, Message.turn_number > last_turn)
+                        .order_by(Message.turn_number)
+                    )
+                ).all()
+                finished = bout.status in TERMINAL_STATUSES
+                closing = terminal_event(bout) if finished else None
+        if not bout:
+            yield ("error", {"code": "NOT_FOUND", "message": "Bout not found"})
+            return
+
+        for message in messages:
+            for event in message_events(message):
+                yield event
+            last_turn = message.turn_number
+
+        if closing:
+            yield closing
+            return
+
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,108 @@
+"""Replay — re-stream a finished bout from its persisted messages."""
+
+import asyncio
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from pit_api.config import config
+from pit_api.models import Bout, Message
+from pit_api.models.base import AsyncSessionLocal
+
+from .relay import terminal_event
+
+
+def paced_chunks(content: str, chars_per_second: int) -> list[str]:
+    """
+    Split a message into token-sized pieces for one SSE flush interval each.
+
+    Pieces break after whitespace where possible so words aren't split.
+    """
+    if chars_per_second <= 0 or not content:
+        return [content]
+    size = max(1, chars_per_second * config.SSE_TOKEN_FLUSH_MS // 1000)
+    chunks: list[str] = []
+    start = 0
+    while start < len(content):
+        end = min(len(content), start + size)
+        if end < len(content):
+            space = content.rfind(" ", start, end)
+            if space > start:
+                end = space + 1
+        chunks.append(content[start:end])
+        start = end
+    return chunks
+
+
+async def replay_bout(
+    bout_id: str, chars_per_second: int | None = None, after: int = 0
+) -> AsyncIterator[tuple[str, dict, str]]:
+    """
+    Yield a finished bout's events as a live viewer would have seen them.
+
+    Messages are read in turn order a batch at a time, keyed on the last
+    turn sent, so no connection is held while the replay is paced out.
+    The model is never called.
+
+    Events are numbered r1, r2, ... in replay order, which is fixed for a
+    given pace; `after` skips (without pacing) the events a reconnecting
+    client already has.
+    """
+    if chars_per_second is None:
+        chars_per_second = config.REPLAY_CHARS_PER_SECOND
+    delay = config.SSE_TOKEN_FLUSH_MS / 1000 if chars_per_second > 0 else 0
+    last_turn = -1
+    sequence = 0
+
+    async with AsyncSessionLocal() as db:
+        bout = await db.get(Bout, bout_id)
+        closing = terminal_event(bout) if bout else None
+    if not closing:
+        yield ("error", {"code": "NOT_FOUND", "message": "Bout not found"}, None)
+        return
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            batch = (
+                await db.scalars(
+                    select(Message)
+                    .where(Message.bout_id == bout_id, Message.turn_number > last_turn)
+                    .order_by(Message.turn_number)
+                    .limit(config.REPLAY_BATCH_SIZE)
+                )
+            ).all()
+
+        for message in batch:
+            events = [
+                (
+                    "turn_start",
+                    {"agent_name": message.agent_name, "turn_number": message.turn_number},
+                )
+            ]
+            events += [
+                ("token", {"agent_name": message.agent_name, "token": chunk})
+                for chunk in paced_chunks(message.content, chars_per_second)
+            ]
+            events.append(
+                (
+                    "turn_end",
+                    {
+                        "agent_name": message.agent_name,
+                        "turn_number": message.turn_number,
+                        "message_id": message.id,
+                    },
+                )
+            )
+            for event_type, data in events:
+                sequence += 1
+                if sequence <= after:
+                    continue
+                yield (event_type, data, f"r{sequence}")
+                if delay and event_type == "token":
+                    await asyncio.sleep(delay)
+            last_turn = message.turn_number
+
+        if len(batch) < config.REPLAY_BATCH_SIZE:
+            break
+
+    yield (*closing, f"r{sequence + 1}")
@@ -0,0 +1,144 @@
+"""Spectator — attach a viewer to a bout that is already running."""
+
+import asyncio
+
+from sqlalchemy import select
+
+from pit_api.config import config
+from pit_api.models import Bout, Message
+from pit_api.models.base import AsyncSessionLocal
+
+from .event_bus import Event, Subscription
+from .relay import TERMINAL_STATUSES, message_events, terminal_event
+
+
+class Spectator:
+    """
+    A catch-up snapshot of persisted turns, followed by the live tail.
+
+    The subscription must be opened before the spectator is attached, so
+    nothing published during the snapshot read is lost. Live events for turns
+    already in the snapshot are dropped. A turn that was mid-stream when the
+    viewer joined is not shown as partial text: its deltas are skipped and the
+    whole message is loaded by message_id when the turn ends.
+
+    Bouts write their messages in batches, so a turn can end up to
+    PERSIST_FLUSH_INTERVAL before its row is in the snapshot. Turns the bus
+    log shows as ended but the snapshot lacks are loaded by message_id too;
+    a load waits for the row until the bout ends.
+
+    get() is safe to cancel (the SSE coalescer times it out between token
+    flushes): an event taken off the queue is filtered in a task that the
+    next get() picks up, so a cancelled message load loses nothing.
+    """
+
+    def __init__(self, subscription: Subscription):
+        self.subscription = subscription
+        self._backlog: list[Event] = []
+        self._caught_up: set[int] = set()
+        self._live_turns: dict[str, int] = {}  # agent_name -> turn seen from its start
+        self._done = False
+        self._filtering: asyncio.Task | None = None
+
+    @classmethod
+    async def attach(cls, subscription: Subscription) -> "Spectator":
+        """Read the snapshot; live events queue up on the subscription meanwhile."""
+        spectator = cls(subscription)
+        await spectator._load_snapshot()
+        return spectator
+
+    async def get(self) -> Event | None:
+        """The next event for this viewer, or None at end of stream."""
+        while True:
+            if self._backlog:
+                return self._backlog.pop(0)
+            if self._done:
+                return None
+            if self._filtering is None:
+                item = await self.subscription.get()
+                if item is None:
+                    return None
+                self._filtering = asyncio.ensure_future(self._filter(*item))
+            events = await asyncio.shield(self._filtering)
+            self._filtering = None
+            self._backlog.extend(events)
+
+    async def _load_snapshot(self) -> None:
+        async with AsyncSessionLocal() as db:
+            bout = await db.get(Bout, self.subscription.bout_id)
+            if not bout:
+                self._backlog.append(
+                    ("error", {"code": "NOT_FOUND", "message": "Bout not found"}, None)
+                )
+                self._done = True
+                return
+            snapshot = await db.scalars(
+                select(Message).where(Message.bout_id == bout.id).order_by(Message.turn_number)
+            )
+            for message in snapshot.all():
+                self._caught_up.add(message.turn_number)
+                self._backlog.extend(_unnumbered(message_events(message)))
+            if bout.status in TERMINAL_STATUSES:
+                self._backlog.append((*terminal_event(bout), None))
+                self._done = True
+                return
+        # Ended before the viewer subscribed, but not flushed when the snapshot was read
+        if self.subscription.joined_after is None:
+            return
+        log = self.subscription.bus.log
+        for event_type, data, _ in log.until(bout.id, self.subscription.joined_after):
+            if event_type == "turn_end" and data["turn_number"] not in self._caught_up:
+                message = await load_message(data["message_id"], self.subscription.bout_id)
+                if message:
+                    self._caught_up.add(message.turn_number)
+                    self._backlog.extend(_unnumbered(message_events(message)))
+
+    async def _filter(self, event_type: str, data: dict, event_id: int | None) -> list[Event]:
+        """Map one live event to what this viewer should see."""
+        if event_type == "turn_start":
+            if data["turn_number"] in self._caught_up:
+                return []
+            self._live_turns[data["agent_name"]] = data["turn_number"]
+
+        elif event_type == "token":
+            if data["agent_name"] not in self._live_turns:
+                return []
+
+        elif event_type == "turn_end":
+            if data["turn_number"] in self._caught_up:
+                return []
+            if self._live_turns.get(data["agent_name"]) == data["turn_number"]:
+                del self._live_turns[data["agent_name"]]
+            else:
+                # Joined mid-turn: send the whole persisted message instead
+                message = await load_message(data["message_id"], self.subscription.bout_id)
+                return _unnumbered(message_events(message)) if message else []
+
+        return [(event_type, data, event_id)]
+
+
+def _unnumbered(events: list[tuple[str, dict]]) -> list[Event]:
+    """Events rebuilt from the database carry no bus id."""
+    return [(event_type, data, None) for event_type, data in events]
+
+
+async def load_message(message_id: str, bout_id: str) -> Message | None:
+    """
+    Fetch one persisted message by id, waiting for its flush if need be.
+
+    turn_end can be published before the bout's next flush, so a missing
+    message is polled for until it appears. A bout's last messages are
+    written with its final status, so once the bout has ended a message
+    still missing is never coming (its flushes failed) and None is returned.
+    """
+    interval = config.PERSIST_FLUSH_INTERVAL or 1.0
+    while True:
+        async with AsyncSessionLocal() as db:
+            message = await db.get(Message, message_id)
+            if message is not None:
+                return message
+            bout = await db.get(Bout, bout_id)
+            if bout is None or bout.status in TERMINAL_STATUSES:
+                # Read again: the final flush may have landed between the two reads
+                return await db.get(Message, message_id)
+        await asyncio.sleep(interval)
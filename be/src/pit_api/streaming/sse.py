@@ -0,0 +1,117 @@
+"""SSE helpers — frame formatting and token coalescing."""
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from pit_api.config import config
+
+
+def format_sse(event_type: str, data: dict, event_id: int | str | None = None) -> str:
+    """Format a single Server-Sent Event frame, with an id line if given."""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+class TokenCoalescer:
+    """
+    Merges consecutive token deltas into larger SSE frames.
+
+    Models emit a delta every few characters; sending each as its own HTTP
+    chunk wastes bandwidth and client render cycles. Deltas for the same agent
+    are buffered until the buffer is max_chars long or the oldest delta is
+    max_delay_ms old, whichever comes first. A merged frame takes the id of
+    the last delta in it, so resuming from that id skips exactly its text.
+    """
+
+    def __init__(self, max_delay_ms: int | None = None, max_chars: int | None = None):
+        """Initialize with optional window overrides (defaults from config)."""
+        if max_delay_ms is None:
+            max_delay_ms = config.SSE_TOKEN_FLUSH_MS
+        if max_chars is None:
+            max_chars = config.SSE_TOKEN_FLUSH_CHARS
+        self.max_delay = max_delay_ms / 1000
+        self.max_chars = max_chars
+        self._agent_name: str | None = None
+        self._last_id: int | None = None
+        self._parts: list[str] = []
+        self._size = 0
+        self._started_at = 0.0
+
+    @property
+    def pending(self) -> bool:
+        """Whether any deltas are buffered."""
+        return bool(self._parts)
+
+    def add(
+        self, agent_name: str, token: str, event_id: int | None = None
+    ) -> list[tuple[str, dict, int | None]]:
+        """
+        Buffer a delta.
+
+        Returns:
+            Token events that are ready to send (possibly empty)
+        """
+        ready = []
+        if self._parts and agent_name != self._agent_name:
+            ready = self.flush()
+
+        if not self._parts:
+            self._agent_name = agent_name
+            self._started_at = time.monotonic()
+        self._parts.append(token)
+        self._size += len(token)
+        self._last_id = event_id
+
+        if self._size >= self.max_chars or self.timeout() == 0:
+            ready.extend(self.flush())
+        return ready
+
+    def flush(self) -> list[tuple[str, dict, int | None]]:
+        """Release everything buffered as a single token event."""
+        if not self._parts:
+            return []
+        data = {"agent_name": self._agent_name, "token": "".join(self._parts)}
+        event = ("token", data, self._last_id)
+        self._parts = []
+        self._size = 0
+        return [event]
+
+    def timeout(self) -> float | None:
+        """Seconds until the buffered frame is due, or None if nothing is buffered."""
+        if not self._parts:
+            return None
+        return max(0.0, self._started_at + self.max_delay - time.monotonic())
+
+
+async def coalesced_frames(
+    next_event: Callable[[], Awaitable[tuple[str, dict, int | None] | None]],
+) -> AsyncIterator[str]:
+    """
+    Turn an event source into SSE frames, coalescing token deltas.
+
+    Args:
+        next_event: Returns the next (event_type, data, event_id), or None at end of stream
+    """
+    coalescer = TokenCoalescer()
+    while True:
+        try:
+            item = await asyncio.wait_for(next_event(), timeout=coalescer.timeout())
+        except asyncio.TimeoutError:
+            for event in coalescer.flush():
+                yield format_sse(*event)
+            continue
+
+        if item is not None and item[0] == "token":
+            event_type, data, event_id = item
+            for event in coalescer.add(data["agent_name"], data["token"], event_id):
+                yield format_sse(*event)
+            continue
+
+        # Buffered text always precedes the next non-token event
+        for event in coalescer.flush():
+            yield format_sse(*event)
+        if item is None:
+            return
+        yield format_sse(*item)
@@ -3,7 +3,8 @@
 import hashlib
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from pit_api.config import config
 
@@ -15,7 +16,7 @@ def hash_ip(ip: str | None) -> str | None:
     return hashlib.sha256(ip.encode()).hexdigest()
 
 
-def check_rate_limit(db: Session, ip_hash: str | None) -> bool:
+async def check_rate_limit(db: AsyncSession, ip_hash: str | None) -> bool:
     """
     Check if an IP is within rate limits.
 
@@ -28,11 +29,10 @@ def check_rate_limit(db: Session, ip_hash: str | None) -> bool:
 
     window_start = datetime.now(timezone.utc) - timedelta(seconds=config.RATE_LIMIT_WINDOW_SECONDS)
 
-    recent_bouts = (
-        db.query(Bout)
-        .filter(Bout.ip_hash == ip_hash)
-        .filter(Bout.created_at >= window_start)
-        .count()
+    recent_bouts = await db.scalar(
+        select(func.count())
+        .select_from(Bout)
+        .where(Bout.ip_hash == ip_hash, Bout.created_at >= window_start)
     )
 
     return recent_bouts < config.RATE_LIMIT_BOUTS_PER_HOUR
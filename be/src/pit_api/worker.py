@@ -0,0 +1,187 @@
+"""pit-worker — runs queued bouts outside the API process.
+
+API nodes (BOUT_EXECUTION=worker) only create bouts, enqueue them and relay
+their streams. Workers claim jobs from the bout_jobs table, run the
+orchestrator and publish its events to the event bus (EVENT_BUS=postgres for
+live streams across processes), so generation capacity scales independently
+of web workers.
+
+On SIGTERM a worker stops claiming, gives in-flight bouts DRAIN_TIMEOUT
+seconds to finish, then parks the rest after their current round and puts
+their jobs back in the queue for another worker to resume.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+from functools import partial
+
+from sqlalchemy.orm import Session
+
+from pit_api.config import config
+from pit_api.engine import (
+    LeaseLost,
+    Orchestrator,
+    agents_from_preset,
+    drain,
+    output_budgets,
+    run_reaper,
+)
+from pit_api.engine.job_queue import claim_next, finish_job, requeue_job
+from pit_api.models import Bout, BoutJob
+from pit_api.models.base import SessionLocal
+from pit_api.store import preset_loader
+from pit_api.streaming import (
+    bout_events,
+    cancel_when_abandoned,
+    end_timed_out_bout,
+    event_bus,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BoutWorker:
+    """Claims bout jobs and runs up to `concurrency` bouts at a time."""
+
+    def __init__(self, worker_id: str | None = None, concurrency: int | None = None):
+        """Initialize with optional identity and concurrency overrides."""
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or config.WORKER_CONCURRENCY
+        self._running: dict[str, tuple[Orchestrator, asyncio.Task]] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming new jobs; in-flight bouts finish or are parked."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until stopped, then wait for in-flight bouts."""
+        logger.info("Worker %s started (concurrency=%d)", self.worker_id, self.concurrency)
+        while not self._stopping.is_set():
+            claimed = False
+            if len(self._running) < self.concurrency:
+                claimed = await self._claim_one()
+            if not claimed:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=config.WORKER_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+        if self._running:
+            logger.info("Worker %s draining %d bouts", self.worker_id, len(self._running))
+            await drain(list(self._running.values()), config.DRAIN_TIMEOUT)
+
+    def _claim_job(self) -> tuple[int, str] | None:
+        db = SessionLocal()
+        try:
+            job = claim_next(db, self.worker_id)
+            return (job.id, job.bout_id) if job else None
+        finally:
+            db.close()
+
+    async def _claim_one(self) -> bool:
+        # Sessions are synchronous; their round trips run off the event loop
+        job = await asyncio.to_thread(self._claim_job)
+        if job is None:
+            return False
+        job_id, bout_id = job
+
+        db = SessionLocal()
+        orchestrator = Orchestrator(db, bout_events(event_bus, SessionLocal))
+        task = asyncio.create_task(self._run_job(job_id, bout_id, orchestrator))
+        self._running[bout_id] = (orchestrator, task)
+        task.add_done_callback(lambda _: self._running.pop(bout_id, None))
+        return True
+
+    async def _run_job(self, job_id: int, bout_id: str, orchestrator: Orchestrator) -> None:
+        db = orchestrator.db
+        error = None
+        parked = False
+        lease_lost = False
+        try:
+            bout = await asyncio.to_thread(db.get, Bout, bout_id)
+            preset = preset_loader.load_one(bout.preset_id) if bout else None
+            if not bout or not preset:
+                error = "Bout or preset not found"
+                return
+
+            watcher = asyncio.create_task(
+                cancel_when_abandoned(orchestrator, bout_id, bout.model_tier)
+            )
+            try:
+                await orchestrator.arun(bout, agents_from_preset(preset, bout.topic))
+            finally:
+                watcher.cancel()
+            parked = bout.status == "pending"
+
+        except LeaseLost:
+            # Reaped (and maybe resumed elsewhere): its job and stream are no longer ours
+            lease_lost = True
+
+        except Exception as e:
+            logger.exception("Bout %s failed", bout_id)
+            error = str(e)
+            event_bus.publish(bout_id, "error", {"code": "FATAL", "message": error})
+
+        finally:
+            if parked:
+                # Viewers stay subscribed; whoever resumes the bout carries on the stream
+                logger.info("Parked bout %s for another worker", bout_id)
+            elif not lease_lost:
+                event_bus.end(bout_id)
+            await asyncio.to_thread(self._settle_job, db, job_id, parked, error, lease_lost)
+
+    @staticmethod
+    def _settle_job(
+        db: Session, job_id: int, parked: bool, error: str | None, lease_lost: bool = False
+    ) -> None:
+        """
+        Requeue a parked bout's job or finish it, then release the session.
+
+        A job whose bout lost its lease is left alone: the reaper already
+        requeued or failed it.
+        """
+        try:
+            db.rollback()
+            job = None
+            if not lease_lost:
+                job = db.query(BoutJob).filter(BoutJob.id == job_id).first()
+            if job and parked:
+                requeue_job(db, job)
+            elif job:
+                finish_job(db, job, error)
+        finally:
+            db.close()
+
+
+def main():
+    """Run a worker until SIGTERM/SIGINT."""
+    logging.basicConfig(level=logging.INFO)
+
+    async def _main() -> None:
+        worker = BoutWorker()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        reaper = None
+        if config.REAPER_INTERVAL > 0:
+            reaper = asyncio.create_task(run_reaper(partial(end_timed_out_bout, event_bus)))
+        budgets = None
+        if config.OUTPUT_BUDGET_INTERVAL > 0:
+            budgets = asyncio.create_task(output_budgets.run())
+        await worker.run()
+        if reaper:
+            reaper.cancel()
+        if budgets:
+            budgets.cancel()
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""Tests for AgentRunner request construction and hedging."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import anthropic
+import httpx
+import pytest
+
+from pit_api.engine.agent_runner import AgentConfig, AgentRunner, TurnTimeoutError
+from pit_api.engine.circuit_breaker import CircuitBreaker, CircuitBreakers, ModelUnavailableError
+from pit_api.engine.hedging import LatencyTracker
+from pit_api.engine.scheduler import BoutScheduler
+from pit_api.engine.speaker_guard import HijackFilter, SpeakerGuardStats, trim_hijack
+
+
+def make_agent() -> AgentConfig:
+    return AgentConfig(name="Darwin", role="naturalist", system_prompt="You are Darwin.")
+
+
+class TestPromptCaching:
+    """Cache breakpoint placement."""
+
+    def test_breakpoints_on_system_and_last_message(self):
+        """System prompt and the newest message carry cache_control."""
+        runner = AgentRunner(model="test-model")
+        conversation = [
+            {"role": "user", "content": "Begin."},
+            {"role": "assistant", "content": "[Darwin]: Observe."},
+        ]
+
+        params = runner._request_params(make_agent(), conversation, max_tokens=100)
+
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert params["messages"][0] == conversation[0]
+        last = params["messages"][-1]["content"]
+        assert last == [
+            {
+                "type": "text",
+                "text": "[Darwin]: Observe.",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        # The caller's conversation is never mutated
+        assert conversation[-1]["content"] == "[Darwin]: Observe."
+
+    def test_caching_disabled(self):
+        """With PROMPT_CACHING off the request is sent as plain strings."""
+        runner = AgentRunner(model="test-model")
+        conversation = [{"role": "user", "content": "Begin."}]
+
+        with patch("pit_api.engine.agent_runner.config.PROMPT_CACHING", False):
+            params = runner._request_params(make_agent(), conversation, max_tokens=100)
+
+        assert params["system"] == "You are Darwin."
+        assert params["messages"] == conversation
+
+
+class FakeStream:
+    """Async stand-in for client.messages.stream(): waits, then streams text."""
+
+    def __init__(self, client, delay: float, text: str):
+        self.client = client
+        self.delay = delay
+        self.text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def gen():
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.client.cancelled += 1
+                raise
+            yield self.text
+
+        return gen()
+
+    @property
+    def current_message_snapshot(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=100, output_tokens=0))
+
+    async def get_final_message(self):
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=self.text)],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=7),
+        )
+
+
+class StallingStream(FakeStream):
+    """Streams its text, then stops responding."""
+
+    @property
+    def text_stream(self):
+        async def gen():
+            yield self.text
+            await asyncio.sleep(self.delay)
+
+        return gen()
+
+
+class FakeAsyncClient:
+    """Each call to messages.stream() takes the next (delay, text) pair."""
+
+    def __init__(self, *calls: tuple[float, str]):
+        self.calls = list(calls)
+        self.cancelled = 0
+        self.models: list[str] = []
+        self.params: list[dict] = []
+        self.messages = SimpleNamespace(stream=self.stream)
+
+    def stream(self, **params):
+        self.models.append(params["model"])
+        self.params.append(params)
+        delay, text = self.calls.pop(0)
+        if isinstance(text, Exception):
+            raise text
+        return FakeStream(self, delay, text)
+
+    def with_options(self, **options):
+        return self
+
+
+class TestHedging:
+    """Racing a second request when the first is slow to start."""
+
+    @pytest.mark.asyncio
+    async def test_slow_first_request_is_hedged(self):
+        client = FakeAsyncClient((1.0, "slow"), (0.01, "fast"))
+        tokens: list[str] = []
+        runner = AgentRunner(model="test-model")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.ttft_tracker.hedge_delay", return_value=0.05),
+        ):
+            start = time.monotonic()
+            result = await runner.arun_streaming(
+                make_agent(), [], on_token=tokens.append, hedge=True
+            )
+
+        assert time.monotonic() - start < 0.5
+        assert result.content == "fast"
+        assert tokens == ["fast"]
+        assert client.cancelled == 1
+        # The cancelled request's usage comes back separately
+        assert result.loser.tokens_in == 100
+        assert result.loser.content == ""
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        client = FakeAsyncClient((0.01, "only"))
+        runner = AgentRunner(model="test-model")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.ttft_tracker.hedge_delay", return_value=0.5),
+        ):
+            result = await runner.arun_streaming(make_agent(), [], hedge=True)
+
+        assert result.content == "only"
+        assert result.loser is None
+        assert client.calls == []
+
+    @pytest.mark.asyncio
+    async def test_hedge_needs_a_free_model_call_permit(self):
+        client = FakeAsyncClient((0.2, "slow"), (0.2, "slow"), (0.01, "fast"))
+        runner = AgentRunner(model="test-model")
+        scheduler = BoutScheduler(max_bouts=1, max_model_calls=1)
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.ttft_tracker.hedge_delay", return_value=0.05),
+            patch("pit_api.engine.agent_runner.bout_scheduler", scheduler),
+        ):
+            async with scheduler.model_call():
+                result = await runner.arun_streaming(make_agent(), [], hedge=True)
+            assert result.content == "slow"
+            assert result.loser is None
+
+            result = await runner.arun_streaming(make_agent(), [], hedge=True)
+            assert result.content == "fast"
+
+        assert client.calls == []
+        assert scheduler.stats()["in_flight_model_calls"] == 0
+
+    def test_threshold_waits_for_samples(self):
+        tracker = LatencyTracker()
+        with patch("pit_api.engine.hedging.config.HEDGE_MIN_SAMPLES", 20):
+            for _ in range(19):
+                tracker.record("m", 0.1)
+            assert tracker.hedge_delay("m") is None
+            for i in range(81):
+                tracker.record("m", 0.1 if i < 75 else 2.0)
+            # 6 of 100 samples are slow, so p95 lands on one of them
+            assert tracker.percentile("m", 95) == 2.0
+
+
+def overloaded() -> anthropic.APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(529, request=request)
+    return anthropic.APIStatusError("Overloaded", response=response, body=None)
+
+
+class TestFailover:
+    """Per-model circuit breakers and the tier's fallback model."""
+
+    @pytest.mark.asyncio
+    async def test_upstream_failure_falls_back(self):
+        client = FakeAsyncClient((0, overloaded()), (0, "backup"))
+        runner = AgentRunner(model="primary", fallback_model="fallback")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.circuit_breakers", CircuitBreakers()),
+        ):
+            result = await runner.arun_streaming(make_agent(), [])
+
+        assert client.models == ["primary", "fallback"]
+        assert result.content == "backup"
+        assert result.model_used == "fallback"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_model(self):
+        breakers = CircuitBreakers()
+        breakers.get("primary").record_failure(wait=60)
+        client = FakeAsyncClient((0, "backup"))
+        runner = AgentRunner(model="primary", fallback_model="fallback")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.circuit_breakers", breakers),
+        ):
+            result = await runner.arun_streaming(make_agent(), [])
+            breakers.get("fallback").record_failure(wait=60)
+            with pytest.raises(ModelUnavailableError):
+                await runner.arun_streaming(make_agent(), [])
+
+        assert client.models == ["fallback"]
+        assert result.model_used == "fallback"
+
+    def test_breaker_trips_and_probes(self):
+        breaker = CircuitBreaker("m")
+        with (
+            patch("pit_api.engine.circuit_breaker.config.CIRCUIT_MIN_CALLS", 4),
+            patch("pit_api.engine.circuit_breaker.config.CIRCUIT_FAILURE_RATE", 0.5),
+            patch("pit_api.engine.circuit_breaker.config.CIRCUIT_OPEN_SECONDS", 0.05),
+        ):
+            breaker.record_success(0.1)
+            breaker.record_failure()
+            breaker.record_success(0.1)
+            assert breaker.allow()
+            breaker.record_failure()
+            assert breaker.state == "open"
+            assert not breaker.allow()
+
+            time.sleep(0.06)
+            assert breaker.allow()  # The probe
+            assert not breaker.allow()
+            breaker.record_success(0.1)
+            assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_slot(self):
+        breakers = CircuitBreakers()
+        breaker = breakers.get("primary")
+        breaker.record_failure(wait=60)
+        breaker._open_until = 0  # Open time is up: the next call probes
+        client = FakeAsyncClient((10, "slow"))
+        runner = AgentRunner(model="primary")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.circuit_breakers", breakers),
+        ):
+            probe = asyncio.create_task(runner.arun_streaming(make_agent(), []))
+            await asyncio.sleep(0.01)
+            assert not breaker.allow()  # Slot taken by the probe
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+
+    def test_retry_after_holds_circuit_open(self):
+        breaker = CircuitBreaker("m")
+        breaker.record_failure(wait=60)
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+
+class TestTurnDeadline:
+    """Turns cut off at the per-turn deadline."""
+
+    @pytest.mark.asyncio
+    async def test_partial_text_is_kept(self):
+        client = FakeAsyncClient()
+        client.messages.stream = lambda **params: StallingStream(client, 10, "Half a sentence and")
+        tokens: list[str] = []
+        runner = AgentRunner(model="test-model")
+
+        with patch.object(AgentRunner, "async_client", client):
+            start = time.monotonic()
+            result = await runner.arun_streaming(
+                make_agent(), [], on_token=tokens.append, deadline=0.05
+            )
+
+        assert time.monotonic() - start < 0.5
+        assert result.truncated is True
+        assert result.content == "Half a sentence and"
+        assert tokens == ["Half a sentence and"]
+        assert result.tokens_in == 100
+        assert result.tokens_out == 5  # estimated from 19 characters
+
+    @pytest.mark.asyncio
+    async def test_no_text_by_deadline_fails_the_turn(self):
+        client = FakeAsyncClient((10, "too late"))
+        runner = AgentRunner(model="test-model")
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.circuit_breakers", CircuitBreakers()),
+        ):
+            with pytest.raises(TurnTimeoutError):
+                await runner.arun_streaming(make_agent(), [], deadline=0.05)
+
+
+class TestSpeakerGuard:
+    """Other agents' prefixes stop and trim a reply."""
+
+    @pytest.mark.asyncio
+    async def test_stop_sequences_and_trim(self):
+        client = FakeAsyncClient((0, "I disagree.\n**[Huxley]**: Nonsense!"))
+        runner = AgentRunner(model="test-model")
+        stats = SpeakerGuardStats()
+        tokens: list[str] = []
+
+        with (
+            patch.object(AgentRunner, "async_client", client),
+            patch("pit_api.engine.agent_runner.speaker_guard", stats),
+        ):
+            result = await runner.arun_streaming(
+                make_agent(),
+                [],
+                max_tokens=100,
+                on_token=tokens.append,
+                other_speakers=["Huxley", "Owen"],
+            )
+
+        assert client.params[0]["stop_sequences"] == ["\n[Huxley]:", "\n[Owen]:"]
+        assert result.content == "I disagree."
+        assert "".join(tokens) == "I disagree."
+        assert stats.trimmed_turns == 1
+        assert stats.tokens_trimmed > 0
+
+    @pytest.mark.parametrize(
+        "deltas",
+        [
+            ["I disagree.", "\n**[Hux", "ley]**", ": Nonsense!"],
+            ["I disagree.\n", "\n[", "Huxley] said so.", "\n> [Owen", "]:", " Quite."],
+            ["[Huxley]", ": all", " of it\n[Owen]: me"],
+            ["Fine. ", "\n", "[Darwin]: ", "done  "],
+        ],
+    )
+    def test_stream_matches_trimmed_content(self, deltas):
+        others = ["Huxley", "Owen"]
+        forwarded: list[str] = []
+        guard = HijackFilter(others, forwarded.append)
+        for delta in deltas:
+            guard.feed(delta)
+            # Never ahead of what the stored message will say
+            assert trim_hijack("".join(deltas), others).startswith("".join(forwarded))
+        content = trim_hijack("".join(deltas), others)
+        guard.finish(content)
+        assert "".join(forwarded) == content
+
+    def test_trim_leaves_own_lines_and_mentions(self):
+        others = ["Huxley"]
+        assert trim_hijack("As [Huxley] said: no.", others) == "As [Huxley] said: no."
+        assert trim_hijack("[Darwin]: Observe.\n[Huxley]: Hm.", others) == "[Darwin]: Observe."
+        assert trim_hijack("[Huxley]: all of it", others) == "[Huxley]: all of it"
@@ -0,0 +1,47 @@
+"""Tests for the shared Anthropic client registry."""
+
+import asyncio
+
+import httpx
+
+from pit_api.engine import ClientRegistry
+
+
+class TestClientRegistry:
+    """One pool per process (sync) and per event loop (async)."""
+
+    def test_sync_client_is_shared(self):
+        registry = ClientRegistry()
+        assert registry.sync_client() is registry.sync_client()
+
+    def test_async_client_per_event_loop(self):
+        registry = ClientRegistry()
+
+        async def get_twice():
+            return registry.async_client(), registry.async_client()
+
+        first, again = asyncio.run(get_twice())
+        assert first is again
+        other, _ = asyncio.run(get_twice())
+        assert other is not first
+
+    def test_counts_new_connections(self):
+        registry = ClientRegistry()
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+        registry._trace_request(request)
+        trace = request.extensions["trace"]
+        trace("connection.connect_tcp.started", {})
+        trace("connection.connect_tcp.complete", {})
+        trace("http11.send_request_headers.complete", {})
+
+        assert registry.handshakes == 1
+
+    def test_stats(self):
+        registry = ClientRegistry()
+        registry.sync_client()
+        stats = registry.stats()
+        assert stats["clients"] == 1
+        assert stats["open_connections"] == 0
+        assert stats["waiting_requests"] == 0
+        assert stats["handshakes"] == 0
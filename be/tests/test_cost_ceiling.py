@@ -1,9 +1,14 @@
 """Tests for cost ceiling functionality."""
 
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
 import pytest
 
 from pit_api.config import config
-from pit_api.engine.token_meter import TokenMeter
+from pit_api.engine.output_budgets import OutputBudgets
+from pit_api.engine.token_meter import TokenMeter, estimate_prompt_tokens
+from pit_api.models import Metric
 
 
 class TestCostCeiling:
@@ -51,3 +56,120 @@ class TestCostCeiling:
         meter.record(tokens_in=1_000_000, tokens_out=1_000_000, model="claude-opus-4-5-20251101")
 
         assert meter.is_over_budget() is False
+
+    def test_cache_tokens_priced_separately(self):
+        """Cache reads should cost a tenth of input, cache writes a quarter more."""
+        model = "claude-sonnet-4-5-20250929"  # $3 input per million
+
+        uncached = TokenMeter()
+        uncached.record(tokens_in=1_000_000, tokens_out=0, model=model)
+
+        read = TokenMeter()
+        read.record(tokens_in=0, tokens_out=0, model=model, tokens_cache_read=1_000_000)
+
+        written = TokenMeter()
+        written.record(tokens_in=0, tokens_out=0, model=model, tokens_cache_write=1_000_000)
+
+        assert uncached.total_cost == pytest.approx(3.00)
+        assert read.total_cost == pytest.approx(0.30)
+        assert written.total_cost == pytest.approx(3.75)
+        assert read.total_tokens_cache_read == 1_000_000
+
+    def test_hedge_spend_metered_separately(self):
+        """Cancelled hedge requests don't count toward the bout's cost, but stop hedging."""
+        meter = TokenMeter(budget=0.01)
+        meter.record(tokens_in=1000, tokens_out=0, model="claude-haiku-4-5-20251001")
+        meter.record_hedge(tokens_in=10_000, tokens_out=0, model="claude-haiku-4-5-20251001")
+
+        assert meter.total_cost == pytest.approx(0.001)
+        assert meter.hedge_cost == pytest.approx(0.01)
+        assert meter.is_over_budget() is False
+        assert meter.can_hedge() is False
+
+    def test_forecast_shrinks_max_tokens_to_fit(self):
+        """The last turns get only as many output tokens as the budget allows."""
+        model = "claude-haiku-4-5-20251001"  # $5 output per million
+        meter = TokenMeter(budget=0.01)
+        meter.record(tokens_in=0, tokens_out=1000, model=model)  # $0.005 spent
+
+        with patch("pit_api.engine.token_meter.config.PROMPT_CACHING", False):
+            # 1000 prompt tokens ($0.001) leave $0.004 = 800 output tokens
+            assert meter.affordable_max_tokens(model, [("A", 1000)], 500) == 500
+            assert meter.affordable_max_tokens(model, [("A", 1000)], 2000) == 800
+            # Two responders share what's left
+            assert meter.affordable_max_tokens(model, [("A", 1000), ("B", 1000)], 2000) == 300
+            assert meter.affordable_max_tokens(model, [("A", 10_000)], 500) == 0
+
+        assert meter.total_cost == pytest.approx(0.005)
+        assert TokenMeter().affordable_max_tokens(model, [("A", 10**9)], 500) == 500
+
+    def test_forecast_prices_cached_prefix_as_read(self):
+        model = "claude-sonnet-4-5-20250929"
+        meter = TokenMeter()
+        meter.record(tokens_in=10, tokens_out=0, model=model, tokens_cache_read=990, agent="A")
+
+        with patch("pit_api.engine.token_meter.config.PROMPT_CACHING", True):
+            # 1000 tokens read at $0.30/M, 1000 new written at $3.75/M
+            assert meter.forecast(model, 2000, 0, agent="A") == pytest.approx(0.00405)
+            assert meter.forecast(model, 2000, 0, agent="B") == pytest.approx(0.0075)
+
+    def test_prompt_estimate(self):
+        conversation = [{"role": "user", "content": "x" * 400}]
+        assert estimate_prompt_tokens("y" * 40, conversation) == 10 + 100 + 4
+
+
+class TestOutputBudgets:
+    """Learned per-agent max_tokens."""
+
+    def test_percentile_plus_headroom(self):
+        budgets = OutputBudgets()
+        budgets.load(
+            [
+                ("darwin", "House Cat", "standard", 40.0, 500),  # Floored at the minimum
+                ("darwin", "Darwin", "standard", 250.0, 500),
+                ("darwin", "Darwin", "juiced", 480.0, 500),  # Above the default cap
+                ("darwin", "Wallace", "standard", 50.0, 3),  # Too few samples
+            ]
+        )
+
+        assert budgets.max_tokens("darwin", "House Cat", "standard", 500) == (
+            config.MIN_TOKENS_PER_TURN
+        )
+        assert budgets.max_tokens("darwin", "Darwin", "standard", 500) == 300
+        assert budgets.max_tokens("darwin", "Darwin", "juiced", 500) == 500
+        assert budgets.max_tokens("darwin", "Wallace", "standard", 500) == 500
+        assert budgets.max_tokens(None, "Darwin", "standard", 500) == 500
+        assert budgets.stats()["learned"] == 3
+
+    def test_fresh_stored_budgets_are_loaded_not_recomputed(self):
+        budgets = OutputBudgets()
+        latest = Metric(
+            payload={"rows": [["darwin", "Darwin", "standard", 250.0, 500]]},
+            created_at=datetime.now(timezone.utc),
+        )
+        with (
+            patch.object(OutputBudgets, "_latest", return_value=latest),
+            patch.object(OutputBudgets, "compute") as compute,
+        ):
+            budgets.refresh(MagicMock(), max_age=60)
+
+        compute.assert_not_called()
+        assert budgets.max_tokens("darwin", "Darwin", "standard", 500) == 300
+
+    def test_stale_budgets_are_recomputed_under_the_lock(self):
+        budgets = OutputBudgets()
+        db = MagicMock()
+        old = Metric(
+            payload={"rows": []}, created_at=datetime.now(timezone.utc) - timedelta(hours=2)
+        )
+        rows = [("darwin", "Darwin", "standard", 250.0, 500)]
+        with (
+            patch.object(OutputBudgets, "_latest", return_value=old),
+            patch.object(OutputBudgets, "compute", return_value=rows),
+            patch.object(Metric, "log") as log,
+        ):
+            budgets.refresh(db, max_age=60)
+
+        db.execute.assert_called_once()  # The advisory lock
+        log.assert_called_once_with(db, "output_budgets", payload={"rows": [list(rows[0])]})
+        assert budgets.max_tokens("darwin", "Darwin", "standard", 500) == 300
@@ -4,6 +4,7 @@ These tests verify API behavior. Database-dependent tests require
 PostgreSQL via Docker. Run: `docker compose up -d` before testing.
 """
 
+import asyncio
 import json
 from unittest.mock import patch
 
@@ -22,8 +23,9 @@ def app():
 
 @pytest.fixture
 def client(app):
-    """Create test client."""
-    return TestClient(app)
+    """Create test client (running the lifespan, so the async pool is closed after)."""
+    with TestClient(app) as client:
+        yield client
 
 
 def db_available():
@@ -39,6 +41,20 @@ def db_available():
         return False
 
 
+def run_async(coro):
+    """Run a coroutine on its own loop, without sharing asyncpg connections across loops."""
+    from pit_api.models.base import async_engine
+
+    async def run():
+        await async_engine.dispose(close=False)  # Opened on the test client's loop
+        try:
+            return await coro
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
 requires_db = pytest.mark.skipif(
     not db_available(),
     reason="PostgreSQL not available (run: docker compose up -d)"
@@ -67,6 +83,18 @@ class MockAgentRunner:
             latency_ms=50,
         )
 
+    async def arun(self, agent, conversation, max_tokens=500):
+        """Async variant of run()."""
+        return self.run(agent, conversation, max_tokens)
+
+    async def arun_streaming(self, agent, conversation, max_tokens=500, on_token=None, **options):
+        """Streaming variant used by Orchestrator.arun; emits one delta per word."""
+        result = self.run(agent, conversation, max_tokens)
+        if on_token:
+            for word in result.content.split(" "):
+                on_token(word + " ")
+        return result
+
 
 class TestAPIEndpoints:
     """Tests for API endpoints that don't require database."""
@@ -221,6 +249,7 @@ class TestBoutFlow:
                 assert "turn_start" in event_types, f"Expected turn_start, got: {event_types}"
                 assert "turn_end" in event_types, f"Expected turn_end, got: {event_types}"
                 assert "bout_complete" in event_types, f"Expected bout_complete, got: {event_types}"
+                assert "token" in event_types, f"Expected token, got: {event_types}"
 
                 # bout_complete should be last (or near last)
                 complete_idx = event_types.index("bout_complete")
@@ -246,3 +275,201 @@ class TestBoutFlow:
                     f"Anthropic requires at least one message. "
                     f"Got: {first_conversation}"
                 )
+
+
+@requires_db
+class TestJobQueue:
+    """Database-dependent tests for the pit-worker job queue."""
+
+    def test_job_claimed_once(self, client):
+        """A queued bout is enqueued once and claimed by exactly one worker."""
+        from pit_api.engine import claim_next, enqueue_bout, finish_job
+        from pit_api.models import Bout, BoutJob
+        from pit_api.models.base import SessionLocal
+
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+        bout_id = response.json()["bout_id"]
+
+        db = SessionLocal()
+        try:
+            bout = db.query(Bout).filter(Bout.id == bout_id).first()
+            enqueue_bout(db, bout)
+            enqueue_bout(db, bout)  # idempotent
+            assert db.query(BoutJob).filter(BoutJob.bout_id == bout_id).count() == 1
+
+            claimed = []
+            while (job := claim_next(db, "test-worker")) is not None:
+                claimed.append(job.bout_id)
+                finish_job(db, job)
+            assert claimed.count(bout_id) == 1
+            assert claim_next(db, "other-worker") is None
+        finally:
+            db.close()
+
+
+@requires_db
+class TestWatchdog:
+    """Database-dependent tests for the stuck-bout reaper."""
+
+    def test_stale_running_bout_reaped(self, client):
+        """A running bout whose heartbeat expired is marked timeout; a live one is not."""
+        from datetime import datetime, timedelta, timezone
+
+        from pit_api.engine import reap_stale_bouts
+        from pit_api.models import Bout
+        from pit_api.models.base import SessionLocal
+
+        ids = []
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            for _ in range(2):
+                response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+                ids.append(response.json()["bout_id"])
+        stale_id, live_id = ids
+
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            for bout_id, beat in ((stale_id, now - timedelta(hours=1)), (live_id, now)):
+                bout = db.query(Bout).filter(Bout.id == bout_id).first()
+                bout.status = "running"
+                bout.heartbeat_at = beat
+            db.commit()
+
+            reaped = reap_stale_bouts(db, lease_timeout=60)
+
+            assert stale_id in reaped and live_id not in reaped
+            db.expire_all()
+            assert db.query(Bout).filter(Bout.id == stale_id).first().status == "timeout"
+            assert db.query(Bout).filter(Bout.id == live_id).first().status == "running"
+        finally:
+            db.close()
+
+    def test_checkpointed_stale_bout_resumed(self, client):
+        """A stale bout with a checkpoint is requeued, claimed again and finished."""
+        from datetime import datetime, timedelta, timezone
+
+        from pit_api.engine import (
+            AgentConfig,
+            Orchestrator,
+            OrchestratorEvents,
+            claim_next,
+            enqueue_bout,
+            reap_stale_bouts,
+        )
+        from pit_api.models import Bout, BoutJob
+        from pit_api.models.base import SessionLocal
+
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+        bout_id = response.json()["bout_id"]
+        agents = [AgentConfig(name=n, role=n, system_prompt="") for n in ("A", "B")]
+
+        db = SessionLocal()
+        try:
+            bout = db.query(Bout).filter(Bout.id == bout_id).first()
+            enqueue_bout(db, bout)
+            while (job := claim_next(db, "test-worker")) and job.bout_id != bout_id:
+                pass
+
+            with (
+                patch("pit_api.engine.orchestrator.AgentRunner", return_value=MockAgentRunner()),
+                patch.object(Orchestrator, "_get_turns_for_tier", return_value=4),
+            ):
+                # Write a checkpoint after the first round, then "crash" while running
+                orchestrator = Orchestrator(db)
+                orchestrator.events = OrchestratorEvents(on_turn_end=lambda *_: orchestrator.park())
+                run_async(orchestrator.arun(bout, agents))
+                bout = db.query(Bout).filter(Bout.id == bout_id).first()
+                bout.status = "running"
+                bout.lease_owner = "crashed"
+                bout.heartbeat_at = datetime.now(timezone.utc) - timedelta(hours=1)
+                db.commit()
+
+                assert bout_id not in reap_stale_bouts(db, lease_timeout=60)
+                db.expire_all()
+                bout = db.query(Bout).filter(Bout.id == bout_id).first()
+                assert (bout.status, bout.lease_owner, bout.resume_attempts) == ("pending", None, 1)
+                job = db.query(BoutJob).filter(BoutJob.bout_id == bout_id).first()
+                assert job.status == "queued"
+
+                run_async(Orchestrator(db).arun(bout, agents))
+
+            db.expire_all()
+            bout = db.query(Bout).filter(Bout.id == bout_id).first()
+            assert (bout.status, bout.total_turns) == ("complete", 4)
+        finally:
+            db.close()
+
+    def test_reaped_owner_cannot_write(self, client):
+        """Once a bout is reaped, its old owner's heartbeat and writes are refused."""
+        from pit_api.engine import LeaseLost, SessionSink
+        from pit_api.engine.watchdog import claim_bout, touch_heartbeat
+        from pit_api.models import Bout
+        from pit_api.models.base import SessionLocal
+
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+        bout_id = response.json()["bout_id"]
+
+        db = SessionLocal()
+        try:
+            assert claim_bout(db, bout_id, "first")
+            assert run_async(touch_heartbeat(bout_id, "first"))
+            db.query(Bout).filter(Bout.id == bout_id).update({"status": "timeout"})
+            db.commit()
+
+            assert not run_async(touch_heartbeat(bout_id, "first"))
+            sink = SessionSink(bout_id, "first")
+            sink.update_bout(status="complete")
+            with pytest.raises(LeaseLost):
+                run_async(sink.flush())
+
+            db.expire_all()
+            assert db.query(Bout).filter(Bout.id == bout_id).first().status == "timeout"
+        finally:
+            db.close()
+
+    def test_bout_claimed_once(self, client):
+        """Only the first of two claims on a pending bout wins."""
+        from pit_api.engine.watchdog import claim_bout
+        from pit_api.models import Bout
+        from pit_api.models.base import SessionLocal
+
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+        bout_id = response.json()["bout_id"]
+
+        db = SessionLocal()
+        try:
+            assert claim_bout(db, bout_id, "first")
+            assert not claim_bout(db, bout_id, "second")
+            bout = db.query(Bout).filter(Bout.id == bout_id).first()
+            assert (bout.status, bout.lease_owner) == ("running", "first")
+        finally:
+            db.close()
+
+
+@requires_db
+class TestPresence:
+    """Who counts as a spectator."""
+
+    def test_starter_reload_is_not_a_share(self, client):
+        """Only a bout_spectate from someone other than the starter marks it shared."""
+        from pit_api.models import Metric
+        from pit_api.models.base import SessionLocal
+        from pit_api.streaming.presence import _was_shared
+        from pit_api.utils import hash_ip
+
+        with patch("pit_api.routes.bout.check_rate_limit", return_value=True):
+            response = client.post("/api/bout", json={"preset_id": "roast-battle"})
+        bout_id = response.json()["bout_id"]
+
+        db = SessionLocal()
+        try:
+            Metric.log(db, "bout_spectate", bout_id=bout_id, ip_hash=hash_ip("testclient"))
+            assert not run_async(_was_shared(bout_id))
+            Metric.log(db, "bout_spectate", bout_id=bout_id, ip_hash=hash_ip("10.0.0.2"))
+            assert run_async(_was_shared(bout_id))
+        finally:
+            db.close()
@@ -0,0 +1,407 @@
+"""Tests for event bus delivery."""
+
+import asyncio
+import json
+import socket
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from pit_api.config import config
+from pit_api.models import Bout, Message
+from pit_api.streaming import InProcessEventBus, PostgresEventBus, Spectator, presence
+from pit_api.streaming.event_bus import EventLog, coalesce_tokens
+from pit_api.streaming.presence import ViewerPresence, cancel_when_abandoned
+
+
+class TestInProcessEventBus:
+    """Local fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_to_all_subscribers(self):
+        bus = InProcessEventBus()
+        first, second = bus.subscribe("b1"), bus.subscribe("b1")
+        other = bus.subscribe("b2")
+
+        bus.publish("b1", "turn_start", {"agent_name": "A", "turn_number": 0})
+        bus.end("b1")
+
+        for subscription in (first, second):
+            event_type, data, event_id = await subscription.get()
+            assert (event_type, data) == ("turn_start", {"agent_name": "A", "turn_number": 0})
+            assert isinstance(event_id, int)
+            assert await subscription.get() is None
+        assert other.queue.empty()
+        assert bus.subscriber_count("b1") == 0
+        assert bus.subscriber_count("b2") == 1
+
+    @pytest.mark.asyncio
+    async def test_closed_subscription_stops_receiving(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        subscription.close()
+        bus.publish("b1", "turn_start", {})
+        assert subscription.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_evicted(self):
+        bus = InProcessEventBus()
+        slow = bus.subscribe("b1")
+        slow.max_buffer = 3
+        fast = bus.subscribe("b1")
+
+        for i in range(5):
+            bus.publish("b1", "token", {"agent_name": "A", "token": str(i)})
+            await fast.get()
+
+        assert slow.evicted
+        assert (await slow.get())[1]["code"] == "SLOW_CONSUMER"
+        assert await slow.get() is None
+        assert bus.subscriber_count("b1") == 1
+
+
+class TestResumption:
+    """Event ids and Last-Event-ID resumption from the event log."""
+
+    def test_ids_increase_per_bout(self):
+        bus = InProcessEventBus()
+        first = bus._next_id("b1")
+        assert bus._next_id("b1") == first + 1
+        assert bus._next_id("b1") == first + 2
+
+    def test_log_reports_gaps(self):
+        log = EventLog(max_events=3)
+        for event_id in range(1, 6):
+            log.append("b1", "token", {}, event_id)
+        assert [i for _, _, i in log.since("b1", 3)] == [4, 5]
+        assert log.since("b1", 2) == [("token", {}, 3), ("token", {}, 4), ("token", {}, 5)]
+        assert log.since("b1", 1) is None
+        assert log.since("b2", 0) is None
+
+    def test_log_evicts_oldest_bout(self):
+        log = EventLog(max_bouts=2)
+        for bout_id in ("b1", "b2", "b3"):
+            log.append(bout_id, "token", {}, 1)
+        assert log.since("b1", 0) is None
+        assert log.since("b3", 0) is not None
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_then_continues_live(self):
+        bus = InProcessEventBus()
+        seen = bus.subscribe("b1")
+        for n in range(3):
+            bus.publish("b1", "token", {"agent_name": "A", "token": str(n)})
+        first_id = (await seen.get())[2]
+
+        resumed = bus.resume("b1", first_id)
+        bus.publish("b1", "token", {"agent_name": "A", "token": "3"})
+        bus.end("b1")
+
+        tokens = []
+        while (event := await resumed.get()) is not None:
+            tokens.append(event[1]["token"])
+        assert tokens == ["1", "2", "3"]
+
+    def test_finished_bout_needs_end_in_log(self):
+        bus = InProcessEventBus()
+        bus.publish("b1", "token", {"agent_name": "A", "token": "x"})
+        bus.publish("b1", "token", {"agent_name": "A", "token": "y"})
+        first_id = bus.log._logs["b1"][0][2]
+        assert bus.resume("b1", first_id, finished=True) is None
+        bus.end("b1")
+        assert bus.resume("b1", first_id, finished=True) is not None
+
+
+def _session_with(bout, messages, by_id=None):
+    """A mock async session returning the given bout and its message snapshot."""
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.get = AsyncMock(side_effect=[bout, *(by_id or [])])
+    session.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=messages)))
+    return session
+
+
+async def _drain(spectator):
+    events = []
+    while (item := await spectator.get()) is not None:
+        events.append(item)
+    return events
+
+
+class TestSpectator:
+    """Catch-up snapshot followed by the live tail."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_live_without_duplicates(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        # Turn 0 finished before the snapshot read; turn 1 is live from its start
+        bus.publish("b1", "turn_start", {"agent_name": "A", "turn_number": 0})
+        bus.publish("b1", "turn_end", {"agent_name": "A", "turn_number": 0, "message_id": "m0"})
+        bus.publish("b1", "turn_start", {"agent_name": "B", "turn_number": 1})
+        bus.publish("b1", "token", {"agent_name": "B", "token": "live"})
+        bus.publish("b1", "turn_end", {"agent_name": "B", "turn_number": 1, "message_id": "m1"})
+        bus.publish("b1", "bout_complete", {"bout_id": "b1", "total_cost": 0.01})
+        bus.end("b1")
+
+        bout = Bout(id="b1", status="running")
+        snapshot = [Message(id="m0", bout_id="b1", agent_name="A", turn_number=0, content="hi")]
+        with patch(
+            "pit_api.streaming.spectator.AsyncSessionLocal",
+            return_value=_session_with(bout, snapshot),
+        ):
+            events = await _drain(await Spectator.attach(subscription))
+
+        assert [(t, d.get("turn_number")) for t, d, _ in events] == [
+            ("turn_start", 0),
+            ("token", None),
+            ("turn_end", 0),
+            ("turn_start", 1),
+            ("token", None),
+            ("turn_end", 1),
+            ("bout_complete", None),
+        ]
+        assert events[1][1]["token"] == "hi"
+        assert events[4][1]["token"] == "live"
+
+    @pytest.mark.asyncio
+    async def test_turn_joined_midway_sent_whole(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        bus.publish("b1", "token", {"agent_name": "A", "token": "…tail"})
+        bus.publish("b1", "turn_end", {"agent_name": "A", "turn_number": 0, "message_id": "m0"})
+        bus.end("b1")
+
+        bout = Bout(id="b1", status="running")
+        whole = Message(id="m0", bout_id="b1", agent_name="A", turn_number=0, content="whole")
+        with patch(
+            "pit_api.streaming.spectator.AsyncSessionLocal",
+            return_value=_session_with(bout, [], by_id=[whole]),
+        ):
+            events = await _drain(await Spectator.attach(subscription))
+
+        assert [t for t, _, _ in events] == ["turn_start", "token", "turn_end"]
+        assert events[1][1]["token"] == "whole"
+
+    @pytest.mark.asyncio
+    async def test_turn_ended_before_flush_is_loaded(self):
+        bus = InProcessEventBus()
+        # Ended before the viewer joined, but its row was not in the snapshot yet
+        bus.publish("b1", "turn_start", {"agent_name": "A", "turn_number": 0})
+        bus.publish("b1", "turn_end", {"agent_name": "A", "turn_number": 0, "message_id": "m0"})
+        subscription = bus.subscribe("b1")
+        bus.end("b1")
+
+        bout = Bout(id="b1", status="running")
+        whole = Message(id="m0", bout_id="b1", agent_name="A", turn_number=0, content="whole")
+        with (
+            patch(
+                "pit_api.streaming.spectator.AsyncSessionLocal",
+                return_value=_session_with(bout, [], by_id=[None, bout, None, bout, whole]),
+            ),
+            patch.object(config, "PERSIST_FLUSH_INTERVAL", 0.01),  # Polled until flushed
+        ):
+            events = await _drain(await Spectator.attach(subscription))
+
+        assert [t for t, _, _ in events] == ["turn_start", "token", "turn_end"]
+        assert events[1][1]["token"] == "whole"
+
+    @pytest.mark.asyncio
+    async def test_message_never_flushed_is_skipped_once_bout_ends(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        bus.publish("b1", "turn_end", {"agent_name": "A", "turn_number": 0, "message_id": "m0"})
+        bus.publish("b1", "bout_complete", {"bout_id": "b1", "total_cost": 0.01})
+        bus.end("b1")
+
+        running = Bout(id="b1", status="running")
+        failed = Bout(id="b1", status="error")
+        with (
+            patch(
+                "pit_api.streaming.spectator.AsyncSessionLocal",
+                return_value=_session_with(running, [], by_id=[None, failed, None]),
+            ),
+            patch.object(config, "PERSIST_FLUSH_INTERVAL", 0.01),
+        ):
+            events = await _drain(await Spectator.attach(subscription))
+
+        assert [t for t, _, _ in events] == ["bout_complete"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_message_load_is_not_lost(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        bus.publish("b1", "turn_end", {"agent_name": "A", "turn_number": 0, "message_id": "m0"})
+        bus.end("b1")
+
+        loaded = asyncio.Event()
+        whole = Message(id="m0", bout_id="b1", agent_name="A", turn_number=0, content="whole")
+
+        async def slow_load(message_id, bout_id):
+            await loaded.wait()
+            return whole
+
+        with (
+            patch(
+                "pit_api.streaming.spectator.AsyncSessionLocal",
+                return_value=_session_with(Bout(id="b1", status="running"), []),
+            ),
+            patch("pit_api.streaming.spectator.load_message", side_effect=slow_load),
+        ):
+            spectator = await Spectator.attach(subscription)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(spectator.get(), timeout=0.01)
+            loaded.set()
+            events = await _drain(spectator)
+
+        assert [t for t, _, _ in events] == ["turn_start", "token", "turn_end"]
+
+    @pytest.mark.asyncio
+    async def test_finished_bout_closes_after_snapshot(self):
+        bus = InProcessEventBus()
+        subscription = bus.subscribe("b1")
+        bout = Bout(id="b1", status="complete", token_cost=0.02)
+        with patch(
+            "pit_api.streaming.spectator.AsyncSessionLocal",
+            return_value=_session_with(bout, []),
+        ):
+            events = await _drain(await Spectator.attach(subscription))
+
+        assert events == [
+            ("bout_complete", {"bout_id": "b1", "total_cost": 0.02, "reason": None}, None)
+        ]
+
+
+class TestPostgresEncoding:
+    """NOTIFY payload construction (no database needed)."""
+
+    def test_small_event_single_payload(self):
+        bus = PostgresEventBus(dsn="postgresql://unused")
+        payloads = bus._encode("b1", "turn_end", {"message_id": "m1"}, 7)
+        assert [json.loads(p) for p in payloads] == [
+            {"bout_id": "b1", "id": 7, "type": "turn_end", "data": {"message_id": "m1"}}
+        ]
+
+    def test_large_token_split_under_limit(self):
+        bus = PostgresEventBus(dsn="postgresql://unused")
+        text = "é" * 20_000
+        payloads = bus._encode("b1", "token", {"agent_name": "A", "token": text})
+
+        assert len(payloads) > 1
+        assert all(len(p.encode()) <= bus.MAX_PAYLOAD_BYTES for p in payloads)
+        assert "".join(json.loads(p)["data"]["token"] for p in payloads) == text
+
+    def test_token_runs_are_coalesced(self):
+        events = [
+            ("b1", "token", {"agent_name": "A", "token": "Hel"}, 1),
+            ("b2", "token", {"agent_name": "C", "token": "x"}, 1),
+            ("b1", "token", {"agent_name": "A", "token": "lo"}, 2),
+            ("b1", "token", {"agent_name": "B", "token": "Hi"}, 3),
+            ("b1", "turn_end", {"agent_name": "B", "turn_number": 1}, 4),
+            ("b1", "token", {"agent_name": "B", "token": "!"}, 5),
+        ]
+        assert coalesce_tokens(events) == [
+            ("b1", "token", {"agent_name": "A", "token": "Hello"}, 2),
+            ("b2", "token", {"agent_name": "C", "token": "x"}, 1),
+            ("b1", "token", {"agent_name": "B", "token": "Hi"}, 3),
+            ("b1", "turn_end", {"agent_name": "B", "turn_number": 1}, 4),
+            ("b1", "token", {"agent_name": "B", "token": "!"}, 5),
+        ]
+
+    def test_notify_failure_is_logged_not_raised(self, caplog):
+        bus = PostgresEventBus(dsn="postgresql://unused")
+        with patch("pit_api.streaming.event_bus.psycopg2.connect", side_effect=OSError("down")):
+            bus._send([("b1", "token", {"agent_name": "A", "token": "x"}, 1)])
+        assert "dropped 1 events" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_concurrent_listeners_share_one_connection(self):
+        bus = PostgresEventBus(dsn="postgresql://unused")
+        listener, other = socket.socketpair()
+        threads = []
+
+        def connect(dsn):
+            threads.append(threading.current_thread())
+            return MagicMock(fileno=MagicMock(return_value=listener.fileno()))
+
+        try:
+            with patch("pit_api.streaming.event_bus.psycopg2.connect", side_effect=connect):
+                await asyncio.gather(bus.listen(), bus.listen(), bus.listen())
+                await bus.listen()
+            # Opened once, off the event loop
+            assert len(threads) == 1 and threads[0] is not threading.current_thread()
+        finally:
+            bus._stop_listening()
+            listener.close()
+            other.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_listen_is_retried(self):
+        bus = PostgresEventBus(dsn="postgresql://unused")
+        listener, other = socket.socketpair()
+        conn = MagicMock(fileno=MagicMock(return_value=listener.fileno()))
+        try:
+            with patch(
+                "pit_api.streaming.event_bus.psycopg2.connect", side_effect=[OSError("down"), conn]
+            ):
+                with pytest.raises(OSError):
+                    await bus.listen()
+                await bus.listen()
+            assert bus._listen_conn is conn
+        finally:
+            bus._stop_listening()
+            listener.close()
+            other.close()
+
+
+class TestPresence:
+    """Viewer counting and abandoned-bout cancellation."""
+
+    def test_counts_open_streams(self):
+        viewers = ViewerPresence()
+        with viewers.watching("b1"):
+            with viewers.watching("b1"):
+                assert viewers.count("b1") == 2
+            assert viewers.count("b1") == 1
+        assert viewers.count("b1") == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_bout_is_cancelled(self):
+        orchestrator = MagicMock()
+        with (
+            patch.object(presence, "_watched_elsewhere", return_value=False),
+            patch.object(presence, "_was_shared", return_value=False),
+        ):
+            await cancel_when_abandoned(orchestrator, "b1", "standard", grace=0.02)
+        orchestrator.cancel.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_shared_bout_keeps_running(self):
+        orchestrator = MagicMock()
+        with (
+            patch.object(presence, "_watched_elsewhere", return_value=False),
+            patch.object(presence, "_was_shared", return_value=True),
+        ):
+            await cancel_when_abandoned(orchestrator, "b1", "standard", grace=0.02)
+        orchestrator.cancel.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_watched_bout_is_not_cancelled(self):
+        orchestrator = MagicMock()
+        with (
+            patch.object(presence, "_watched_elsewhere", return_value=False),
+            presence.viewer_presence.watching("b1"),
+        ):
+            watcher = asyncio.create_task(
+                cancel_when_abandoned(orchestrator, "b1", "standard", grace=0.02)
+            )
+            await asyncio.sleep(0.1)
+            watcher.cancel()
+        orchestrator.cancel.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_finish_policy_never_watches(self):
+        orchestrator = MagicMock()
+        await cancel_when_abandoned(orchestrator, "b1", "unleashed", grace=0)
+        orchestrator.cancel.assert_not_called()
@@ -0,0 +1,458 @@
+"""Tests for the Orchestrator turn loop (database session mocked)."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from pit_api.config import config
+from pit_api.engine import (
+    AgentConfig,
+    LeaseLost,
+    Orchestrator,
+    OrchestratorEvents,
+    PersistenceSink,
+    SessionSink,
+    drain,
+    output_budgets,
+)
+from pit_api.engine.agent_runner import RunResult
+from pit_api.engine.circuit_breaker import CircuitBreakers
+from pit_api.models import Bout, Message
+
+
+class SlowRunner:
+    """Runner whose calls take a fixed wall-clock time."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.max_tokens: dict[str, int] = {}
+
+    async def arun_streaming(self, agent, conversation, max_tokens=500, on_token=None, **options):
+        self.max_tokens[agent.name] = max_tokens
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if on_token:
+            on_token(f"{agent.name} speaks")
+        return RunResult(
+            content=f"{agent.name} speaks",
+            tokens_in=10,
+            tokens_out=5,
+            model_used="test-model",
+            latency_ms=1,
+        )
+
+
+class RecordingSink(PersistenceSink):
+    """Sink that keeps what was flushed in memory."""
+
+    def __init__(self):
+        self.messages: list[dict] = []
+        self.bout: dict = {}
+        self.flushes = 0
+        self._pending: tuple[list[dict], dict] = ([], {})
+
+    def add_message(self, row):
+        self._pending[0].append(row)
+
+    def update_bout(self, **values):
+        self._pending[1].update(values)
+
+    async def flush(self):
+        messages, values = self._pending
+        self.messages.extend(messages)
+        self.bout.update(values)
+        self.flushes += 1
+        self._pending = ([], {})
+
+
+def async_session() -> MagicMock:
+    """A mock AsyncSession usable as `async with factory() as db`."""
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.commit = AsyncMock()
+    return session
+
+
+def make_bout(preset_id: str) -> Bout:
+    return Bout(id="bout-test", status="pending", model_tier="standard", preset_id=preset_id)
+
+
+def make_agents(*names: str) -> list[AgentConfig]:
+    return [AgentConfig(name=n, role=n, system_prompt="") for n in names]
+
+
+def run_bout(preset_id: str, runner, agents, max_turns: int, events=None, sink=None) -> Bout:
+    bout = make_bout(preset_id)
+    with (
+        patch("pit_api.engine.orchestrator.AgentRunner", return_value=runner),
+        patch("pit_api.engine.orchestrator.SessionSink", return_value=sink or RecordingSink()),
+        patch.object(Orchestrator, "_get_turns_for_tier", return_value=max_turns),
+    ):
+        Orchestrator(MagicMock(), events).run(bout, agents)
+    return bout
+
+
+class TestBroadcast:
+    """Fan-out turn plans."""
+
+    def test_responders_run_concurrently(self):
+        """A broadcast round costs one round-trip of wall-clock time, not N."""
+        runner = SlowRunner(delay=0.1)
+        ends: list[tuple[str, int]] = []
+        events = OrchestratorEvents(on_turn_end=lambda b, name, turn, m: ends.append((name, turn)))
+
+        start = time.monotonic()
+        bout = run_bout("shark-pit", runner, make_agents("P", "A", "B", "C"), 4, events)
+        elapsed = time.monotonic() - start
+
+        assert bout.status == "complete"
+        assert runner.max_in_flight == 3
+        assert elapsed < 0.35  # two rounds, not four sequential calls
+        # Merged in deterministic group order
+        assert ends == [("P", 0), ("A", 1), ("B", 2), ("C", 3)]
+
+    def test_round_robin_is_sequential(self):
+        runner = SlowRunner(delay=0.01)
+        bout = run_bout("roast-battle", runner, make_agents("A", "B"), 4)
+        assert bout.status == "complete"
+        assert bout.total_turns == 4
+        assert runner.max_in_flight == 1
+
+
+class TestClaim:
+    """Atomic pending -> running claim."""
+
+    def test_lost_claim_does_not_run(self):
+        runner = SlowRunner(delay=0)
+        bout = make_bout("roast-battle")
+        with (
+            patch("pit_api.engine.orchestrator.claim_bout", return_value=False),
+            patch("pit_api.engine.orchestrator.AgentRunner", return_value=runner),
+        ):
+            with pytest.raises(ValueError):
+                Orchestrator(MagicMock()).run(bout, make_agents("A", "B"))
+        assert runner.max_in_flight == 0
+
+    def test_runs_bout_already_claimed_by_owner(self):
+        bout = make_bout("roast-battle")
+        bout.status, bout.lease_owner = "running", "me"
+        with (
+            patch("pit_api.engine.orchestrator.claim_bout") as claim,
+            patch("pit_api.engine.orchestrator.AgentRunner", return_value=SlowRunner(0)),
+            patch("pit_api.engine.orchestrator.SessionSink", return_value=RecordingSink()),
+            patch.object(Orchestrator, "_get_turns_for_tier", return_value=2),
+        ):
+            Orchestrator(MagicMock(), lease_owner="me").run(bout, make_agents("A", "B"))
+        claim.assert_not_called()
+        assert bout.status == "complete"
+
+
+class TestDeadline:
+    """Per-tier wall-clock budget."""
+
+    def test_overrunning_bout_times_out(self):
+        runner = SlowRunner(delay=1.0)
+        errors: list[str] = []
+        completed: list[str] = []
+        events = OrchestratorEvents(
+            on_error=lambda b, msg: errors.append(msg),
+            on_bout_complete=lambda b, c, reason: completed.append(reason),
+        )
+
+        start = time.monotonic()
+        with patch.object(Orchestrator, "_get_deadline_for_tier", return_value=0.1):
+            bout = run_bout("roast-battle", runner, make_agents("A", "B"), 4, events)
+
+        assert time.monotonic() - start < 0.5  # in-flight call was cancelled
+        assert bout.status == "timeout"
+        assert completed == ["timeout"]
+        assert bout.total_turns == 0
+        assert errors and "Time limit" in errors[0]
+
+
+class TestCancel:
+    """Cancelling a bout mid-generation."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_in_flight_calls(self):
+        runner = SlowRunner(delay=1.0)
+        errors: list[str] = []
+        bout = make_bout("roast-battle")
+        with (
+            patch("pit_api.engine.orchestrator.AgentRunner", return_value=runner),
+            patch("pit_api.engine.orchestrator.SessionSink", return_value=RecordingSink()),
+            patch.object(Orchestrator, "_get_turns_for_tier", return_value=4),
+        ):
+            orchestrator = Orchestrator(
+                MagicMock(), OrchestratorEvents(on_error=lambda b, msg: errors.append(msg))
+            )
+            task = asyncio.create_task(orchestrator.arun(bout, make_agents("A", "B")))
+            await asyncio.sleep(0.05)
+
+            start = time.monotonic()
+            orchestrator.cancel("gone")
+            await task
+
+        assert time.monotonic() - start < 0.5
+        assert bout.status == "cancelled"
+        assert bout.total_turns == 0
+        assert errors == ["gone"]
+
+
+class TestLease:
+    """A bout reaped or taken over while its owner still runs it."""
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_stops_without_publishing(self):
+        runner = SlowRunner(delay=1.0)
+        published: list[str] = []
+        events = OrchestratorEvents(
+            on_token=lambda *_: published.append("token"),
+            on_turn_end=lambda *_: published.append("turn_end"),
+            on_bout_complete=lambda *_: published.append("bout_complete"),
+            on_error=lambda *_: published.append("error"),
+        )
+        sink = RecordingSink()
+        with (
+            patch("pit_api.engine.orchestrator.AgentRunner", return_value=runner),
+            patch("pit_api.engine.orchestrator.SessionSink", return_value=sink),
+            patch("pit_api.engine.watchdog.touch_heartbeat", return_value=False),
+            patch.object(config, "BOUT_HEARTBEAT_INTERVAL", 0.02),
+            patch.object(Orchestrator, "_get_turns_for_tier", return_value=4),
+        ):
+            start = time.monotonic()
+            with pytest.raises(LeaseLost):
+                await Orchestrator(MagicMock(), events).arun(
+                    make_bout("roast-battle"), make_agents("A", "B")
+                )
+
+        assert time.monotonic() - start < 0.5  # in-flight call was cancelled
+        assert published == []
+        assert sink.bout == {}  # Nothing written over the new owner's state
+
+    @pytest.mark.asyncio
+    async def test_sink_write_fenced_by_lease(self):
+        session = async_session()
+        session.execute.return_value.first.return_value = None  # Not ours any more
+        sink = SessionSink("bout-test", "owner", lambda: session, batch_size=1, flush_interval=60)
+
+        sink.update_bout(status="complete")
+        with pytest.raises(LeaseLost):
+            await sink.flush()
+
+        session.commit.assert_not_called()
+
+
+class TestCostGuard:
+    """Budget checks before a round is dispatched."""
+
+    def test_bout_ends_before_overshooting(self):
+        runner = SlowRunner(delay=0)
+        errors: list[str] = []
+        events = OrchestratorEvents(on_error=lambda b, msg: errors.append(msg))
+
+        with patch.object(Orchestrator, "_get_cost_ceiling_for_tier", return_value=0.0001):
+            bout = run_bout("roast-battle", runner, make_agents("A", "B"), 4, events)
+
+        assert runner.max_in_flight == 0  # Nothing was dispatched
+        assert bout.status == "complete"
+        assert bout.token_cost == 0
+        assert errors and "Cost ceiling" in errors[0]
+
+    def test_learned_output_budgets_cap_each_agent(self):
+        runner = SlowRunner(delay=0)
+        learned = {("roast-battle", "A", "standard"): 150}
+
+        with patch.object(output_budgets, "_budgets", learned):
+            run_bout("roast-battle", runner, make_agents("A", "B"), 2)
+
+        assert runner.max_tokens == {"A": 150, "B": config.MAX_TOKENS_PER_TURN}
+
+    @pytest.mark.parametrize("tripped", [False, True])
+    def test_priced_at_fallback_only_while_circuit_open(self, tripped):
+        runner = SlowRunner(delay=0)
+        breakers = CircuitBreakers()
+        if tripped:
+            breakers.get(config.MODEL_STANDARD).record_failure(wait=60)
+
+        with (
+            patch("pit_api.engine.orchestrator.circuit_breakers", breakers),
+            patch.object(
+                Orchestrator, "_get_fallback_for_tier", return_value=config.MODEL_UNLEASHED
+            ),
+            # Haiku's price for a full turn, well short of Opus's
+            patch.object(Orchestrator, "_get_cost_ceiling_for_tier", return_value=0.006),
+        ):
+            run_bout("roast-battle", runner, make_agents("A"), 1)
+
+        if tripped:
+            assert runner.max_tokens["A"] < config.MAX_TOKENS_PER_TURN
+        else:
+            assert runner.max_tokens["A"] == config.MAX_TOKENS_PER_TURN
+
+
+class TestRepetition:
+    """Bouts that go in circles are steered, then ended."""
+
+    def test_looping_bout_is_steered_then_ended(self):
+        runner = SlowRunner(delay=0)  # Every agent says the same line every turn
+        completed: list[str] = []
+        events = OrchestratorEvents(on_bout_complete=lambda b, c, reason: completed.append(reason))
+
+        bout = run_bout("roast-battle", runner, make_agents("A", "B"), 20, events)
+
+        # Repetitive from turn 2; three strikes steer at turn 4, three more end it
+        assert bout.status == "complete"
+        assert bout.total_turns == 8
+        assert completed == ["repetition"]
+        assert bout.extra["end_reason"] == "repetition"
+
+    def test_repetition_action_off(self):
+        runner = SlowRunner(delay=0)
+        with patch.object(Orchestrator, "_get_repetition_action_for_tier", return_value="off"):
+            bout = run_bout("roast-battle", runner, make_agents("A", "B"), 20)
+
+        assert bout.total_turns == 20
+        assert bout.extra["end_reason"] == "max_turns"
+
+
+class TestPersistence:
+    """Writes go through the sink in short batched transactions."""
+
+    def test_progress_is_written_every_round(self):
+        sink = RecordingSink()
+        progress: list[tuple[int, int]] = []
+        events = OrchestratorEvents(
+            on_turn_end=lambda *_: progress.append((len(sink.messages), sink.bout["total_turns"]))
+        )
+
+        run_bout("roast-battle", SlowRunner(delay=0), make_agents("A", "B"), 3, events, sink)
+
+        # Each turn_end follows the write of its message and the bout's running totals
+        assert progress == [(1, 1), (2, 2), (3, 3)]
+        assert sink.bout["status"] == "complete"
+        assert sink.bout["token_cost"] > 0
+
+    @pytest.mark.asyncio
+    async def test_session_sink_batches_until_due(self):
+        session = async_session()
+        sink = SessionSink("bout-test", "owner", lambda: session, batch_size=2, flush_interval=60)
+
+        sink.add_message({"id": "m0"})
+        sink.update_bout(total_turns=1)
+        await sink.flush_if_due()
+        session.commit.assert_not_called()
+
+        sink.add_message({"id": "m1"})
+        sink.update_bout(total_turns=2)
+        await sink.flush_if_due()
+
+        # One transaction: the lease check, both messages in one executemany, then the
+        # latest bout values
+        assert session.execute.call_count == 3
+        assert session.execute.call_args_list[1].args[1] == [{"id": "m0"}, {"id": "m1"}]
+        session.commit.assert_called_once()
+        session.__aexit__.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_session_sink_flushes_after_interval(self):
+        session = async_session()
+        sink = SessionSink("bout-test", "owner", lambda: session, batch_size=100, flush_interval=0)
+
+        sink.add_message({"id": "m0"})
+        await sink.flush_if_due()
+        session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self):
+        session = async_session()
+        session.commit.side_effect = [RuntimeError("db down"), None]
+        sink = SessionSink("bout-test", "owner", lambda: session, batch_size=1, flush_interval=60)
+
+        sink.add_message({"id": "m0"})
+        with pytest.raises(RuntimeError):
+            await sink.flush()
+        await sink.close()
+
+        assert session.execute.call_args_list[-1].args[1] == [{"id": "m0"}]
+        assert session.commit.call_count == 2
+        assert session.__aexit__.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_still_writes_once(self):
+        session = async_session()
+
+        async def slow_commit():
+            await asyncio.sleep(0.05)
+
+        session.commit.side_effect = slow_commit
+        sink = SessionSink("bout-test", "owner", lambda: session, batch_size=1, flush_interval=60)
+
+        sink.add_message({"id": "m0"})
+        flush = asyncio.create_task(sink.flush())
+        await asyncio.sleep(0.01)
+        flush.cancel()
+        await sink.close()
+
+        # The transaction already running commits; close() waits for it, not a second copy
+        assert session.execute.call_count == 2
+        session.commit.assert_called_once()
+
+
+class TestParking:
+    """Drain-time parking and resumption from a checkpoint."""
+
+    def test_parked_bout_resumes_where_it_stopped(self):
+        runner = SlowRunner(delay=0)
+        db = MagicMock()
+        bout = make_bout("roast-battle")
+        agents = make_agents("A", "B")
+        sink = RecordingSink()
+
+        with (
+            patch("pit_api.engine.orchestrator.AgentRunner", return_value=runner),
+            patch("pit_api.engine.orchestrator.SessionSink", return_value=sink),
+            patch.object(Orchestrator, "_get_turns_for_tier", return_value=4),
+        ):
+            orchestrator = Orchestrator(db)
+            events = OrchestratorEvents(on_turn_end=lambda *_: orchestrator.park())
+            orchestrator.events = events
+            orchestrator.run(bout, agents)
+
+            assert bout.status == "pending"
+            assert bout.extra["checkpoint"]["turn_number"] == 1
+            assert len(sink.messages) == 1
+            assert sink.bout["status"] == "pending"
+
+            # The messages query used by restore returns what was persisted
+            query = db.query.return_value.filter.return_value.order_by.return_value
+            query.all.return_value = [Message(**row) for row in sink.messages]
+            Orchestrator(db).run(bout, agents)
+
+        assert bout.status == "complete"
+        assert bout.total_turns == 4
+        assert [row["turn_number"] for row in sink.messages] == [0, 1, 2, 3]
+        assert bout.extra == {"end_reason": "max_turns"}  # Checkpoint cleared
+        # Spend includes the turn run before parking
+        assert bout.token_cost > 0
+
+    @pytest.mark.asyncio
+    async def test_drain_parks_only_overrunning_bouts(self):
+        fast, slow = MagicMock(), MagicMock()
+        parked = asyncio.Event()
+        slow.park.side_effect = parked.set
+        fast_task = asyncio.create_task(asyncio.sleep(0))
+        slow_task = asyncio.create_task(parked.wait())
+
+        await drain([(fast, fast_task), (slow, slow_task)], timeout=0.05)
+
+        fast.park.assert_not_called()
+        slow.park.assert_called_once()
+        assert slow_task.done()
@@ -0,0 +1,92 @@
+"""Tests for BoutScheduler admission control."""
+
+import asyncio
+
+import pytest
+
+from pit_api.engine.scheduler import BoutScheduler
+
+
+async def hold(scheduler, tier, ip_hash, started, release, positions=None):
+    """Occupy a slot until release is set."""
+    on_queued = positions.append if positions is not None else None
+    async with scheduler.bout_slot(tier, ip_hash, on_queued=on_queued):
+        started.append((tier, ip_hash))
+        await release.wait()
+
+
+class TestBoutScheduler:
+    """Concurrency caps and queue ordering."""
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrent_bouts(self):
+        scheduler = BoutScheduler(max_bouts=2, max_model_calls=10)
+        started, release = [], asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(scheduler, "standard", f"ip{i}", started, release))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0)
+        assert len(started) == 2
+        assert scheduler.stats()["queued_bouts"] == 3
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert len(started) == 5
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_paid_tiers_and_fair_share_first(self):
+        scheduler = BoutScheduler(max_bouts=2, max_model_calls=10)
+        started, release = [], asyncio.Event()
+        pinned = asyncio.create_task(hold(scheduler, "standard", "a", started, asyncio.Event()))
+        blocker = asyncio.create_task(hold(scheduler, "standard", "x", started, asyncio.Event()))
+        await asyncio.sleep(0)
+
+        waiting = [
+            asyncio.create_task(hold(scheduler, tier, ip, started, release))
+            for tier, ip in [("standard", "a"), ("standard", "b"), ("unleashed", "c")]
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        blocker.cancel()
+        await asyncio.gather(*waiting)
+        pinned.cancel()
+
+        # Paid tier first; then "b" beats "a", who already has a bout running
+        assert started[2:] == [("unleashed", "c"), ("standard", "b"), ("standard", "a")]
+
+    @pytest.mark.asyncio
+    async def test_queue_positions_reported(self):
+        scheduler = BoutScheduler(max_bouts=1, max_model_calls=10)
+        started, release = [], asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, "standard", "a", started, release))
+        await asyncio.sleep(0)
+        positions_b, positions_c = [], []
+        b = asyncio.create_task(hold(scheduler, "standard", "b", started, release, positions_b))
+        c = asyncio.create_task(hold(scheduler, "standard", "c", started, release, positions_c))
+        await asyncio.sleep(0)
+        assert positions_b == [1]
+        assert positions_c == [2]
+
+        b.cancel()
+        await asyncio.sleep(0)
+        assert positions_c == [2, 1]
+
+        release.set()
+        await asyncio.gather(first, c)
+        assert scheduler.running == 0 and scheduler.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_model_call_cap(self):
+        scheduler = BoutScheduler(max_bouts=10, max_model_calls=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with scheduler.model_call():
+                peak = max(peak, scheduler.stats()["in_flight_model_calls"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
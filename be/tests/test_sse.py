@@ -0,0 +1,148 @@
+"""Tests for SSE framing and token coalescing."""
+
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from pit_api.models import Bout, Message
+from pit_api.routes.bout import stream_bout
+from pit_api.streaming import InProcessEventBus, TokenCoalescer, format_sse, replay_bout
+from pit_api.streaming.replay import paced_chunks
+
+
+class TestFormatSSE:
+    """SSE frame formatting."""
+
+    def test_frame_shape(self):
+        """Frames carry event name and JSON data, terminated by a blank line."""
+        frame = format_sse("turn_start", {"agent_name": "Darwin", "turn_number": 0})
+        event_line, data_line, blank, end = frame.split("\n")
+        assert event_line == "event: turn_start"
+        assert json.loads(data_line.removeprefix("data: ")) == {
+            "agent_name": "Darwin",
+            "turn_number": 0,
+        }
+        assert blank == "" and end == ""
+
+    def test_id_line_precedes_event(self):
+        frame = format_sse("token", {"agent_name": "A", "token": "x"}, 42)
+        assert frame.startswith("id: 42\nevent: token\n")
+
+
+class TestTokenCoalescer:
+    """Token delta coalescing."""
+
+    def test_buffers_until_flushed(self):
+        """Small deltas inside the window are held back and merged."""
+        coalescer = TokenCoalescer(max_delay_ms=10_000, max_chars=1000)
+        assert coalescer.add("A", "Hel", 1) == []
+        assert coalescer.add("A", "lo", 2) == []
+        assert coalescer.pending
+        assert coalescer.flush() == [("token", {"agent_name": "A", "token": "Hello"}, 2)]
+        assert not coalescer.pending
+        assert coalescer.timeout() is None
+
+    def test_flushes_at_size_limit(self):
+        """Reaching max_chars releases the frame immediately."""
+        coalescer = TokenCoalescer(max_delay_ms=10_000, max_chars=5)
+        assert coalescer.add("A", "abc") == []
+        assert coalescer.add("A", "de") == [("token", {"agent_name": "A", "token": "abcde"}, None)]
+
+    def test_flushes_on_agent_change(self):
+        """Deltas from different agents are never merged."""
+        coalescer = TokenCoalescer(max_delay_ms=10_000, max_chars=1000)
+        coalescer.add("A", "one", 1)
+        assert coalescer.add("B", "two", 2) == [("token", {"agent_name": "A", "token": "one"}, 1)]
+        assert coalescer.flush() == [("token", {"agent_name": "B", "token": "two"}, 2)]
+
+    def test_timeout_counts_down_from_first_delta(self):
+        """The window starts at the first buffered delta."""
+        coalescer = TokenCoalescer(max_delay_ms=20, max_chars=1000)
+        coalescer.add("A", "x")
+        assert 0 < coalescer.timeout() <= 0.02
+        time.sleep(0.03)
+        assert coalescer.timeout() == 0
+        assert coalescer.add("A", "y") == [("token", {"agent_name": "A", "token": "xy"}, None)]
+
+
+def _session_with(bout, batches):
+    """A mock async session returning the given bout, then one message batch per query."""
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.get = AsyncMock(return_value=bout)
+    session.scalars = AsyncMock(
+        side_effect=[MagicMock(all=MagicMock(return_value=batch)) for batch in batches]
+    )
+    return session
+
+
+class TestReplay:
+    """Replaying finished bouts from persisted messages."""
+
+    def test_paced_chunks_rejoin_and_break_on_spaces(self):
+        text = "the quick brown fox jumps over the lazy dog " * 5
+        chunks = paced_chunks(text, chars_per_second=200)
+        assert "".join(chunks) == text
+        assert len(chunks) > 1
+        assert all(chunk.endswith(" ") for chunk in chunks)
+
+    def test_unpaced_is_one_chunk(self):
+        assert paced_chunks("whole turn", 0) == ["whole turn"]
+
+    @pytest.mark.asyncio
+    async def test_replay_reads_in_batches_and_closes(self):
+        bout = Bout(id="b1", status="complete", token_cost=0.05)
+        messages = [
+            Message(id=f"m{i}", bout_id="b1", agent_name="A", turn_number=i, content=f"turn {i}")
+            for i in range(3)
+        ]
+        session = _session_with(bout, [messages[:2], messages[2:]])
+
+        with (
+            patch("pit_api.streaming.replay.AsyncSessionLocal", return_value=session),
+            patch("pit_api.streaming.replay.config.REPLAY_BATCH_SIZE", 2),
+        ):
+            events = [event async for event in replay_bout("b1", chars_per_second=0)]
+
+        assert [t for t, _, _ in events] == ["turn_start", "token", "turn_end"] * 3 + [
+            "bout_complete"
+        ]
+        assert [d["token"] for t, d, _ in events if t == "token"] == ["turn 0", "turn 1", "turn 2"]
+        assert events[-1][1] == {"bout_id": "b1", "total_cost": 0.05, "reason": None}
+        assert [i for _, _, i in events] == [f"r{n}" for n in range(1, 11)]
+
+    @pytest.mark.asyncio
+    async def test_replay_resumes_after_position(self):
+        bout = Bout(id="b1", status="complete", token_cost=0.05)
+        messages = [Message(id="m0", bout_id="b1", agent_name="A", turn_number=0, content="x")]
+        session = _session_with(bout, [messages])
+
+        with patch("pit_api.streaming.replay.AsyncSessionLocal", return_value=session):
+            events = [event async for event in replay_bout("b1", chars_per_second=0, after=2)]
+
+        assert [(t, i) for t, _, i in events] == [("turn_end", "r3"), ("bout_complete", "r4")]
+
+
+class TestStreamRoute:
+    """Starting an inline bout from the stream endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_claimed_bout_starts_before_body_is_read(self):
+        bout = Bout(id="b1", status="pending", model_tier="standard", preset_id="roast-battle")
+        session = MagicMock()
+        session.__aenter__.return_value = session
+        session.get = AsyncMock(return_value=bout)
+
+        with (
+            patch("pit_api.routes.bout.AsyncSessionLocal", return_value=session),
+            patch("pit_api.routes.bout.aclaim_bout", AsyncMock(return_value=True)),
+            patch("pit_api.routes.bout._start_bout") as start,
+            patch("pit_api.routes.bout.event_bus", InProcessEventBus()),
+        ):
+            await stream_bout("b1", MagicMock(), pace=None, last_event_id=None)
+
+        # The body was never iterated (client gone), but the claimed bout has a runner
+        start.assert_called_once()
+        assert start.call_args.args[0] == "b1"
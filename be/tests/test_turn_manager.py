@@ -0,0 +1,216 @@
+"""Tests for TurnManager turn order and context compaction."""
+
+from pit_api.engine.agent_runner import AgentConfig
+from pit_api.engine.compaction import CompactionConfig, extractive_summary
+from pit_api.engine.repetition import RepetitionDetector, shingles
+from pit_api.engine.turn_manager import TurnManager
+from pit_api.engine.turn_plans import AlternatingPlan, BroadcastPlan, get_turn_plan
+
+
+def make_agents(*names: str, teams: list[int] | None = None) -> list[AgentConfig]:
+    teams = teams or [None] * len(names)
+    return [
+        AgentConfig(name=n, role=n.lower(), system_prompt="", team=t) for n, t in zip(names, teams)
+    ]
+
+
+def play(manager: TurnManager, turns: int) -> list[int]:
+    """Run turns with fixed-length content, returning message count sent per turn."""
+    sizes = []
+    for turn_num, agent in manager.turns(turns):
+        sizes.append(len(manager.conversation))
+        manager.advance_turn(f"Point number {turn_num}. And some elaboration.")
+    return sizes
+
+
+class TestRoundRobin:
+    """Baseline turn order."""
+
+    def test_agents_rotate(self):
+        manager = TurnManager(make_agents("A", "B", "C"))
+        order = []
+        for _, agent in manager.turns(5):
+            order.append(agent.name)
+            manager.advance_turn("hi")
+        assert order == ["A", "B", "C", "A", "B"]
+
+    def test_full_history_without_compaction(self):
+        manager = TurnManager(make_agents("A", "B"))
+        manager.seed("Begin.")
+        assert play(manager, 10) == list(range(1, 11))
+
+
+class TestTurnPlans:
+    """Pattern-specific turn plans."""
+
+    def test_unknown_pattern_is_round_robin(self):
+        assert type(get_turn_plan("sequential")) is type(get_turn_plan(None))
+
+    def test_alternating_teams(self):
+        """Teams alternate and members rotate within each team."""
+        agents = make_agents("A1", "A2", "B1", "B2", teams=[1, 1, 2, 2])
+        manager = TurnManager(agents, plan=AlternatingPlan())
+        order = []
+        for _, agent in manager.turns(6):
+            order.append(agent.name)
+            manager.advance_turn("hi")
+        assert order == ["A1", "B1", "A2", "B2", "A1", "B1"]
+
+    def test_broadcast_rounds(self):
+        """Presenter speaks alone, responders share a round and consecutive turn numbers."""
+        manager = TurnManager(make_agents("P", "X", "Y", "Z"), plan=BroadcastPlan())
+        rounds = []
+        for group in manager.rounds(6):
+            rounds.append([(turn, agent.name) for turn, agent in group])
+            manager.advance_round(["ok"] * len(group))
+        assert rounds == [
+            [(0, "P")],
+            [(1, "X"), (2, "Y"), (3, "Z")],
+            [(4, "P")],
+            [(5, "X")],  # truncated at max_turns
+        ]
+
+    def test_partial_round_failure_keeps_slots(self):
+        """A failed responder leaves a gap; an all-failed round counts as one failure."""
+        manager = TurnManager(make_agents("P", "X", "Y"), plan=BroadcastPlan())
+        manager.advance_round(["pitch"])
+        manager.advance_round(["yes", None])
+        assert manager.turn_number == 3
+        assert [m["content"] for m in manager.conversation] == ["[P]: pitch", "[X]: yes"]
+        assert manager.state.consecutive_failures == 0
+
+        manager.advance_round([None])
+        assert manager.turn_number == 3
+        assert manager.state.consecutive_failures == 1
+
+
+class TestCompaction:
+    """Rolling context window."""
+
+    def test_context_size_is_bounded(self):
+        """Messages sent per turn never exceed seed + keep_turns + fold batch."""
+        manager = TurnManager(make_agents("A", "B"), compaction=CompactionConfig(keep_turns=4))
+        manager.seed("Begin.")
+
+        sizes = play(manager, 48)
+
+        assert max(sizes) <= 1 + 4 + 2
+        assert manager.state.compacted_turns > 0
+        assert manager.turn_number == 48
+
+    def test_seed_kept_and_summary_attached(self):
+        """The seed stays first and carries the summary of folded turns."""
+        manager = TurnManager(make_agents("A", "B"), compaction=CompactionConfig(keep_turns=2))
+        manager.seed("Topic: cats.")
+        play(manager, 6)
+
+        first = manager.conversation[0]
+        assert first["role"] == "user"
+        assert first["content"].startswith("Topic: cats.")
+        assert "[Earlier in the conversation]" in first["content"]
+        assert "- [A]: Point number 0." in first["content"]
+        # Folded turns are no longer sent verbatim
+        assert all("Point number 0." not in m["content"] for m in manager.conversation[1:])
+
+    def test_from_preset(self):
+        assert CompactionConfig.from_preset(None) is None
+        assert CompactionConfig.from_preset({"keep_turns": 0}) is None
+        config = CompactionConfig.from_preset({"keep_turns": 8, "summary_max_chars": 500})
+        assert config.keep_turns == 8
+        assert config.summary_max_chars == 500
+
+
+class TestCheckpoint:
+    """Resuming turn state from a checkpoint and persisted messages."""
+
+    def test_restore_matches_uninterrupted_run(self):
+        agents = make_agents("A", "B", "C")
+        original = TurnManager(agents, compaction=CompactionConfig(keep_turns=4))
+        original.seed("Begin.")
+        history = []
+        for turn_num, agent in original.turns(10):
+            content = f"Point number {turn_num}. And some elaboration."
+            history.append((agent.name, turn_num, content))
+            original.advance_turn(content)
+        original.record_failure()
+
+        resumed = TurnManager(agents, compaction=CompactionConfig(keep_turns=4))
+        resumed.seed("Begin.")
+        resumed.restore(original.checkpoint(), history)
+
+        assert resumed.conversation == original.conversation
+        assert resumed.current_agent.name == original.current_agent.name
+        assert resumed.turn_number == 10
+        assert resumed.state.consecutive_failures == 1
+
+    def test_restore_keeps_steer_notes(self):
+        agents = make_agents("A", "B")
+        original = TurnManager(agents, compaction=CompactionConfig(keep_turns=2))
+        original.seed("Begin.")
+        history = []
+        for turn_num, agent in original.turns(6):
+            content = f"msg{turn_num}"
+            history.append((agent.name, turn_num, content))
+            original.advance_turn(content)
+            if turn_num == 1:
+                original.steer("[Moderator]: move on")
+
+        resumed = TurnManager(agents, compaction=CompactionConfig(keep_turns=2))
+        resumed.seed("Begin.")
+        resumed.restore(original.checkpoint(), history)
+
+        assert resumed.conversation == original.conversation
+        assert resumed.state.steers == original.state.steers
+
+
+class TestExtractiveSummary:
+    """Extractive summarizer."""
+
+    def test_keeps_first_sentence(self):
+        summary = extractive_summary(
+            "", [{"role": "user", "content": "[A]: First claim. Then more."}], 1000
+        )
+        assert summary == "- [A]: First claim."
+
+    def test_drops_oldest_lines_when_full(self):
+        messages = [{"role": "user", "content": f"[A]: Line {i}."} for i in range(50)]
+        summary = extractive_summary("", messages, max_chars=60)
+        assert len(summary) <= 60
+        assert summary.endswith("- [A]: Line 49.")
+
+
+class TestRepetition:
+    """Incremental repetition scoring."""
+
+    def test_shingles(self):
+        assert shingles("The cat sat, the cat sat.", 3) == {
+            ("the", "cat", "sat"),
+            ("cat", "sat", "the"),
+            ("sat", "the", "cat"),
+        }
+        assert shingles("Meow!", 3) == {("meow",)}
+        assert shingles("", 3) == set()
+
+    def test_fresh_turns_are_not_repetitive(self):
+        detector = RepetitionDetector(window=4, shingle_size=3, threshold=0.5, strikes=2)
+        for turn in range(10):
+            detector.observe(f"Point number {turn} is about topic {turn * 7} and nothing else")
+        assert not detector.repeating
+
+    def test_catchphrase_loop_strikes_out(self):
+        detector = RepetitionDetector(window=4, shingle_size=3, threshold=0.5, strikes=2)
+        assert detector.observe("Survival of the fittest, as I always say") == 0
+        assert detector.observe("Survival of the fittest, as I always say") == 1.0
+        assert not detector.repeating
+        detector.observe("Survival of the fittest, as I always say")
+        assert detector.repeating
+
+        detector.reset()
+        assert not detector.repeating
+
+    def test_window_forgets_old_turns(self):
+        detector = RepetitionDetector(window=2, shingle_size=3, threshold=0.5, strikes=1)
+        detector.observe("the opening gambit of the debate")
+        detector.observe("something else entirely different here")
+        detector.observe("yet another completely new line")
+        assert detector.observe("the opening gambit of the debate") == 0